@@ -7,6 +7,8 @@ import platform
 # 컴포넌트와 유틸리티 임포트
 from components.sidebar import create_sidebar
 from utils import create_404_page
+from utils.export_utils import register_export_routes
+from utils.stream_utils import register_live_routes
 from constants import PAGE_MODULES
 
 from pages import home, traffic, visitor_analysis, referrer, region, management, about
@@ -35,6 +37,11 @@ app = Dash(
 
 server = app.server
 
+# 로그 검색 결과 내보내기 라우트
+register_export_routes(server)
+# 홈 화면 실시간 패널 푸시 라우트
+register_live_routes(server)
+
 # 레이아웃 설정
 app.layout = html.Div([
     dcc.Location(id='url', refresh=False),
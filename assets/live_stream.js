@@ -0,0 +1,71 @@
+// 홈 화면 실시간 모드: /live/stream(Server-Sent Events) 프레임을 받아 바뀐 패널만 갱신
+// 프레임 형식: {"version": ..., "panels": {컴포넌트 ID: {"figure": trace 속성} 또는 {"children": 텍스트}}}
+(function () {
+    var liveStream = {source: null, figures: {}};
+
+    // 'marker.color' 같은 점 경로에 값 넣기
+    function setPath(target, path, value) {
+        var keys = path.split('.');
+        var node = target;
+        for (var i = 0; i < keys.length - 1; i++) {
+            node[keys[i]] = Object.assign({}, node[keys[i]]);
+            node = node[keys[i]];
+        }
+        node[keys[keys.length - 1]] = value;
+    }
+
+    function applyFrame(frame) {
+        Object.keys(frame.panels).forEach(function (id) {
+            var panel = frame.panels[id];
+            if (panel.figure) {
+                // 현재 그래프의 첫 번째 trace 데이터만 바꾸고 레이아웃은 그대로 둠
+                var figure = liveStream.figures[id] || {data: [], layout: {}};
+                var trace = Object.assign({}, figure.data[0]);
+                Object.keys(panel.figure).forEach(function (key) {
+                    setPath(trace, key, panel.figure[key]);
+                });
+                figure = Object.assign({}, figure, {data: [trace].concat(figure.data.slice(1))});
+                liveStream.figures[id] = figure;
+                window.dash_clientside.set_props(id, {figure: figure});
+            } else {
+                window.dash_clientside.set_props(id, {children: panel.children});
+            }
+        });
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        live: {
+            toggleStream: function (enabled, regionFigure, trafficFigure, statusFigure, urlFigure) {
+                if (liveStream.source) {
+                    liveStream.source.close();
+                    liveStream.source = null;
+                }
+                if (!enabled || typeof EventSource === 'undefined') {
+                    return enabled ? 'polling' : 'off';
+                }
+
+                liveStream.figures = {
+                    'region-map-home': regionFigure,
+                    'traffic-chart': trafficFigure,
+                    'status-distribution-home': statusFigure,
+                    'url-distribution-home': urlFigure
+                };
+                var source = new EventSource('/live/stream');
+                source.onmessage = function (event) {
+                    applyFrame(JSON.parse(event.data));
+                };
+                source.onerror = function () {
+                    // 연결 수 초과 등으로 서버가 거절하면 dcc.Interval 폴링으로 전환
+                    // (정상 종료 후 재연결 중이면 readyState가 CONNECTING이므로 그대로 둠)
+                    if (source.readyState === EventSource.CLOSED && liveStream.source === source) {
+                        liveStream.source = null;
+                        window.dash_clientside.set_props('home-live-interval', {disabled: false});
+                        window.dash_clientside.set_props('home-live-stream', {data: 'polling'});
+                    }
+                };
+                liveStream.source = source;
+                return 'sse';
+            }
+        }
+    });
+})();
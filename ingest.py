@@ -0,0 +1,81 @@
+"""
+nginx access.log를 로컬 로그 저장소(일 단위 파티션 zstd Parquet)로 적재하는 CLI
+
+사용 예:
+    python ingest.py access.log
+    python ingest.py access.log --store data/logs --workers 8 --chunk-mb 64
+    python ingest.py access.log --geoip data/geoip
+"""
+import argparse
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.ingest_utils import DEFAULT_CHUNK_SIZE, find_chunk_boundaries, parse_chunk, enrich_logs, to_log_table
+from utils.store_utils import get_store_path, write_log_table
+from utils.ua_utils import UA_PARSER, get_ua_cache_path
+from utils.url_utils import URL_TEMPLATER, get_url_template_path
+from utils.geoip_utils import GEOIP_TABLE, get_geoip_path
+from utils.search_utils import build_search_index
+from utils.visitor_utils import build_visitor_index
+from utils.session_utils import build_session_index
+from utils.path_utils import build_path_index
+
+def ingest(log_path, store_path, workers, chunk_size):
+    """로그 파일을 구간별로 병렬 파싱해 저장소에 기록하고 처리 통계를 반환합니다."""
+    boundaries = find_chunk_boundaries(log_path, chunk_size)
+    run_id = uuid.uuid4().hex[:8]
+    total_rows = 0
+    days = set()
+    started = time.perf_counter()
+
+    # 이전 적재에서 파싱한 user_agent는 다시 파싱하지 않음
+    ua_cache_path = get_ua_cache_path(store_path)
+    UA_PARSER.load(ua_cache_path)
+    # URL 템플릿 ID는 이전 적재와 같은 번호를 유지
+    url_template_path = get_url_template_path(store_path)
+    URL_TEMPLATER.load(url_template_path)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(parse_chunk, log_path, start, end) for start, end in boundaries]
+        for i, future in enumerate(futures):
+            df = future.result()
+            if df.empty:
+                continue
+            # 보강은 고유 값 단위라 메인 프로세스에서 처리
+            df = enrich_logs(df)
+            write_log_table(to_log_table(df), f"part-{run_id}-{i:05d}", store_path)
+            total_rows += len(df)
+            days.update(df['day'].unique())
+
+            elapsed = time.perf_counter() - started
+            print(f"[{i + 1}/{len(boundaries)}] {total_rows:,}줄 ({total_rows / elapsed:,.0f} lines/sec)")
+
+    UA_PARSER.save(ua_cache_path)
+    URL_TEMPLATER.save(url_template_path)
+
+    # 새로 적재된 날짜의 로그 검색 인덱스, 방문자 색인, 세션/경로 색인 다시 만들기
+    build_search_index(sorted(days), store_path)
+    build_visitor_index(sorted(days), store_path)
+    build_session_index(sorted(days), store_path)
+    build_path_index(sorted(days), store_path)
+    return total_rows, time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description="access.log를 일 단위 Parquet 저장소로 적재합니다.")
+    parser.add_argument('log_path', help="nginx combined 형식 access.log 경로")
+    parser.add_argument('--store', default=get_store_path(), help="저장소 경로 (기본값: LOCAL_STORE_PATH)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="파싱 프로세스 수")
+    parser.add_argument('--geoip', default=get_geoip_path(), help="GeoIP 테이블 디렉터리 (없으면 geo를 채우지 않음)")
+    parser.add_argument('--chunk-mb', type=int, default=DEFAULT_CHUNK_SIZE // (1024 * 1024), help="파싱 구간 크기 (MB)")
+    args = parser.parse_args()
+
+    if GEOIP_TABLE.load(args.geoip):
+        print(f"GeoIP 테이블 사용: {args.geoip} ({len(GEOIP_TABLE.starts):,}개 대역)")
+
+    total_rows, elapsed = ingest(args.log_path, args.store, args.workers, args.chunk_mb * 1024 * 1024)
+    print(f"완료: {total_rows:,}줄, {elapsed:.1f}초 ({total_rows / max(elapsed, 1e-9):,.0f} lines/sec)")
+
+if __name__ == '__main__':
+    main()
@@ -1,26 +1,21 @@
-from dash import html, dcc, callback, Output, Input
+from dash import html, dcc, callback, clientside_callback, ClientsideFunction, Output, Input, State, no_update
 import dash_bootstrap_components as dbc
-from pages.region import create_region_layout, country_to_iso3
+from pages.region import create_region_layout
 from pages.management import create_status_distribution_chart, load_bigquery_data
+from utils.status_utils import prepare_status_groups, create_status_pie_trace
+from utils.live_utils import LIVE_AGGREGATOR, LIVE_POLL_INTERVAL, start_live_poller
+from utils.tail_utils import load_tail_state
+from utils.url_utils import URL_TEMPLATE_TABLE_SUFFIX, has_url_templates
 import plotly.graph_objects as go
 import datetime
 import pandas as pd
 import plotly.express as px
-import math
+from cachetools import TTLCache, cached
 from dash import html
 from dash.dependencies import Input, Output
 from dash import dcc, html
 from dash.html import Div
 
-# 공통 상수 정의
-COLOR_MAP = {
-    '1xx': '#9C27B0',  # 정보 응답 - 보라색
-    '2xx': '#66BB6A',  # 성공 - 녹색
-    '3xx': '#42A5F5',  # 리다이렉션 - 파란색
-    '4xx': '#FFA726',  # 클라이언트 오류 - 주황색
-    '5xx': '#EF5350'   # 서버 오류 - 빨간색
-}
-
 # 날짜 데이터 조회
 query_result = load_bigquery_data("""
 SELECT DISTINCT
@@ -42,6 +37,9 @@ if not query_result.empty:
     min_date_str = min_date.strftime('%Y-%m-%d')
     max_date_str = max_date.strftime('%Y-%m-%d')
 
+# 홈 스냅샷 캐시 유지 시간 (초)
+SNAPSHOT_CACHE_TTL = 600
+
 def create_home_layout():
     # 공통 카드 스타일 정의
     card_style = {
@@ -54,6 +52,16 @@ def create_home_layout():
 
     return html.Div([
         html.H2("홈", style={"textAlign": "center"}),
+        # 실시간 모드 (로컬 저장소의 새 로그를 분 단위 버킷으로 집계해 주기적으로 갱신)
+        html.Div([
+            dbc.Switch(id='home-live-toggle', label="실시간 모드", value=False),
+            html.Span(id='home-live-status', style={"marginLeft": "10px", "color": "#6c757d"})
+        ], style={"display": "flex", "justifyContent": "flex-end", "alignItems": "center"}),
+        # 실시간 패널은 /live/stream 푸시로 갱신하고, 연결할 수 없을 때만 dcc.Interval 폴링 사용
+        dcc.Store(id='home-live-stream'),
+        dcc.Interval(id='home-live-interval', interval=LIVE_POLL_INTERVAL * 1000, disabled=True),
+        # 패널 5개가 함께 쓰는 기준 시각별 스냅샷
+        dcc.Store(id='home-snapshot'),
         html.Div([
             # 첫 번째 row - 3:9 비율 (유입 수와 지도)
             dbc.Row([
@@ -176,52 +184,170 @@ def create_home_layout():
         ], className="page-container")
     ])
 
-@callback(
-    Output('region-map-home', 'figure'),
-    Input('region-map-home', 'id')
-)
-def update_region_map_home(_):
-    # 최근 24시간의 지도 데이터 쿼리
-    query = """
-    WITH latest_time AS (
+def load_latest_timestamp():
+    """홈 패널의 기준 시각(가장 최근 로그 시각)을 한 번 조회합니다."""
+    try:
+        df = load_bigquery_data("""
         SELECT TIMESTAMP(MAX(timestamp_utc)) as max_timestamp
         FROM `dev-voice-457205-p8.lovi_dataset.lovi_datatable`
-    ),
-    time_range AS (
-        SELECT 
-            max_timestamp,
-            TIMESTAMP_SUB(max_timestamp, INTERVAL 24 HOUR) as start_timestamp
-        FROM latest_time
-    ),
-    base_data AS (
-        SELECT 
-            TRIM(SPLIT(REGEXP_REPLACE(geo, r'[[:space:]]*\\([^)]*\\)', ''), ',')[OFFSET(0)]) AS country,
+        """)
+        if df is None or df.empty or pd.isna(df['max_timestamp'].iloc[0]):
+            return None
+        return pd.Timestamp(df['max_timestamp'].iloc[0]).isoformat()
+    except Exception as e:
+        print(f"Error in load_latest_timestamp: {str(e)}")
+        return None
+
+def get_window_bounds(as_of):
+    """기준 시각으로 최근 24시간 범위와 시간별 차트 범위를 계산합니다."""
+    end_timestamp = pd.Timestamp(as_of)
+    max_hour_timestamp = end_timestamp.floor('h')
+    return {
+        'start': (end_timestamp - pd.Timedelta(hours=24)).isoformat(),
+        'end': end_timestamp.isoformat(),
+        'hour_start': (max_hour_timestamp - pd.Timedelta(hours=23)).isoformat(),
+        'hour_end': max_hour_timestamp.isoformat()
+    }
+
+def load_region_counts_home(start_timestamp, end_timestamp):
+    """최근 24시간의 국가별 접속 수를 계산합니다."""
+    query = f"""
+    SELECT 
+        country,
+        iso3 AS iso_alpha,
+        COUNT(*) as count
+    FROM `dev-voice-457205-p8.lovi_dataset.lovi_datatable`
+    WHERE 
+        iso3 IS NOT NULL
+        AND TIMESTAMP(timestamp_utc) >= TIMESTAMP('{start_timestamp}')
+        AND TIMESTAMP(timestamp_utc) <= TIMESTAMP('{end_timestamp}')
+    GROUP BY country, iso_alpha
+    ORDER BY count DESC
+    """
+    return load_bigquery_data(query)
+
+def load_status_counts_home(start_timestamp, end_timestamp):
+    """최근 24시간의 상태 코드별 건수를 계산합니다."""
+    query = f"""
+    SELECT
+        status_code,
+        FLOOR(status_code/100)*100 AS status_group,
+        COUNT(*) as count
+    FROM
+        `dev-voice-457205-p8.lovi_dataset.lovi_datatable`
+    WHERE
+        TIMESTAMP(timestamp_utc) >= TIMESTAMP('{start_timestamp}')
+        AND TIMESTAMP(timestamp_utc) <= TIMESTAMP('{end_timestamp}')
+    GROUP BY
+        status_code, status_group
+    """
+    return load_bigquery_data(query)
+
+def load_hourly_traffic_home(hour_start_timestamp, hour_end_timestamp):
+    """기준 시각 직전 정시까지 23시간의 시간별 트래픽을 계산합니다."""
+    query = f"""
+    WITH hourly_stats AS (
+        SELECT
+            TIMESTAMP_TRUNC(timestamp_utc, HOUR) as hour_timestamp,
             COUNT(*) as count
         FROM `dev-voice-457205-p8.lovi_dataset.lovi_datatable`
-        WHERE 
-            geo IS NOT NULL 
-            AND geo != '-' 
-            AND geo != ''
-            AND TIMESTAMP(timestamp_utc) >= (
-                SELECT start_timestamp FROM time_range
-            )
-            AND TIMESTAMP(timestamp_utc) <= (
-                SELECT max_timestamp FROM time_range
-            )
-        GROUP BY country
+        WHERE TIMESTAMP(timestamp_utc) >= TIMESTAMP('{hour_start_timestamp}')
+        AND TIMESTAMP(timestamp_utc) < TIMESTAMP('{hour_end_timestamp}')
+        GROUP BY hour_timestamp
+        ORDER BY hour_timestamp
     )
-    SELECT * FROM base_data
-    ORDER BY count DESC
+    SELECT 
+        FORMAT_TIMESTAMP('%Y-%m-%d %H:00', hour_timestamp) as hour_label,
+        count
+    FROM hourly_stats
     """
+    return load_bigquery_data(query)
+
+def to_records(df):
+    """조회 결과를 dcc.Store에 넣을 수 있는 레코드 목록으로 바꿉니다."""
+    if df is None or df.empty:
+        return []
+    return df.to_dict('records')
+
+@cached(TTLCache(maxsize=8, ttl=SNAPSHOT_CACHE_TTL))
+def load_home_snapshot(as_of):
+    """기준 시각 하나로 홈 패널 5개의 데이터를 계산해 하나의 스냅샷으로 묶습니다."""
+    bounds = get_window_bounds(as_of)
+    return {
+        'version': as_of,
+        'region': to_records(load_region_counts_home(bounds['start'], bounds['end'])),
+        'status': to_records(load_status_counts_home(bounds['start'], bounds['end'])),
+        'traffic': to_records(load_hourly_traffic_home(bounds['hour_start'], bounds['hour_end'])),
+        'visitors': load_visitor_counts_24h(bounds['start'], bounds['end']),
+        'urls': load_url_distribution_home(bounds['start'], bounds['end'])
+    }
+
+@callback(
+    Output('home-snapshot', 'data'),
+    Input('home-live-toggle', 'value')
+)
+def update_home_snapshot(live_enabled):
+    """기준 시각을 한 번만 구하고, 같은 기준 시각의 스냅샷은 캐시에서 재사용합니다."""
+    if live_enabled:
+        return no_update
     
-    df = load_bigquery_data(query)
+    as_of = load_latest_timestamp()
+    if as_of is None:
+        return None
+    return load_home_snapshot(as_of)
+
+@callback(
+    [Output('home-live-interval', 'disabled'),
+     Output('home-live-status', 'children')],
+    Input('home-live-toggle', 'value')
+)
+def toggle_home_live(live_enabled):
+    """실시간 모드를 켜면 로컬 저장소 폴러를 시작합니다 (폴링은 푸시 연결이 거절될 때만 켜짐)."""
+    if not live_enabled:
+        return True, ""
+    if not start_live_poller():
+        return True, "로컬 저장소가 없어 실시간 모드를 사용할 수 없습니다."
+    return True, "실시간 연결 중..."
+
+# 푸시 연결은 브라우저에서 열고, 받은 프레임으로 바뀐 패널만 직접 갱신 (assets/live_stream.js)
+clientside_callback(
+    ClientsideFunction(namespace='live', function_name='toggleStream'),
+    Output('home-live-stream', 'data'),
+    Input('home-live-toggle', 'value'),
+    [State('region-map-home', 'figure'),
+     State('traffic-chart', 'figure'),
+     State('status-distribution-home', 'figure'),
+     State('url-distribution-home', 'figure')]
+)
+
+@callback(
+    [Output('home-snapshot', 'data', allow_duplicate=True),
+     Output('home-live-status', 'children', allow_duplicate=True)],
+    Input('home-live-interval', 'n_intervals'),
+    prevent_initial_call=True
+)
+def update_home_live(_):
+    """푸시 연결을 쓸 수 없을 때 실시간 집계기의 버킷을 합쳐 스냅샷을 갱신합니다 (웨어하우스 쿼리 없음)."""
+    status = f"{LIVE_POLL_INTERVAL}초마다 갱신"
+    # 테일러가 실행 중이면 마지막 배치의 종단 간 지연을 함께 표시
+    tail_state = load_tail_state()
+    if tail_state and tail_state.get('lag_seconds') is not None:
+        status += f" · 수집 지연 {tail_state['lag_seconds']:.1f}초"
     
-    if df.empty:
+    snapshot = LIVE_AGGREGATOR.snapshot()
+    if snapshot is None:
+        return no_update, no_update
+    return snapshot, status
+
+@callback(
+    Output('region-map-home', 'figure'),
+    Input('home-snapshot', 'data')
+)
+def update_region_map_home(snapshot):
+    if not snapshot or not snapshot['region']:
         return go.Figure()
     
-    # ISO 코드 변환
-    df['iso_alpha'] = df['country'].apply(lambda x: country_to_iso3(x))
-    df = df.dropna(subset=['iso_alpha'])
+    df = pd.DataFrame(snapshot['region'])
     
     fig = px.choropleth(
         df,
@@ -243,102 +369,20 @@ def update_region_map_home(_):
 
 @callback(
     Output('status-distribution-home', 'figure'),
-    Input('status-distribution-home', 'id')
+    Input('home-snapshot', 'data')
 )
-def update_status_distribution_home(_):
-    # 최근 24시간의 상태 코드 분포 데이터 쿼리
-    query = """
-    WITH latest_time AS (
-        SELECT TIMESTAMP(MAX(timestamp_utc)) as max_timestamp
-        FROM `dev-voice-457205-p8.lovi_dataset.lovi_datatable`
-    ),
-    time_range AS (
-        SELECT 
-            max_timestamp,
-            TIMESTAMP_SUB(max_timestamp, INTERVAL 24 HOUR) as start_timestamp
-        FROM latest_time
-    )
-    SELECT
-        status_code,
-        FLOOR(status_code/100)*100 AS status_group,
-        COUNT(*) as count
-    FROM
-        `dev-voice-457205-p8.lovi_dataset.lovi_datatable`
-    WHERE
-        TIMESTAMP(timestamp_utc) >= (
-            SELECT start_timestamp FROM time_range
-        )
-        AND TIMESTAMP(timestamp_utc) <= (
-            SELECT max_timestamp FROM time_range
-        )
-    GROUP BY
-        status_code, status_group
-    """
-    
+def update_status_distribution_home(snapshot):
     try:
-        df = load_bigquery_data(query)
-        if df is None or df.empty:
+        if not snapshot or not snapshot['status']:
             return go.Figure()
+        df = pd.DataFrame(snapshot['status'])
         
-        # 상태 코드 그룹별로 집계
-        df['status_group_name'] = df['status_group'].apply(lambda x: f"{int(x//100)}xx")
-        group_df = df.groupby(['status_group_name', 'status_group'])['count'].sum().reset_index()
-        
-        # 각 그룹별 세부 상태 코드 정보 생성 (툴팁용)
-        status_details = {}
-        for group in group_df['status_group_name'].unique():
-            group_codes = df[df['status_group_name'] == group]
-            details = []
-            for _, row in group_codes.iterrows():
-                details.append(f"상태 코드 {row['status_code']}: {int(row['count']):,}건")
-            status_details[group] = "<br>".join(details)
+        # 그룹별 건수, 비율, 툴팁을 한 번에 계산 (로그 스케일)
+        groups = prepare_status_groups(df, log_scale=True)
         
         # 파이차트 생성
         fig = go.Figure()
-        
-        # 상태 코드 그룹 이름 및 색상 목록
-        labels = group_df['status_group_name'].tolist()
-        
-        # 각 그룹의 백분율 계산 (표시용)
-        total = group_df['count'].sum()
-        percentages = [(count / total) * 100 for count in group_df['count']]
-        
-        # 로그 스케일 적용
-        log_values = [math.log10(max(1, val)) for val in group_df['count'].tolist()]
-        min_val = min(log_values)
-        if min_val < 1:
-            log_values = [val - min_val + 1 for val in log_values]
-        
-        # 호버 텍스트 생성
-        hover_texts = []
-        for i, group in enumerate(labels):
-            original_count = group_df.loc[group_df['status_group_name'] == group, 'count'].values[0]
-            percentage = percentages[i]
-            detail_text = f"<br><br>세부 상태 코드:<br>{status_details[group]}" if group in status_details else ""
-            hover_texts.append(f"<b>{group}</b><br>총 건수: {original_count:,} ({percentage:.1f}%){detail_text}")
-        
-        colors = [COLOR_MAP.get(group, '#CCCCCC') for group in labels]
-        
-        # 파이 차트에 표시할 텍스트 생성
-        text_template = '%{label}<br>%{text}%'
-        text_values = [f"{p:.1f}" for p in percentages]
-        
-        # 파이 차트 추가
-        fig.add_trace(go.Pie(
-            labels=labels,
-            values=log_values,
-            text=text_values,
-            texttemplate=text_template,
-            hovertemplate='%{customdata}<extra></extra>',
-            customdata=hover_texts,
-            textinfo='label+text',
-            marker_colors=colors,
-            hole=0.4,
-            sort=False,
-            direction='clockwise',
-            pull=[0.03] * len(labels),
-            textposition='inside'
-        ))
+        fig.add_trace(create_status_pie_trace(groups))
         
         fig.update_layout(
             title='상태 코드 분포 (최근 24시간, 로그 스케일)',
@@ -368,43 +412,12 @@ def update_status_distribution_home(_):
 
 @callback(
     Output('traffic-chart', 'figure'),
-    Input('traffic-chart', 'id')
+    Input('home-snapshot', 'data')
 )
-def update_traffic_chart(_):
-    query = """
-    WITH latest_time AS (
-        SELECT 
-            TIMESTAMP_TRUNC(TIMESTAMP(MAX(timestamp_utc)), HOUR) as max_hour_timestamp
-        FROM `dev-voice-457205-p8.lovi_dataset.lovi_datatable`
-    ),
-    time_range AS (
-        SELECT 
-            max_hour_timestamp,
-            TIMESTAMP_SUB(max_hour_timestamp, INTERVAL 23 HOUR) as start_timestamp
-        FROM latest_time
-    ),
-    hourly_stats AS (
-        SELECT
-            TIMESTAMP_TRUNC(timestamp_utc, HOUR) as hour_timestamp,
-            COUNT(*) as count
-        FROM `dev-voice-457205-p8.lovi_dataset.lovi_datatable`
-        WHERE TIMESTAMP(timestamp_utc) >= (
-            SELECT start_timestamp FROM time_range
-        )
-        AND TIMESTAMP(timestamp_utc) < (
-            SELECT max_hour_timestamp FROM time_range
-        )
-        GROUP BY hour_timestamp
-        ORDER BY hour_timestamp
-    )
-    SELECT 
-        FORMAT_TIMESTAMP('%Y-%m-%d %H:00', hour_timestamp) as hour_label,
-        count
-    FROM hourly_stats
-    """
-    df = load_bigquery_data(query)
-    if df.empty:
+def update_traffic_chart(snapshot):
+    if not snapshot or not snapshot['traffic']:
         return go.Figure()
+    df = pd.DataFrame(snapshot['traffic'])
     
     # 트래픽 바 차트 생성
     fig = px.bar(
@@ -474,36 +487,33 @@ def update_traffic_chart(_):
     [Output('total-visitors-24h', 'children'),
      Output('new-visitors-24h', 'children'),
      Output('returning-visitors-24h', 'children')],
-    Input('total-visitors-24h', 'id')
+    Input('home-snapshot', 'data')
 )
-def update_visitor_metrics_24h(_):
+def update_visitor_metrics_24h(snapshot):
     """최근 24시간 방문자 수 메트릭을 업데이트합니다."""
-    counts = load_visitor_counts_24h()
+    counts = snapshot['visitors'] if snapshot else None
     
     if counts is None:
         return "0", "0", "0"
     
-    return (
-        f"{counts['total']:,}",
-        f"{counts['new']:,}",
-        f"{counts['returning']:,}"
+    # 실시간 모드에서는 신규/재방문 구분이 없음
+    return tuple(
+        "-" if counts[key] is None else f"{counts[key]:,}"
+        for key in ['total', 'new', 'returning']
     )
 
-def load_visitor_counts_24h():
+def load_visitor_counts_24h(start_timestamp, end_timestamp):
     """최근 24시간 내의 방문자 수를 계산합니다."""
     try:
-        query = """
-        WITH latest_time AS (
-            SELECT TIMESTAMP(MAX(timestamp_utc)) as max_timestamp
-            FROM `dev-voice-457205-p8.lovi_dataset.lovi_datatable`
-        ),
-        first_visits AS (
-            -- 전체 기간에서 각 IP와 User-agent의 첫 방문 시간
+        query = f"""
+        WITH first_visits AS (
+            -- 기준 시각까지 각 IP와 User-agent의 첫 방문 시간
             SELECT 
                 ip,
                 user_agent,
                 MIN(TIMESTAMP(timestamp_utc)) as first_visit_time
             FROM `dev-voice-457205-p8.lovi_dataset.lovi_datatable`
+            WHERE TIMESTAMP(timestamp_utc) <= TIMESTAMP('{end_timestamp}')
             GROUP BY ip, user_agent
         ),
         period_visits AS (
@@ -513,10 +523,8 @@ def load_visitor_counts_24h():
                 user_agent,
                 MAX(TIMESTAMP(timestamp_utc)) as last_visit_time
             FROM `dev-voice-457205-p8.lovi_dataset.lovi_datatable`
-            WHERE TIMESTAMP(timestamp_utc) >= (
-                SELECT TIMESTAMP_SUB(max_timestamp, INTERVAL 24 HOUR)
-                FROM latest_time
-            )
+            WHERE TIMESTAMP(timestamp_utc) >= TIMESTAMP('{start_timestamp}')
+            AND TIMESTAMP(timestamp_utc) <= TIMESTAMP('{end_timestamp}')
             GROUP BY ip, user_agent
         )
         SELECT 
@@ -531,51 +539,71 @@ def load_visitor_counts_24h():
         
         if df is not None and not df.empty:
             return {
-                'total': df['total_visitors'].iloc[0],
-                'new': df['new_visitors'].iloc[0],
-                'returning': df['returning_visitors'].iloc[0]
+                'total': int(df['total_visitors'].iloc[0]),
+                'new': int(df['new_visitors'].iloc[0]),
+                'returning': int(df['returning_visitors'].iloc[0])
             }
         return None
     except Exception as e:
         print(f"Error in load_visitor_counts_24h: {str(e)}")
         return None
 
-def load_url_distribution_home():
+def load_url_distribution_home(start_timestamp, end_timestamp):
     """최근 24시간 내 TOP 유입 페이지를 계산합니다."""
     try:
-        query = """
-        WITH latest_date AS (
-            SELECT TIMESTAMP(MAX(timestamp_utc)) as max_timestamp
-            FROM `dev-voice-457205-p8.lovi_dataset.lovi_datatable`
-        ),
-        page_stats AS (
-            SELECT 
-                url_path,
-                COUNT(*) as count
-            FROM `dev-voice-457205-p8.lovi_dataset.lovi_datatable`
-            WHERE TIMESTAMP(timestamp_utc) >= (
-                SELECT TIMESTAMP_SUB(max_timestamp, INTERVAL 24 HOUR)
-                FROM latest_date
+        if has_url_templates():
+            query = f"""
+            WITH page_stats AS (
+                -- 고유 경로가 아니라 작은 정수 템플릿 ID로 묶은 뒤 템플릿 이름만 조인
+                -- 아직 url_template_id가 채워지지 않은 행(다음 백필 전 적재분)은 원본 url_path로 묶음
+                SELECT 
+                    url_template_id,
+                    IF(url_template_id IS NULL, url_path, NULL) as raw_path,
+                    COUNT(*) as page_count
+                FROM `dev-voice-457205-p8.lovi_dataset.lovi_datatable`
+                WHERE TIMESTAMP(timestamp_utc) >= TIMESTAMP('{start_timestamp}')
+                AND TIMESTAMP(timestamp_utc) <= TIMESTAMP('{end_timestamp}')
+                GROUP BY url_template_id, raw_path
             )
-            AND url_path IS NOT NULL 
-            AND url_path != ''
-            AND url_path != '/'
+            SELECT 
+                COALESCE(t.url_template, p.raw_path) as url_path,
+                SUM(p.page_count) as count
+            FROM page_stats p
+            LEFT JOIN `dev-voice-457205-p8.lovi_dataset.lovi_datatable{URL_TEMPLATE_TABLE_SUFFIX}` t USING (url_template_id)
+            WHERE COALESCE(t.url_template, p.raw_path) NOT IN ('', '/')
             GROUP BY url_path
-        )
-        SELECT 
-            url_path,
-            count
-        FROM page_stats
-        ORDER BY count DESC
-        LIMIT 10
-        """
+            ORDER BY count DESC
+            LIMIT 10
+            """
+        else:
+            # 템플릿 백필 전 테이블(url_template_id 컬럼이나 템플릿 차원 테이블이 없음)은 원본 url_path로 묶음
+            query = f"""
+            WITH page_stats AS (
+                SELECT 
+                    url_path,
+                    COUNT(*) as count
+                FROM `dev-voice-457205-p8.lovi_dataset.lovi_datatable`
+                WHERE TIMESTAMP(timestamp_utc) >= TIMESTAMP('{start_timestamp}')
+                AND TIMESTAMP(timestamp_utc) <= TIMESTAMP('{end_timestamp}')
+                AND url_path IS NOT NULL 
+                AND url_path != ''
+                AND url_path != '/'
+                GROUP BY url_path
+            )
+            SELECT 
+                url_path,
+                count
+            FROM page_stats
+            ORDER BY count DESC
+            LIMIT 10
+            """
         
         df = load_bigquery_data(query)
         
         if df is not None and not df.empty:
             return {
                 'pages': df['url_path'].tolist(),
-                'counts': df['count'].tolist()
+                'counts': [int(count) for count in df['count']]
             }
         return None
     except Exception as e:
@@ -584,11 +612,11 @@ def load_url_distribution_home():
 
 @callback(
     Output('url-distribution-home', 'figure'),
-    Input('url-distribution-home', 'id')
+    Input('home-snapshot', 'data')
 )
-def update_url_distribution_home(_):
+def update_url_distribution_home(snapshot):
     """유입 페이지 분포 그래프를 업데이트합니다."""
-    stats = load_url_distribution_home()
+    stats = snapshot['urls'] if snapshot else None
     
     if stats is None:
         return go.Figure()
@@ -1,20 +1,23 @@
 from dash import html, dcc, callback, Output, Input, State, ctx, dash_table
 import dash_bootstrap_components as dbc
 from utils.utils import load_bigquery_data
+from utils.store_utils import has_local_store, scan_store
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+from utils.status_utils import (
+    ORDERED_STATUS_CODES, COLOR_MAP, DEFAULT_COLOR, format_counts, status_group_names, prepare_status_groups, create_status_pie_trace
+)
+from utils.search_utils import search_logs
+from utils.ip_utils import IP_LEVELS, build_prefix_trie, rank_ip_prefixes
+from utils.log_search_utils import (
+    LocalSearchSession, BigQuerySearchSession, create_search_session, get_search_session, parse_sort_by,
+    SEARCH_RESULT_COLUMNS, SEARCH_SORT_COLUMNS
+)
 import pandas as pd
 import datetime
 import plotly.graph_objects as go
-import math
 
-# 공통 상수 정의
-ORDERED_STATUS_CODES = ['1xx', '2xx', '3xx', '4xx', '5xx']
-COLOR_MAP = {
-    '1xx': '#9C27B0',  # 정보 응답 - 보라색
-    '2xx': '#66BB6A',  # 성공 - 녹색
-    '3xx': '#42A5F5',  # 리다이렉션 - 파란색
-    '4xx': '#FFA726',  # 클라이언트 오류 - 주황색
-    '5xx': '#EF5350'   # 서버 오류 - 빨간색
-}
 
 # 날짜 데이터 조회
 query_result = load_bigquery_data("""
@@ -66,6 +69,13 @@ if not initial_status_df.empty:
 else:
     initial_status_groups = []
 
+# 오류 IP 집계 단위 선택지
+error_ip_level_options = [
+    {'label': '개별 IP', 'value': 32},
+    {'label': '/24 대역', 'value': 24},
+    {'label': '/16 대역', 'value': 16}
+]
+
 def create_error_ip_table(error_type):
     """오류 IP 테이블 컴포넌트를 생성합니다."""
     return html.Div([
@@ -79,6 +89,7 @@ def create_error_ip_table(error_type):
                     {"name": "순위", "id": "rank"},
                     {"name": "IP 주소", "id": "ip"},
                     {"name": "요청 수", "id": "count"},
+                    {"name": "IP 수", "id": "ip_count"},
                     {"name": "국가/지역", "id": "geo"}
                 ],
                 style_table={"overflowX": "auto"},
@@ -226,11 +237,25 @@ def create_error_search_section():
         }),
         # 검색 결과 테이블
         html.Div([
-            html.H4("검색 결과", style={"marginBottom": "10px"}),
+            html.Div([
+                html.H4("검색 결과", style={"marginBottom": "0"}),
+                # 검색 결과 전체 내보내기 (검색 후 표시)
+                html.Div([
+                    html.A("CSV 내보내기", id='log-search-export-csv', className="btn btn-outline-secondary btn-sm me-2"),
+                    html.A("Parquet 내보내기", id='log-search-export-parquet', className="btn btn-outline-secondary btn-sm")
+                ], id='log-search-export', style={"display": "none"})
+            ], style={
+                "display": "flex",
+                "justifyContent": "space-between",
+                "alignItems": "center",
+                "marginBottom": "10px"
+            }),
             dcc.Loading(
                 id="loading-log-search",
                 type="circle",
                 children=[
+                    # 검색 세션 ID (결과는 서버의 세션에 보관)
+                    dcc.Store(id='log-search-session'),
                     html.Div(
                         id="log-search-info",
                         style={
@@ -376,7 +401,9 @@ def create_management_layout():
                             )
                         ], style={"display": "inline-block"})
                     ], style={"display": "flex", "alignItems": "center", "marginTop": "5px"})
-                ])
+                ]),
+                # 상태 코드 패널들이 함께 쓰는 집계 데이터
+                dcc.Store(id='management-status-data')
             ], className="filter-container"),
             
             # 메인 차트 섹션
@@ -427,6 +454,16 @@ def create_management_layout():
                 create_error_search_section(),
                 html.Hr(style={"margin": "30px 0 20px 0"}),
                 html.H3("오류 발생 IP 분석", style={"marginBottom": "20px"}),
+                html.Div([
+                    html.Label("집계 단위", style={"marginBottom": "5px"}),
+                    dcc.Dropdown(
+                        id='error-ip-level',
+                        options=error_ip_level_options,
+                        value=32,
+                        clearable=False,
+                        style={"width": "200px"}
+                    )
+                ], style={"marginBottom": "20px"}),
                 dbc.Row([
                     dbc.Col([create_error_ip_table("4xx")], width=6),
                     dbc.Col([create_error_ip_table("5xx")], width=6)
@@ -435,33 +472,170 @@ def create_management_layout():
         ], className="page-container")
     ])
 
+def load_local_status_overview(start_date, end_date):
+    """로컬 저장소를 한 번만 읽어 상태 코드 패널 데이터를 Arrow에서 집계합니다 (pandas 변환은 오류 IP만)."""
+    table = scan_store(
+        ['status_code', 'timestamp_utc', 'ip', 'geo'],
+        (ds.field('day') >= start_date) & (ds.field('day') <= end_date)
+    )
+    status_group = pc.multiply(pc.divide(table['status_code'], 100), 100).cast(pa.int16())
+    table = table.append_column('status_group', status_group)
+    table = table.append_column('hour', pc.hour(table['timestamp_utc']).cast(pa.int32()))
+    
+    status_codes = (
+        table.group_by(['status_code', 'status_group']).aggregate([([], 'count_all')])
+        .rename_columns(['status_code', 'status_group', 'count'])
+        .sort_by([('status_code', 'ascending'), ('status_group', 'ascending')])
+        .to_pandas()
+    )
+    hourly = (
+        table.group_by(['hour', 'status_group']).aggregate([([], 'count_all')])
+        .rename_columns(['hour', 'status_group', 'count'])
+        .sort_by([('hour', 'ascending'), ('status_group', 'ascending')])
+        .to_pandas()
+    )
+    
+    # IP별 오류 건수를 한 번 만든 뒤 클래스마다 접두사 트라이로 /24, /16 합산
+    errors = table.filter(pc.is_in(table['status_group'], pa.array([400, 500], pa.int16())))
+    ip_counts = (
+        errors.group_by(['status_group', 'ip'], use_threads=False)
+        .aggregate([([], 'count_all'), ('geo', 'first')])
+        .rename_columns(['status_group', 'ip', 'count', 'geo'])
+        .sort_by([('status_group', 'ascending'), ('count', 'descending'), ('ip', 'ascending')])
+        .to_pandas()
+    )
+    ranked = []
+    for status_group, group in ip_counts.groupby('status_group'):
+        trie = build_prefix_trie(group)
+        for ip_level in IP_LEVELS:
+            if ip_level == 32:
+                # 개별 IP는 IPv6도 포함하도록 트라이를 거치지 않음
+                top = group.head(10).assign(ip_count=1)
+            else:
+                top = rank_ip_prefixes(trie, ip_level)
+            ranked.append(top.assign(status_group=status_group, ip_level=ip_level))
+    
+    columns = ['status_group', 'ip_level', 'ip', 'count', 'ip_count', 'geo']
+    error_ips = pd.concat(ranked)[columns] if ranked else pd.DataFrame(columns=columns)
+    return status_codes, hourly, error_ips
+
+def load_status_overview(start_date, end_date):
+    """
+    상태 코드 수, 시간대x상태 그룹 수, 오류 클래스별 상위 IP를 한 번의 쿼리로 조회합니다.
+    
+    GROUPING SETS로 상태 코드, 시간대, 오류 IP(개별 IP, /24, /16) 집계를 한 번의 스캔에서 만들고,
+    오류 IP는 QUALIFY로 클래스와 집계 단위별 상위 10개만 남깁니다.
+    """
+    if has_local_store():
+        return load_local_status_overview(start_date, end_date)
+    
+    query = f"""
+    WITH logs AS (
+        SELECT
+            CAST(status_code AS INT64) AS status_code,
+            CAST(FLOOR(status_code/100)*100 AS INT64) AS status_group,
+            EXTRACT(HOUR FROM timestamp_utc) AS hour,
+            IF(status_code >= 400 AND status_code < 600, ip, NULL) AS error_ip,
+            NET.SAFE_IP_FROM_STRING(IF(status_code >= 400 AND status_code < 600, ip, NULL)) AS error_ip_bytes,
+            geo
+        FROM
+            `dev-voice-457205-p8.lovi_dataset.lovi_datatable`
+        WHERE
+            DATE(timestamp_utc) BETWEEN '{start_date}' AND '{end_date}'
+    ),
+    prefixed AS (
+        SELECT
+            * EXCEPT (error_ip_bytes),
+            IF(BYTE_LENGTH(error_ip_bytes) = 4,
+               CONCAT(NET.IP_TO_STRING(NET.IP_TRUNC(error_ip_bytes, 24)), '/24'), NULL) AS error_prefix24,
+            IF(BYTE_LENGTH(error_ip_bytes) = 4,
+               CONCAT(NET.IP_TO_STRING(NET.IP_TRUNC(error_ip_bytes, 16)), '/16'), NULL) AS error_prefix16
+        FROM
+            logs
+    ),
+    grouped AS (
+        SELECT
+            status_group,
+            status_code,
+            hour,
+            COALESCE(error_ip, error_prefix24, error_prefix16) AS ip,
+            COUNT(*) AS count,
+            COUNT(DISTINCT error_ip) AS ip_count,
+            ANY_VALUE(geo) AS geo,
+            GROUPING(status_code) = 0 AS is_status_code,
+            GROUPING(hour) = 0 AS is_hourly,
+            CASE
+                WHEN GROUPING(error_ip) = 0 THEN 32
+                WHEN GROUPING(error_prefix24) = 0 THEN 24
+                WHEN GROUPING(error_prefix16) = 0 THEN 16
+            END AS ip_level
+        FROM
+            prefixed
+        GROUP BY
+            GROUPING SETS (
+                (status_group, status_code),
+                (status_group, hour),
+                (status_group, error_ip),
+                (status_group, error_prefix24),
+                (status_group, error_prefix16)
+            )
+    )
+    SELECT
+        *
+    FROM
+        grouped
+    WHERE
+        ip_level IS NULL OR ip IS NOT NULL
+    QUALIFY
+        ip_level IS NULL
+        OR ROW_NUMBER() OVER (PARTITION BY ip_level, status_group ORDER BY count DESC) <= 10
+    """
+    
+    df = load_bigquery_data(query)
+    if df is None:
+        return None
+    
+    status_codes = df[df['is_status_code']][['status_code', 'status_group', 'count']]
+    hourly = df[df['is_hourly']][['hour', 'status_group', 'count']]
+    error_ips = df[df['ip_level'].notna()][['status_group', 'ip_level', 'ip', 'count', 'ip_count', 'geo']]
+    return status_codes, hourly, error_ips.sort_values(['status_group', 'ip_level', 'count'], ascending=[True, True, False])
+
 @callback(
-    Output('status-codes-store', 'children'),
+    Output('management-status-data', 'data'),
     [Input('management-start-date', 'date'),
      Input('management-end-date', 'date')]
 )
-def query_status_codes(start_date, end_date):
+def update_management_status_data(start_date, end_date):
+    """상태 코드 패널 6개가 함께 쓰는 데이터를 한 번만 조회해 저장합니다."""
     if not start_date or not end_date:
-        return str(initial_status_groups)
+        return None
     
-    query = f"""
-    SELECT 
-        FLOOR(status_code/100)*100 AS status_group,
-        COUNT(*) as count
-    FROM 
-        `dev-voice-457205-p8.lovi_dataset.lovi_datatable`
-    WHERE 
-        DATE(timestamp_utc) BETWEEN '{start_date}' AND '{end_date}'
-    GROUP BY 
-        status_group
-    ORDER BY 
-        status_group
-    """
+    try:
+        overview = load_status_overview(start_date, end_date)
+        if overview is None:
+            return None
+        status_codes, hourly, error_ips = overview
+        return {
+            'status_codes': status_codes.astype({'status_code': int, 'status_group': int, 'count': int}).to_dict('records'),
+            'hourly': hourly.astype({'hour': int, 'status_group': int, 'count': int}).to_dict('records'),
+            'error_ips': error_ips.astype({'status_group': int, 'ip_level': int, 'count': int, 'ip_count': int}).to_dict('records')
+        }
+    except Exception as e:
+        print(f"Error in update_management_status_data: {str(e)}")
+        return None
+
+@callback(
+    Output('status-codes-store', 'children'),
+    [Input('management-status-data', 'data')]
+)
+def query_status_codes(status_data):
+    if status_data is None:
+        return str(initial_status_groups)
     
-    status_df = load_bigquery_data(query)
+    status_df = pd.DataFrame(status_data['status_codes'])
     
     if not status_df.empty:
-        status_groups = [int(x) for x in status_df['status_group'].tolist()]
+        status_groups = sorted(int(x) for x in status_df['status_group'].unique())
         
         # 1xx 상태 코드가 없는 경우 강제로 추가 (테스트용)
         if not any(sg for sg in status_groups if sg == 100):
@@ -595,32 +769,17 @@ def update_hourly_chart_mode(normal_clicks, log_clicks, normalize_clicks, curren
 
 @callback(
     Output('status-distribution-chart', 'figure'),
-    [Input('management-start-date', 'date'),
-     Input('management-end-date', 'date'),
+    [Input('management-status-data', 'data'),
      Input('pie-chart-mode', 'data')]
 )
-def update_status_distribution_chart(start_date, end_date, pie_mode):
-    if not start_date or not end_date:
+def update_status_distribution_chart(status_data, pie_mode):
+    if status_data is None:
         empty_fig = go.Figure().update_layout(title="날짜를 선택해주세요")
         return empty_fig
     
-    # 상태 코드 데이터 쿼리
-    query = f"""
-    SELECT
-        status_code,
-        FLOOR(status_code/100)*100 AS status_group,
-        COUNT(*) as count
-    FROM
-        `dev-voice-457205-p8.lovi_dataset.lovi_datatable`
-    WHERE
-        DATE(timestamp_utc) BETWEEN '{start_date}' AND '{end_date}'
-    GROUP BY
-        status_code, status_group
-    """
-    
     try:
-        df = load_bigquery_data(query)
-        if df is None or df.empty:
+        df = pd.DataFrame(status_data['status_codes'])
+        if df.empty:
             empty_fig = go.Figure().update_layout(title="선택한 기간에 데이터가 없습니다")
             return empty_fig
         
@@ -633,32 +792,17 @@ def update_status_distribution_chart(start_date, end_date, pie_mode):
 
 @callback(
     Output('hourly-status-chart', 'figure'),
-    [Input('management-start-date', 'date'),
-     Input('management-end-date', 'date'),
+    [Input('management-status-data', 'data'),
      Input('hourly-chart-mode', 'data')]
 )
-def update_hourly_status_chart(start_date, end_date, hourly_mode):
-    if not start_date or not end_date:
+def update_hourly_status_chart(status_data, hourly_mode):
+    if status_data is None:
         empty_fig = go.Figure().update_layout(title="날짜를 선택해주세요")
         return empty_fig
     
-    # 시간별 데이터 쿼리
-    query = f"""
-    SELECT
-        EXTRACT(HOUR FROM timestamp_utc) as hour,
-        FLOOR(status_code/100)*100 AS status_group,
-        COUNT(*) as count
-    FROM
-        `dev-voice-457205-p8.lovi_dataset.lovi_datatable`
-    WHERE
-        DATE(timestamp_utc) BETWEEN '{start_date}' AND '{end_date}'
-    GROUP BY
-        hour, status_group
-    """
-    
     try:
-        df = load_bigquery_data(query)
-        if df is None or df.empty:
+        df = pd.DataFrame(status_data['hourly'])
+        if df.empty:
             empty_fig = go.Figure().update_layout(title="선택한 기간에 데이터가 없습니다")
             return empty_fig
         
@@ -671,77 +815,12 @@ def update_hourly_status_chart(start_date, end_date, hourly_mode):
 
 def create_status_distribution_chart(df, sorted_status_codes, chart_mode):
     """상태 코드 분포 차트를 생성합니다."""
-    # 상태 코드 그룹별로 집계
-    df['status_group_name'] = df['status_group'].apply(lambda x: f"{int(x//100)}xx")
-    
-    # 그룹별 집계 데이터 생성
-    group_df = df.groupby(['status_group_name', 'status_group'])['count'].sum().reset_index()
-    
-    # 각 그룹별 세부 상태 코드 정보 생성 (툴팁용)
-    status_details = {}
-    for group in group_df['status_group_name'].unique():
-        group_codes = df[df['status_group_name'] == group]
-        details = []
-        for _, row in group_codes.iterrows():
-            details.append(f"상태 코드 {row['status_code']}: {int(row['count']):,}건")
-        status_details[group] = "<br>".join(details)
+    # 그룹별 건수, 비율, 툴팁을 한 번에 계산
+    groups = prepare_status_groups(df, log_scale=(chart_mode == "log"))
     
     # 파이차트 생성
     fig = go.Figure()
-    
-    # 상태 코드 그룹 이름 및 색상 목록
-    labels = group_df['status_group_name'].tolist()
-    
-    # 각 그룹의 백분율 계산 (표시용)
-    total = group_df['count'].sum()
-    percentages = [(count / total) * 100 for count in group_df['count']]
-    
-    # 실제 차트에 사용할 값
-    values = group_df['count'].tolist()
-    
-    # 로그 스케일 적용 (로그 모드인 경우)
-    display_values = values.copy()
-    if chart_mode == "log":
-        display_values = [max(1, val) for val in display_values]
-        display_values = [math.log10(val) for val in display_values]
-        min_val = min(display_values)
-        if min_val < 1:
-            display_values = [val - min_val + 1 for val in display_values]
-    
-    # 호버 텍스트 생성
-    hover_texts = []
-    for i, group in enumerate(labels):
-        original_count = group_df.loc[group_df['status_group_name'] == group, 'count'].values[0]
-        percentage = percentages[i]
-        
-        detail_text = f"<br><br>세부 상태 코드:<br>{status_details[group]}" if group in status_details else ""
-        
-        hover_texts.append(
-            f"<b>{group}</b><br>총 건수: {original_count:,} ({percentage:.1f}%){detail_text}"
-        )
-    
-    colors = [COLOR_MAP.get(group, '#CCCCCC') for group in labels]
-    
-    # 파이 차트에 표시할 텍스트 생성
-    text_template = '%{label}<br>%{text}%'
-    text_values = [f"{p:.1f}" for p in percentages]
-    
-    # 파이 차트 추가
-    fig.add_trace(go.Pie(
-        labels=labels,
-        values=display_values,
-        text=text_values,
-        texttemplate=text_template,
-        hovertemplate='%{customdata}<extra></extra>',
-        customdata=hover_texts,
-        textinfo='label+text',
-        marker_colors=colors,
-        hole=0.4,
-        sort=False,
-        direction='clockwise',
-        pull=[0.03] * len(labels),
-        textposition='inside'
-    ))
+    fig.add_trace(create_status_pie_trace(groups))
     
     # 차트 모드에 따른 제목 설정
     title_suffix = " (로그 스케일)" if chart_mode == "log" else ""
@@ -775,7 +854,7 @@ def create_hourly_status_chart(df, sorted_status_codes, chart_mode):
     hour_range = list(range(24))
     
     # 상태 코드 그룹별로 데이터 준비
-    df['status_group_name'] = df['status_group'].apply(lambda x: f"{int(x//100)}xx")
+    df['status_group_name'] = status_group_names(df['status_group'])
     
     # 피벗 테이블 생성
     pivot_df = df.pivot_table(
@@ -791,22 +870,20 @@ def create_hourly_status_chart(df, sorted_status_codes, chart_mode):
     
     fig = go.Figure()
     
+    # 백분율 모드인 경우 시간대별 합계로 한 번에 변환
+    value_df = pivot_df.drop(columns='hour')
+    if chart_mode == "percentage":
+        value_df = value_df.div(value_df.sum(axis=1), axis=0).mul(100).fillna(0)
+    
     # 각 상태 코드 그룹에 대한 바 추가
     for code in sorted_status_codes:
         group_name = f"{code[0]}xx"
-        if group_name in pivot_df.columns:
-            values = pivot_df[group_name]
-            
-            # 백분율 모드인 경우 데이터 변환
-            if chart_mode == "percentage":
-                row_sums = pivot_df[[col for col in pivot_df.columns if col != 'hour']].sum(axis=1)
-                values = (values / row_sums * 100).fillna(0)
-            
+        if group_name in value_df.columns:
             fig.add_trace(go.Bar(
                 x=pivot_df['hour'],
-                y=values,
+                y=value_df[group_name],
                 name=group_name,
-                marker_color=COLOR_MAP.get(group_name, '#CCCCCC')
+                marker_color=COLOR_MAP.get(group_name, DEFAULT_COLOR)
             ))
     
     # 차트 모드에 따른 제목 및 Y축 레이블 설정
@@ -853,65 +930,44 @@ def create_hourly_status_chart(df, sorted_status_codes, chart_mode):
     
     return fig
 
-def get_error_ip_data(start_date, end_date, error_type):
-    """오류 IP 데이터를 조회합니다."""
-    if not start_date or not end_date:
+def get_error_ip_data(status_data, error_type, ip_level=32):
+    """오류 IP 데이터를 공유 데이터에서 집계 단위별로 꺼냅니다."""
+    if status_data is None:
         return []
     
-    query = f"""
-    SELECT
-        ip,
-        COUNT(*) as request_count,
-        ANY_VALUE(geo) as geo
-    FROM
-        `dev-voice-457205-p8.lovi_dataset.lovi_datatable`
-    WHERE
-        DATE(timestamp_utc) BETWEEN '{start_date}' AND '{end_date}'
-        AND CAST(status_code AS INT64) BETWEEN {error_type}00 AND {error_type}99
-    GROUP BY
-        ip
-    ORDER BY
-        request_count DESC
-    LIMIT 10
-    """
-    
-    df = load_bigquery_data(query)
-    data = []
-    
-    if not df.empty:
-        for i, row in df.iterrows():
-            data.append({
-                "rank": i + 1,
-                "ip": row["ip"],
-                "count": f"{int(row['request_count']):,}",
-                "geo": row["geo"]
-            })
+    df = pd.DataFrame(status_data['error_ips'])
+    if df.empty:
+        return []
     
-    return data
+    df = df[(df['status_group'] == int(error_type) * 100) & (df['ip_level'] == int(ip_level))]
+    df = df.sort_values('count', ascending=False, kind='stable')
+    return pd.DataFrame({
+        "rank": range(1, len(df) + 1),
+        "ip": df['ip'].to_numpy(),
+        "count": format_counts(df['count']).to_numpy(),
+        "ip_count": format_counts(df['ip_count']).to_numpy(),
+        "geo": df['geo'].to_numpy()
+    }).to_dict('records')
 
 @callback(
     [Output('4xx-ips-table', 'data'),
      Output('5xx-ips-table', 'data')],
-    [Input('management-start-date', 'date'),
-     Input('management-end-date', 'date')]
+    [Input('management-status-data', 'data'),
+     Input('error-ip-level', 'value')]
 )
-def update_error_ip_tables(start_date, end_date):
-    if not start_date or not end_date:
+def update_error_ip_tables(status_data, ip_level):
+    if status_data is None:
         return [], []
     
-    data_4xx = get_error_ip_data(start_date, end_date, '4')
-    data_5xx = get_error_ip_data(start_date, end_date, '5')
+    data_4xx = get_error_ip_data(status_data, '4', ip_level or 32)
+    data_5xx = get_error_ip_data(status_data, '5', ip_level or 32)
     
     return data_4xx, data_5xx
 
 @callback(
-    [Output('log-search-table', 'data'),
-     Output('log-search-info', 'children'),
-     Output('log-search-table', 'page_count')],
-    [Input('log-search-button', 'n_clicks'),
-     Input('log-search-table', 'page_current'),
-     Input('log-search-table', 'page_size'),
-     Input('log-search-table', 'sort_by')],
+    [Output('log-search-session', 'data'),
+     Output('log-search-table', 'page_current')],
+    [Input('log-search-button', 'n_clicks')],
     [State('log-search-start-date', 'date'),
      State('log-search-start-time', 'value'),
      State('log-search-end-date', 'date'),
@@ -921,112 +977,120 @@ def update_error_ip_tables(start_date, end_date):
      State('log-search-geo', 'value'),
      State('log-search-user-agent', 'value')]
 )
-def update_log_search_table(n_clicks, page_current, page_size, sort_by, 
-                          start_date, start_time, end_date, end_time, 
-                          ip_filter, url_filter, geo_filter, user_agent_filter):
-    if not n_clicks:
-        return [], "", 0
-    
-    if not start_date or not end_date:
-        return [], "", 0
+def start_log_search(n_clicks, start_date, start_time, end_date, end_time,
+                     ip_filter, url_filter, geo_filter, user_agent_filter):
+    """검색 조건으로 결과를 한 번만 만들고 검색 세션 ID를 저장합니다."""
+    if not n_clicks or not start_date or not end_date:
+        return None, 0
     
     # 날짜와 시간을 결합하여 timestamp 생성 (UTC 기준)
     start_datetime = f"{start_date} {start_time}:00.000000 UTC"
     end_datetime = f"{end_date} {end_time}:59.999999 UTC"
     
-    # 검색 조건 생성
-    conditions = [
-        f"timestamp_utc >= '{start_datetime}'",
-        f"timestamp_utc <= '{end_datetime}'"
-    ]
-    
-    # 추가 검색 조건
-    if ip_filter:
-        conditions.append(f"LOWER(ip) LIKE LOWER('%{ip_filter}%')")
-    if url_filter:
-        conditions.append(f"LOWER(url) LIKE LOWER('%{url_filter}%')")
-    if geo_filter:
-        conditions.append(f"LOWER(geo) LIKE LOWER('%{geo_filter}%')")
-    if user_agent_filter:
-        conditions.append(f"""(
-            LOWER(user_browser) LIKE LOWER('%{user_agent_filter}%')
-            OR LOWER(user_os) LIKE LOWER('%{user_agent_filter}%')
-            OR LOWER(user_agent) LIKE LOWER('%{user_agent_filter}%')
-        )""")
-    
-    # WHERE 절 생성
-    where_clause = " AND ".join(conditions)
-    
-    # 정렬 조건
-    order_by = "timestamp_utc DESC"  # 기본 정렬
-    if sort_by:
-        sort = sort_by[0]
-        column = sort['column_id']
-        direction = "DESC" if sort['direction'] == 'desc' else "ASC"
+    try:
+        if has_local_store():
+            # 로컬 저장소는 트라이그램 인덱스로 검색한 Arrow 테이블을 세션에 보관
+            table = search_logs(
+                pd.Timestamp(f"{start_date} {start_time}:00", tz='UTC'),
+                pd.Timestamp(f"{end_date} {end_time}:59.999999", tz='UTC'),
+                {'ip': ip_filter, 'url': url_filter, 'geo': geo_filter, 'user_agent': user_agent_filter},
+                SEARCH_RESULT_COLUMNS
+            )
+            return create_search_session(LocalSearchSession(table)), 0
         
-        # 컬럼명 매핑
-        column_mapping = {
-            'timestamp': 'timestamp_utc',
-            'status_code': 'CAST(status_code AS INT64)',
-            'ip': 'ip',
-            'url': 'url',
-            'geo': 'geo',
-            'http_method': 'http_method',
-            'user_browser': 'user_browser',
-            'user_os': 'user_os',
-            'user_is_mobile': 'user_is_mobile',
-            'user_is_bot': 'user_is_bot'
-        }
+        # 검색 조건 생성
+        conditions = [
+            f"timestamp_utc >= '{start_datetime}'",
+            f"timestamp_utc <= '{end_datetime}'"
+        ]
         
-        if column in column_mapping:
-            order_by = f"{column_mapping[column]} {direction}"
-    
-    try:
-        # 최근 1000개 데이터 조회
+        # 추가 검색 조건
+        if ip_filter:
+            conditions.append(f"LOWER(ip) LIKE LOWER('%{ip_filter}%')")
+        if url_filter:
+            conditions.append(f"LOWER(url) LIKE LOWER('%{url_filter}%')")
+        if geo_filter:
+            conditions.append(f"LOWER(geo) LIKE LOWER('%{geo_filter}%')")
+        if user_agent_filter:
+            conditions.append(f"""(
+                LOWER(user_browser) LIKE LOWER('%{user_agent_filter}%')
+                OR LOWER(user_os) LIKE LOWER('%{user_agent_filter}%')
+                OR LOWER(user_agent) LIKE LOWER('%{user_agent_filter}%')
+            )""")
+        
+        # WHERE 절 생성
+        where_clause = " AND ".join(conditions)
+        
+        # 필터 쿼리는 여기서 한 번만 실행하고 결과 테이블을 세션이 가리킴
         data_query = f"""
         SELECT
-            ip,
-            status_code,
-            timestamp_utc as timestamp,
-            url,
-            geo,
-            http_method,
-            user_agent,
-            user_browser,
-            user_os,
-            user_is_mobile,
-            user_is_bot
+            {', '.join(SEARCH_RESULT_COLUMNS)}
         FROM
             `dev-voice-457205-p8.lovi_dataset.lovi_datatable`
         WHERE
             {where_clause}
-        ORDER BY
-            {order_by}
-        LIMIT 1000
         """
-        
-        df = load_bigquery_data(data_query)
-        if df is None or df.empty:
-            return [], "검색 결과가 없습니다.", 0
+        return create_search_session(BigQuerySearchSession(data_query)), 0
+    except Exception as e:
+        print(f"Error in start_log_search: {str(e)}")
+        return None, 0
+
+@callback(
+    [Output('log-search-export-csv', 'href'),
+     Output('log-search-export-parquet', 'href'),
+     Output('log-search-export', 'style')],
+    [Input('log-search-session', 'data')]
+)
+def update_log_search_export_links(session_id):
+    """검색 세션의 전체 결과를 내려받는 링크를 설정합니다."""
+    if not session_id:
+        return None, None, {"display": "none"}
+    return (
+        f"/export/logs?session={session_id}&format=csv",
+        f"/export/logs?session={session_id}&format=parquet",
+        {"display": "block"}
+    )
+
+@callback(
+    [Output('log-search-table', 'data'),
+     Output('log-search-info', 'children'),
+     Output('log-search-table', 'page_count')],
+    [Input('log-search-session', 'data'),
+     Input('log-search-table', 'page_current'),
+     Input('log-search-table', 'page_size'),
+     Input('log-search-table', 'sort_by')],
+    [State('log-search-button', 'n_clicks')]
+)
+def update_log_search_table(session_id, page_current, page_size, sort_by, n_clicks):
+    """검색 세션에서 현재 페이지만 가져옵니다."""
+    if not n_clicks:
+        return [], "", 0
+    
+    session = get_search_session(session_id)
+    if session is None:
+        return [], "검색 세션이 만료되었습니다. 다시 검색해 주세요.", 0
+    
+    total_count = session.total_count
+    if total_count == 0:
+        return [], "검색 결과가 없습니다.", 0
+    
+    try:
+        sort_column, descending = parse_sort_by(sort_by, SEARCH_SORT_COLUMNS)
+        df = session.get_page(page_current or 0, page_size, sort_column, descending)
         
         # 데이터 포맷팅
+        df = df.rename(columns={'timestamp_utc': 'timestamp'})
         df['timestamp'] = pd.to_datetime(df['timestamp']).dt.strftime('%Y-%m-%d %H:%M:%S')
         
-        # 현재 페이지의 데이터 추출
-        start_idx = page_current * page_size
-        end_idx = min((page_current + 1) * page_size, len(df))
-        current_page_data = df.iloc[start_idx:end_idx]
-        
         # 페이지네이션 정보
-        total_count = len(df)
-        start_idx = page_current * page_size + 1
-        end_idx = min((page_current + 1) * page_size, total_count)
-        info_text = f"최근 {total_count:,}개 데이터 중 {start_idx:,} - {end_idx:,}건 표시"
+        start_idx = (page_current or 0) * page_size + 1
+        end_idx = min(start_idx + page_size - 1, total_count)
+        info_text = f"전체 {total_count:,}건 중 {start_idx:,} - {end_idx:,}건 표시"
         
         # 총 페이지 수 계산 (올림 처리)
         page_count = (total_count + page_size - 1) // page_size
         
-        return current_page_data.to_dict('records'), info_text, page_count
+        return df.to_dict('records'), info_text, page_count
     except Exception as e:
         print(f"Error in update_log_search_table: {str(e)}")
         return [], f"오류가 발생했습니다: {str(e)}", 0
@@ -1036,34 +1100,19 @@ def update_log_search_table(n_clicks, page_current, page_size, sort_by,
      Output("3xx-count", "children"),
      Output("4xx-count", "children"),
      Output("5xx-count", "children")],
-    [Input('management-start-date', 'date'),
-     Input('management-end-date', 'date')]
+    [Input('management-status-data', 'data')]
 )
-def update_status_code_counts(start_date, end_date):
-    if not start_date or not end_date:
+def update_status_code_counts(status_data):
+    if status_data is None:
         return "0", "0", "0", "0"
     
-    query = f"""
-    SELECT
-        FLOOR(status_code/100)*100 AS status_group,
-        COUNT(*) as count
-    FROM
-        `dev-voice-457205-p8.lovi_dataset.lovi_datatable`
-    WHERE
-        DATE(timestamp_utc) BETWEEN '{start_date}' AND '{end_date}'
-    GROUP BY
-        status_group
-    ORDER BY
-        status_group
-    """
-    
     try:
-        df = load_bigquery_data(query)
-        if df is None or df.empty:
+        df = pd.DataFrame(status_data['status_codes'])
+        if df.empty:
             return "0", "0", "0", "0"
         
         # 상태 코드 그룹별 카운트 추출
-        counts = {int(row['status_group']): f"{int(row['count']):,}" for _, row in df.iterrows()}
+        counts = format_counts(df.groupby('status_group')['count'].sum()).to_dict()
         
         return (
             counts.get(200, "0"),  # 2xx
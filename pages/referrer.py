@@ -1,12 +1,16 @@
 import dash_bootstrap_components as dbc
 from dash import Dash, html, dcc, Output, Input, callback
-import pandas as pd
 import plotly.express as px
 import os
 from dotenv import load_dotenv
 import plotly.graph_objects as go
 import numpy as np
 from utils.utils import load_bigquery_data, get_bigquery_config
+from utils.referrer_utils import (
+    CHANNEL_IDS, CHANNEL_ID_LABELS, LABEL_CHANNEL_IDS
+)
+from utils.keyword_utils import KEYWORD_TABLE_SUFFIX
+from utils.url_utils import URL_TEMPLATE_TABLE_SUFFIX, has_url_templates
 
 # 환경변수 로드
 load_dotenv()
@@ -35,9 +39,6 @@ COLOR_SCHEME = {
     'text': '#2c3e50'        # 텍스트 색상
 }
 
-#load_data
-DEFAULT_LIMIT = 10000
-
 # 로딩 컴포넌트
 loading_component = dbc.Spinner(
     html.Div(id="loading-output"),
@@ -73,180 +74,30 @@ def get_date_range():
     except Exception as e:
         return None, None
 
-def load_referrer_data(start_date=None, end_date=None, limit=DEFAULT_LIMIT):
-    """유입 경로 분석을 위한 데이터를 로드합니다.
-    
-    Args:
-        start_date (str, optional): 시작 날짜 (YYYY-MM-DD 형식)
-        end_date (str, optional): 종료 날짜 (YYYY-MM-DD 형식)
-        limit (int, optional): 데이터 로드 제한 수
+def load_channel_counts(start_date, end_date, group_by_date=False):
+    """선택된 기간의 채널(channel_id)별 유입 수를 조회합니다."""
+    date_column = "DATE(timestamp_utc) as visit_date," if group_by_date else ""
+    date_group = "visit_date," if group_by_date else ""
+    query = f"""
+    SELECT 
+        {date_column}
+        channel_id,
+        COUNT(*) as count
+    FROM `{project_id}.{dataset}.{table}`
+    WHERE DATE(timestamp_utc) BETWEEN '{start_date}' AND '{end_date}'
+    GROUP BY {date_group} channel_id
     """
-    try:
-        # 기본 쿼리
-        base_query = f"""
-        SELECT 
-            timestamp_utc,
-            referrer_domain,
-            url
-        FROM `{project_id}.{dataset}.{table}`
-        """
-        
-        # 날짜 필터 조건 추가
-        where_conditions = []
-        if start_date:
-            where_conditions.append(f"DATE(timestamp_utc) >= '{start_date}'")
-        if end_date:
-            where_conditions.append(f"DATE(timestamp_utc) <= '{end_date}'")
-        
-        if where_conditions:
-            base_query += "\nWHERE " + " AND ".join(where_conditions)
-        
-        # 정렬 및 제한
-        query = base_query + "\nORDER BY timestamp_utc DESC"
-        
-        # limit이 None이 아닐 때만 LIMIT 절 추가
-        if limit is not None:
-            query += f"\nLIMIT {limit}"
-        
-        # utils.py의 load_bigquery_data 함수 사용
-        df = load_bigquery_data(query)
-        
-        if df is not None and not df.empty:
-            # timestamp_utc를 datetime으로 변환
-            if 'timestamp_utc' in df.columns:
-                df['timestamp_utc'] = pd.to_datetime(df['timestamp_utc'])
-        
-        return df
-    except Exception as e:
-        print(f"데이터 로드 중 오류 발생: {str(e)}")
-        return None
-
-# 유입 채널 분류 정의
-REFERRER_CHANNELS = {
-    'social': [
-        'facebook.com', 'instagram.com', 'twitter.com', 'linkedin.com',
-        't.co', 'fb.com', 'lnkd.in', 'social.com'
-    ],
-    'search': [
-        'google.com', 'naver.com', 'daum.net', 'bing.com',
-        'yahoo.com', 'duckduckgo.com'
-    ],
-    'direct': ['direct', '(direct)', '', None, 'zanbil.ir', 'znbl.ir', 'www.zanbil.ir', 'www.znbl.ir'],
-}
-
-def classify_referrer(domain):
-    """referrer_domain을 채널별로 분류"""
-    if domain in REFERRER_CHANNELS['direct']:
-        return '직접 접속'
-    
-    # 도메인에서 서브도메인 제거 (예: blog.example.com -> example.com)
-    base_domain = '.'.join(domain.split('.')[-2:]) if domain and '.' in domain else domain
-    
-    for channel, domains in REFERRER_CHANNELS.items():
-        if any(ref in base_domain for ref in domains):
-            if channel == 'social':
-                return '소셜 미디어'
-            elif channel == 'search':
-                return '검색 엔진'
-    
-    return '기타'
-
-def analyze_referrer_data(df):
-    """유입 경로 데이터를 분석하여 통계를 생성합니다."""
-    if df is None:
-        print("데이터가 없습니다.")
-        return None
-
-    # 필요한 컬럼 추출
-    required_columns = ['timestamp_utc', 'referrer_domain', 'url']
-    
-    # 컬럼 존재 여부 확인
-    missing_columns = [col for col in required_columns if col not in df.columns]
-    if missing_columns:
-        print(f"필수 컬럼 누락: {missing_columns}")
-        return None
-
-    # 데이터 복사 (원본 데이터 보호)
-    referrer_df = df[required_columns].copy()
-    
-    # 채널 분류 추가
-    referrer_df['channel'] = referrer_df['referrer_domain'].apply(classify_referrer)
-    
-    # 1. 일별 유입 수 계산 (채널별)
-    daily_stats = referrer_df.groupby([referrer_df['timestamp_utc'].dt.date, 'channel']).size().unstack(fill_value=0)
-    
-    # 2. 도메인별 유입 수 계산 (TOP 10)
-    domain_stats = referrer_df.groupby(['referrer_domain', 'channel']).size().reset_index(name='count')
-    domain_stats = domain_stats.sort_values('count', ascending=False)
-    domain_stats = domain_stats[domain_stats['referrer_domain'].notna()]  # None 값 제외
-    top_domains = domain_stats.head(10)
-    
-    # 3. 채널별 유입 수 계산
-    channel_stats = referrer_df['channel'].value_counts()
-    
-    # 4. URL별 유입 수 계산 (TOP 10)
-    url_stats = referrer_df['url'].value_counts().head(10)
-
-    return {
-        'daily_stats': daily_stats,
-        'domain_stats': top_domains,
-        'channel_stats': channel_stats,
-        'url_stats': url_stats,
-        'date_range': {
-            'start': referrer_df['timestamp_utc'].min().date(),
-            'end': referrer_df['timestamp_utc'].max().date()
-        }
-    }
-
-def filter_data(df, start_date=None, end_date=None, channel=None):
-    """데이터 필터링 함수"""
-    if df is None:
-        return None
-        
-    filtered_df = df.copy()
-    
-    # 날짜 필터링
-    if start_date:
-        filtered_df = filtered_df[filtered_df['timestamp_utc'].dt.date >= pd.to_datetime(start_date).date()]
-    if end_date:
-        filtered_df = filtered_df[filtered_df['timestamp_utc'].dt.date <= pd.to_datetime(end_date).date()]
-    
-    # 채널 분류 추가
-    filtered_df['channel'] = filtered_df['referrer_domain'].apply(classify_referrer)
-    
-    # 채널 필터링
-    if channel and channel != 'all':
-        filtered_df = filtered_df[filtered_df['channel'] == channel]
-    
-    return filtered_df
+    return load_bigquery_data(query)
 
 def load_referrer_counts(start_date, end_date, channel='all'):
     """선택된 기간과 채널의 유입 수를 계산합니다."""
     try:
-        # 기본 쿼리
-        base_query = f"""
-        SELECT 
-            COUNT(*) as total_count,
-            COUNTIF(referrer_domain IS NULL OR referrer_domain = '') as direct_count,
-            COUNTIF(referrer_domain LIKE '%facebook.com%' OR referrer_domain LIKE '%instagram.com%' OR referrer_domain LIKE '%twitter.com%' OR referrer_domain LIKE '%linkedin.com%') as social_count,
-            COUNTIF(referrer_domain LIKE '%google.com%' OR referrer_domain LIKE '%naver.com%' OR referrer_domain LIKE '%daum.net%' OR referrer_domain LIKE '%bing.com%') as search_count
-        FROM `{project_id}.{dataset}.{table}`
-        WHERE DATE(timestamp_utc) BETWEEN '{start_date}' AND '{end_date}'
-        """
-        
-        df = load_bigquery_data(base_query)
+        df = load_channel_counts(start_date, end_date)
         
         if df is not None and not df.empty:
             if channel == 'all':
-                return df['total_count'].iloc[0]
-            elif channel == '직접 접속':
-                return df['direct_count'].iloc[0]
-            elif channel == '소셜 미디어':
-                return df['social_count'].iloc[0]
-            elif channel == '검색 엔진':
-                return df['search_count'].iloc[0]
-            else:  # 기타
-                return df['total_count'].iloc[0] - (df['direct_count'].iloc[0] + df['social_count'].iloc[0] + df['search_count'].iloc[0])
+                return int(df['count'].sum())
+            return int(df.loc[df['channel_id'] == LABEL_CHANNEL_IDS[channel], 'count'].sum())
         return 0
     except Exception as e:
         return 0
@@ -374,6 +225,19 @@ def create_referrer_layout():
             ]),
             className="mb-3"
         ),
+        
+        # 하단 섹션: 인기 검색 키워드
+        dbc.Card(
+            dbc.CardBody([
+                html.H4("인기 검색 키워드", className="card-title"),
+                dcc.Loading(
+                    id="loading-top-keywords",
+                    type="circle",
+                    children=dcc.Graph(id='top-keywords-graph')
+                )
+            ]),
+            className="mb-3"
+        ),
     ])
 
 @callback(
@@ -393,43 +257,24 @@ def update_total_referrers(start_date, end_date, channel):
 def load_daily_referrer_stats(start_date, end_date, channel='all'):
     """선택된 기간의 일별 유입 통계를 계산합니다."""
     try:
-        # 기본 쿼리
-        base_query = f"""
-        WITH daily_stats AS (
-            SELECT 
-                DATE(timestamp_utc) as visit_date,
-                COUNT(*) as total_count,
-                COUNTIF(referrer_domain IS NULL OR referrer_domain = '') as direct_count,
-                COUNTIF(referrer_domain LIKE '%facebook.com%' OR referrer_domain LIKE '%instagram.com%' OR referrer_domain LIKE '%twitter.com%' OR referrer_domain LIKE '%linkedin.com%') as social_count,
-                COUNTIF(referrer_domain LIKE '%google.com%' OR referrer_domain LIKE '%naver.com%' OR referrer_domain LIKE '%daum.net%' OR referrer_domain LIKE '%bing.com%') as search_count,
-                COUNT(*) - (
-                    COUNTIF(referrer_domain IS NULL OR referrer_domain = '') +
-                    COUNTIF(referrer_domain LIKE '%facebook.com%' OR referrer_domain LIKE '%instagram.com%' OR referrer_domain LIKE '%twitter.com%' OR referrer_domain LIKE '%linkedin.com%') +
-                    COUNTIF(referrer_domain LIKE '%google.com%' OR referrer_domain LIKE '%naver.com%' OR referrer_domain LIKE '%daum.net%' OR referrer_domain LIKE '%bing.com%')
-                ) as others_count
-            FROM `{project_id}.{dataset}.{table}`
-            WHERE DATE(timestamp_utc) BETWEEN '{start_date}' AND '{end_date}'
-            GROUP BY visit_date
-        )
-        SELECT 
-            visit_date,
-            direct_count,
-            social_count,
-            search_count,
-            others_count
-        FROM daily_stats
-        ORDER BY visit_date
-        """
-        
-        df = load_bigquery_data(base_query)
+        df = load_channel_counts(start_date, end_date, group_by_date=True)
         
         if df is not None and not df.empty:
+            # 날짜 x 채널 피벗 (없는 채널은 0)
+            daily_df = df.pivot_table(
+                values='count',
+                index='visit_date',
+                columns='channel_id',
+                aggfunc='sum',
+                fill_value=0
+            ).reindex(columns=list(CHANNEL_ID_LABELS), fill_value=0).sort_index()
+            
             return {
-                'dates': df['visit_date'].astype(str).tolist(),
-                'direct': df['direct_count'].tolist(),
-                'social': df['social_count'].tolist(),
-                'search': df['search_count'].tolist(),
-                'others': df['others_count'].tolist()
+                'dates': daily_df.index.astype(str).tolist(),
+                'direct': daily_df[CHANNEL_IDS['direct']].tolist(),
+                'social': daily_df[CHANNEL_IDS['social']].tolist(),
+                'search': daily_df[CHANNEL_IDS['search']].tolist(),
+                'others': daily_df[CHANNEL_IDS['others']].tolist()
             }
         return None
     except Exception as e:
@@ -526,21 +371,22 @@ def update_daily_referrers_graph(start_date, end_date, channel):
 def load_top_referrers(start_date, end_date, channel='all'):
     """선택된 기간의 TOP 유입 경로를 계산합니다."""
     try:
-        # 기본 쿼리
+        # 채널 필터 조건 추가
+        channel_filter = ""
+        if channel != 'all':
+            channel_filter = f"AND channel_id = {LABEL_CHANNEL_IDS[channel]}"
+        
+        # 기본 쿼리 (서브도메인을 합친 등록 가능 도메인 기준)
         base_query = f"""
-        WITH referrer_stats AS (
-            SELECT 
-                referrer_domain,
-                COUNT(*) as count
-            FROM `{project_id}.{dataset}.{table}`
-            WHERE DATE(timestamp_utc) BETWEEN '{start_date}' AND '{end_date}'
-            GROUP BY referrer_domain
-        )
         SELECT 
-            referrer_domain,
-            count
-        FROM referrer_stats
-        WHERE referrer_domain IS NOT NULL AND referrer_domain != ''
+            registrable_domain as referrer_domain,
+            channel_id,
+            COUNT(*) as count
+        FROM `{project_id}.{dataset}.{table}`
+        WHERE DATE(timestamp_utc) BETWEEN '{start_date}' AND '{end_date}'
+        AND registrable_domain IS NOT NULL
+        {channel_filter}
+        GROUP BY registrable_domain, channel_id
         ORDER BY count DESC
         LIMIT 10
         """
@@ -548,17 +394,10 @@ def load_top_referrers(start_date, end_date, channel='all'):
         df = load_bigquery_data(base_query)
         
         if df is not None and not df.empty:
-            # 채널 분류 추가
-            df['channel'] = df['referrer_domain'].apply(classify_referrer)
-            
-            # 채널 필터링
-            if channel != 'all':
-                df = df[df['channel'] == channel]
-            
             return {
                 'domains': df['referrer_domain'].tolist(),
                 'counts': df['count'].tolist(),
-                'channels': df['channel'].tolist()
+                'channels': df['channel_id'].map(CHANNEL_ID_LABELS).tolist()
             }
         return None
     except Exception as e:
@@ -618,33 +457,12 @@ def update_top_referrers_graph(start_date, end_date, channel):
 def load_channel_distribution(start_date, end_date):
     """선택된 기간의 채널별 유입 분포를 계산합니다."""
     try:
-        # 기본 쿼리
-        base_query = f"""
-        WITH channel_stats AS (
-            SELECT 
-                CASE 
-                    WHEN referrer_domain IS NULL OR referrer_domain = '' THEN '직접 접속'
-                    WHEN referrer_domain LIKE '%facebook.com%' OR referrer_domain LIKE '%instagram.com%' OR referrer_domain LIKE '%twitter.com%' OR referrer_domain LIKE '%linkedin.com%' THEN '소셜 미디어'
-                    WHEN referrer_domain LIKE '%google.com%' OR referrer_domain LIKE '%naver.com%' OR referrer_domain LIKE '%daum.net%' OR referrer_domain LIKE '%bing.com%' THEN '검색 엔진'
-                    ELSE '기타'
-                END as channel,
-                COUNT(*) as count
-            FROM `{project_id}.{dataset}.{table}`
-            WHERE DATE(timestamp_utc) BETWEEN '{start_date}' AND '{end_date}'
-            GROUP BY channel
-        )
-        SELECT 
-            channel,
-            count
-        FROM channel_stats
-        ORDER BY count DESC
-        """
-        
-        df = load_bigquery_data(base_query)
+        df = load_channel_counts(start_date, end_date)
         
         if df is not None and not df.empty:
+            df = df.sort_values('count', ascending=False)
             return {
-                'channels': df['channel'].tolist(),
+                'channels': df['channel_id'].map(CHANNEL_ID_LABELS).tolist(),
                 'counts': df['count'].tolist()
             }
         return None
@@ -714,25 +532,50 @@ def load_url_distribution(start_date, end_date, channel='all'):
     """선택된 기간의 TOP 유입 페이지를 계산합니다."""
     try:
         # 기본 쿼리
-        base_query = f"""
-        WITH page_stats AS (
+        if has_url_templates():
+            base_query = f"""
+            WITH page_stats AS (
+                -- 고유 경로가 아니라 작은 정수 템플릿 ID로 묶은 뒤 템플릿 이름만 조인
+                -- 아직 url_template_id가 채워지지 않은 행(다음 백필 전 적재분)은 원본 url_path로 묶음
+                SELECT 
+                    url_template_id,
+                    IF(url_template_id IS NULL, url_path, NULL) as raw_path,
+                    COUNT(*) as page_count
+                FROM `{project_id}.{dataset}.{table}`
+                WHERE DATE(timestamp_utc) BETWEEN '{start_date}' AND '{end_date}'
+                GROUP BY url_template_id, raw_path
+            )
             SELECT 
-                url_path,
-                COUNT(*) as count
-            FROM `{project_id}.{dataset}.{table}`
-            WHERE DATE(timestamp_utc) BETWEEN '{start_date}' AND '{end_date}'
-            AND url_path IS NOT NULL 
-            AND url_path != ''
-            AND url_path != '/'
+                COALESCE(t.url_template, p.raw_path) as url_path,
+                SUM(p.page_count) as count
+            FROM page_stats p
+            LEFT JOIN `{project_id}.{dataset}.{table}{URL_TEMPLATE_TABLE_SUFFIX}` t USING (url_template_id)
+            WHERE COALESCE(t.url_template, p.raw_path) NOT IN ('', '/')
             GROUP BY url_path
-        )
-        SELECT 
-            url_path,
-            count
-        FROM page_stats
-        ORDER BY count DESC
-        LIMIT 10
-        """
+            ORDER BY count DESC
+            LIMIT 10
+            """
+        else:
+            # 템플릿 백필 전 테이블(url_template_id 컬럼이나 템플릿 차원 테이블이 없음)은 원본 url_path로 묶음
+            base_query = f"""
+            WITH page_stats AS (
+                SELECT 
+                    url_path,
+                    COUNT(*) as count
+                FROM `{project_id}.{dataset}.{table}`
+                WHERE DATE(timestamp_utc) BETWEEN '{start_date}' AND '{end_date}'
+                AND url_path IS NOT NULL 
+                AND url_path != ''
+                AND url_path != '/'
+                GROUP BY url_path
+            )
+            SELECT 
+                url_path,
+                count
+            FROM page_stats
+            ORDER BY count DESC
+            LIMIT 10
+            """
         
         df = load_bigquery_data(base_query)
         
@@ -815,21 +658,68 @@ def update_url_distribution(start_date, end_date, channel):
     
     return fig
 
+def load_top_keywords(start_date, end_date, limit=20):
+    """선택된 기간의 인기 검색 키워드를 일별 키워드 집계 테이블에서 계산합니다."""
+    try:
+        query = f"""
+        SELECT 
+            keyword,
+            SUM(count) as count
+        FROM `{project_id}.{dataset}.{table}{KEYWORD_TABLE_SUFFIX}`
+        WHERE day BETWEEN '{start_date}' AND '{end_date}'
+        GROUP BY keyword
+        ORDER BY count DESC
+        LIMIT {limit}
+        """
+        
+        df = load_bigquery_data(query)
+        
+        if df is not None and not df.empty:
+            return {
+                'keywords': df['keyword'].tolist(),
+                'counts': df['count'].tolist()
+            }
+        return None
+    except Exception as e:
+        return None
+
+@callback(
+    Output('top-keywords-graph', 'figure'),
+    [Input('date-range', 'start_date'),
+     Input('date-range', 'end_date')]
+)
+def update_top_keywords_graph(start_date, end_date):
+    """인기 검색 키워드 그래프를 업데이트합니다."""
+    if not start_date or not end_date:
+        return go.Figure()
+    
+    stats = load_top_keywords(start_date, end_date)
+    
+    if stats is None:
+        return go.Figure()
+    
+    fig = go.Figure(go.Bar(
+        y=stats['keywords'],
+        x=stats['counts'],
+        orientation='h',
+        marker_color=COLOR_SCHEME['검색 엔진'],
+        hovertemplate="<b>%{y}</b><br>검색 수: %{x:,}<extra></extra>"
+    ))
+    
+    fig.update_layout(
+        title='인기 검색 키워드',
+        xaxis_title='검색 수',
+        plot_bgcolor=COLOR_SCHEME['background'],
+        paper_bgcolor=COLOR_SCHEME['background'],
+        font=dict(color=COLOR_SCHEME['text']),
+        margin=dict(l=50, r=50, t=50, b=50),
+        yaxis=dict(
+            autorange='reversed'  # 가장 많이 검색된 키워드가 위에 오도록 함
+        ),
+        height=500
+    )
+    
+    return fig
+
 # 페이지 레이아웃 정의
 layout = create_referrer_layout()
-
-# 데이터 로드
-df = load_referrer_data()
-if df is not None:
-    # 날짜 범위 설정
-    min_date = df['timestamp_utc'].min().date()
-    max_date = df['timestamp_utc'].max().date()
-    
-    # 날짜 범위로 데이터 필터링
-    df = df[(df['timestamp_utc'].dt.date >= min_date) & (df['timestamp_utc'].dt.date <= max_date)]
-    
-    analysis_results = analyze_referrer_data(df)
-else:
-    analysis_results = None
-    min_date = None
-    max_date = None
@@ -5,7 +5,6 @@ import plotly.express as px
 import os
 import pandas_gbq
 from dotenv import load_dotenv
-import pycountry
 import pycountry_convert as pc
 import plotly.graph_objects as go
 
@@ -31,51 +30,31 @@ def get_continent(country_name):
     except:
         return None
 
-def country_to_iso3(country_name):
-    try:
-        return pycountry.countries.lookup(country_name).alpha_3
-    except LookupError:
-        return None
-
 # [1] 전역변수
 # 전체 query 사용시 limit 추가 필수
 # 일반적인 경우 where 조건 추가하여 호출
 # (어차피 데이터 양이 많아서 전체 데이터 조회 시 쿼리 중간에 터짐)
 
-# 국가(이름 구체), 도시 형태로 되어있어 국가이름만 추출하는 sql쿼리
+# 국가/도시/ISO 코드는 적재 시 geo 컬럼에서 파싱해 둔 컬럼 사용 (utils/geo_utils.py)
 query = f"""
-WITH base_data AS (
-  SELECT 
-    TRIM(SPLIT(REGEXP_REPLACE(geo, r'[[:space:]]*\([^)]*\)', ''), ',')[OFFSET(0)]) AS country,
-    TRIM(SPLIT(REGEXP_REPLACE(geo, r'[[:space:]]*\([^)]*\)', ''), ',')[OFFSET(1)]) AS city,
-    day,
-    user_is_bot
-  FROM `{project_id}.{dataset}.{table}`
-  WHERE geo IS NOT NULL  -- NULL 값 제외
-    AND geo != '-'
-    AND geo != ''              -- 빈 문자열 제외
-  --LIMIT 1000 --테스트 시 limit해주기
-),
-
-aggregated_data AS (
-  SELECT 
-    country,
-    city,
-    day,
-    user_is_bot,
-    COUNT(*) as count
-  FROM base_data
-  GROUP BY country, city, day, user_is_bot
-)
-
-SELECT *
-FROM aggregated_data
+SELECT 
+  country,
+  city,
+  iso3 AS iso_alpha,
+  day,
+  user_is_bot,
+  COUNT(*) as count
+FROM `{project_id}.{dataset}.{table}`
+WHERE country IS NOT NULL
+GROUP BY country, city, iso_alpha, day, user_is_bot
 ORDER BY count DESC
+--LIMIT 1000 --테스트 시 limit해주기
 """
 
 df = pandas_gbq.read_gbq(query, project_id=project_id)
-df['iso_alpha'] = df['country'].apply(country_to_iso3)
-df['continent'] = df['country'].apply(get_continent)
+# 대륙은 고유 국가 단위로만 변환
+continents = {country: get_continent(country) for country in df['country'].unique()}
+df['continent'] = df['country'].map(continents)
 df = df.dropna(subset=['iso_alpha'])
 
 # 날짜 범위 추출
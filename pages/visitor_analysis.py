@@ -8,7 +8,16 @@ import pandas_gbq
 from dotenv import load_dotenv
 import plotly.graph_objects as go
 import json
+from cachetools import TTLCache, cached
 from utils.utils import load_bigquery_data, get_bigquery_config
+from utils.visitor_utils import (
+    has_visitor_index, count_visitors, count_device_visitors, daily_visitor_stats, environment_cube,
+    cohort_retention
+)
+from utils.session_utils import SESSION_GAP_SECONDS, SESSION_DEPTH_LIMIT, has_session_index, session_depth_counts
+from utils.path_utils import EXIT_LABEL, has_path_index, entry_paths
+from utils.referrer_utils import CHANNEL_ID_LABELS
+from utils.url_utils import URL_TEMPLATE_TABLE_SUFFIX, has_url_templates
 
 # 환경변수 로드
 load_dotenv()
@@ -22,6 +31,15 @@ project_id = config['project_id']
 dataset = config['dataset']
 table = config['table']
 
+# 방문자 환경 집계 캐시 유지 시간 (초)
+ENVIRONMENT_CACHE_TTL = 600
+
+# 세션 집계 캐시 유지 시간 (초)
+SESSION_CACHE_TTL = 600
+
+# 페이지 이동 경로 Sankey에 표시할 첫 페이지/다음 페이지 수 (나머지는 '기타')
+PATH_SANKEY_LIMIT = 8
+
 # 색상 테마
 COLOR_SCHEME = {
     'total': '#6c757d',     # 전체 방문자 - 회색
@@ -163,8 +181,8 @@ def create_visitor_analysis_layout():
         metrics_cards,
         filtered_visitors_panel,
 
-        # dcc.Store 컴포넌트를 사용하여 데이터를 캐싱
-        dcc.Store(id='visitor-data'),
+        # dcc.Store 컴포넌트를 사용하여 데이터를 캐싱 (기간별 방문자 환경 집계, 기기 필터와 무관)
+        dcc.Store(id='environment-cube'),
 
         # 고정 섹션: 일별 방문자 수 그래프
         dbc.Card(
@@ -179,6 +197,60 @@ def create_visitor_analysis_layout():
             className="mb-3"
         ),
 
+        # 코호트 재방문율 섹션
+        dbc.Card(
+            dbc.CardBody([
+                html.H4("코호트 재방문율", className="card-title"),
+                html.Div("첫 방문일이 같은 방문자 중 며칠 뒤 다시 방문한 비율", className="text-muted mb-3"),
+                dcc.Loading(
+                    id="loading-cohort-retention",
+                    type="circle",
+                    children=dcc.Graph(id='cohort-retention-graph')
+                )
+            ]),
+            className="mb-3"
+        ),
+
+        # 세션 분석 섹션
+        dbc.Card(
+            dbc.CardBody([
+                html.H4("세션 분석", className="card-title"),
+                html.Div(f"같은 방문자의 요청 간격이 {SESSION_GAP_SECONDS // 60}분을 넘으면 새 세션으로 봅니다.", className="text-muted mb-3"),
+                dcc.Store(id='session-stats'),
+                dbc.Row([
+                    dbc.Col([
+                        dcc.Loading(
+                            id="loading-bounce-rate",
+                            type="circle",
+                            children=dcc.Graph(id='bounce-rate-graph')
+                        )
+                    ], width=6),
+                    dbc.Col([
+                        dcc.Loading(
+                            id="loading-session-depth",
+                            type="circle",
+                            children=dcc.Graph(id='session-depth-graph')
+                        )
+                    ], width=6),
+                ])
+            ]),
+            className="mb-3"
+        ),
+
+        # 페이지 이동 경로 섹션
+        dbc.Card(
+            dbc.CardBody([
+                html.H4("페이지 이동 경로", className="card-title"),
+                html.Div("유입 채널 → 첫 페이지 → 다음 페이지별 세션 수", className="text-muted mb-3"),
+                dcc.Loading(
+                    id="loading-path-sankey",
+                    type="circle",
+                    children=dcc.Graph(id='path-sankey-graph')
+                )
+            ]),
+            className="mb-3"
+        ),
+
         # 방문자 환경 분석 섹션
         dbc.Card(
             dbc.CardBody([
@@ -232,6 +304,10 @@ def create_visitor_analysis_layout():
 def load_visitor_counts(start_date, end_date):
     """선택된 기간의 방문자 수를 계산합니다."""
     try:
+        # 로컬 방문자 색인이 있으면 문자열 GROUP BY 대신 방문자 ID 배열로 계산
+        if has_visitor_index():
+            return count_visitors(start_date, end_date)
+
         query = f"""
         WITH first_visits AS (
             -- 전체 기간에서 각 IP와 User-agent의 첫 방문일
@@ -298,6 +374,9 @@ def update_visitor_metrics(start_date, end_date):
 def load_filtered_visitor_counts(start_date, end_date):
     """선택된 기간의 필터링된 방문자 수를 계산합니다."""
     try:
+        if has_visitor_index():
+            return count_device_visitors(start_date, end_date)
+
         query = f"""
         WITH visitor_stats AS (
             SELECT 
@@ -353,6 +432,9 @@ def update_filtered_visitors(start_date, end_date):
 def load_daily_visitor_stats(start_date, end_date):
     """선택된 기간의 일별 방문자 통계를 계산합니다."""
     try:
+        if has_visitor_index():
+            return daily_visitor_stats(start_date, end_date)
+
         query = f"""
         WITH daily_visits AS (
             SELECT 
@@ -450,75 +532,452 @@ def update_daily_visitors_graph(start_date, end_date):
     
     return fig
 
-def load_environment_stats(start_date, end_date, device_type='all'):
-    """선택된 기간의 방문자 환경 통계를 계산합니다."""
+def load_cohort_retention(start_date, end_date):
+    """선택된 기간의 첫 방문일 코호트별 재방문자 수를 계산합니다."""
     try:
-        # 기기 유형 필터 조건 추가
-        device_filter = ""
-        if device_type == 'mobile':
-            device_filter = "AND user_is_mobile = TRUE"
-        elif device_type == 'desktop':
-            device_filter = "AND user_is_mobile = FALSE"
+        if has_visitor_index():
+            return cohort_retention(start_date, end_date)
 
         query = f"""
-        WITH visitor_stats AS (
+        WITH first_visits AS (
+            -- 전체 기간에서 각 IP와 User-agent의 첫 방문일
             SELECT 
                 ip,
                 user_agent,
-                user_is_mobile,
-                user_browser,
-                user_os
+                MIN(DATE(timestamp_utc)) as first_visit_date
+            FROM `{project_id}.{dataset}.{table}`
+            GROUP BY ip, user_agent
+        ),
+        daily_visits AS (
+            SELECT DISTINCT
+                DATE(timestamp_utc) as visit_date,
+                ip,
+                user_agent
             FROM `{project_id}.{dataset}.{table}`
             WHERE DATE(timestamp_utc) BETWEEN '{start_date}' AND '{end_date}'
-            {device_filter}
-            GROUP BY ip, user_agent, user_is_mobile, user_browser, user_os
         )
         SELECT 
-            COUNT(*) as total_visitors,
-            COUNTIF(user_is_mobile) as mobile_visitors,
-            COUNTIF(NOT user_is_mobile) as desktop_visitors,
-            user_browser,
-            user_os
-        FROM visitor_stats
-        GROUP BY user_browser, user_os
+            f.first_visit_date as cohort_date,
+            DATE_DIFF(d.visit_date, f.first_visit_date, DAY) as days_since,
+            COUNT(*) as visitors
+        FROM daily_visits d
+        JOIN first_visits f ON d.ip = f.ip AND d.user_agent = f.user_agent
+        WHERE f.first_visit_date BETWEEN '{start_date}' AND '{end_date}'
+        GROUP BY cohort_date, days_since
         """
         
         df = load_bigquery_data(query)
         
         if df is not None and not df.empty:
-            # 기기 분포 계산
-            device_stats = {
-                'mobile': df['mobile_visitors'].sum(),
-                'desktop': df['desktop_visitors'].sum()
-            }
-            
-            # 브라우저 분포 계산
-            browser_stats = df.groupby('user_browser')['total_visitors'].sum().to_dict()
-            
-            # OS 분포 계산
-            os_stats = df.groupby('user_os')['total_visitors'].sum().to_dict()
-            
+            df['cohort_date'] = df['cohort_date'].astype(str)
+            matrix = df.pivot(index='cohort_date', columns='days_since', values='visitors')
+            matrix = matrix.reindex(columns=range(int(df['days_since'].max()) + 1)).fillna(0)
+            # 종료일 이후(아직 오지 않은 날)는 비워 둠
+            elapsed = (pd.Timestamp(end_date) - pd.to_datetime(matrix.index)).days
+            counts = [
+                [int(value) if offset <= days_left else None for offset, value in enumerate(row)]
+                for row, days_left in zip(matrix.to_numpy(), elapsed)
+            ]
             return {
-                'device': device_stats,
-                'browser': browser_stats,
-                'os': os_stats
+                'cohorts': matrix.index.tolist(),
+                'sizes': [row[0] for row in counts],
+                'offsets': matrix.columns.tolist(),
+                'counts': counts
             }
         return None
     except Exception as e:
         return None
 
 @callback(
-    Output('device-distribution', 'figure'),
+    Output('cohort-retention-graph', 'figure'),
     [Input('date-range', 'start_date'),
-     Input('date-range', 'end_date'),
-     Input('device-filter', 'value')]
+     Input('date-range', 'end_date')]
 )
-def update_device_distribution(start_date, end_date, device_type):
-    """기기 분포 그래프를 업데이트합니다."""
+def update_cohort_retention_graph(start_date, end_date):
+    """코호트 재방문율 히트맵을 업데이트합니다."""
     if not start_date or not end_date:
         return go.Figure()
     
-    stats = load_environment_stats(start_date, end_date, device_type)
+    retention = load_cohort_retention(start_date, end_date)
+    
+    if retention is None:
+        return go.Figure()
+    
+    # 코호트 크기 대비 재방문 비율 (%)
+    rates = [
+        [None if count is None or not size else round(count / size * 100, 1) for count in row]
+        for row, size in zip(retention['counts'], retention['sizes'])
+    ]
+    
+    fig = go.Figure(data=go.Heatmap(
+        z=rates,
+        x=retention['offsets'],
+        y=[f"{cohort} ({size:,}명)" for cohort, size in zip(retention['cohorts'], retention['sizes'])],
+        customdata=retention['counts'],
+        colorscale='Blues',
+        zmin=0,
+        zmax=100,
+        hoverongaps=False,
+        hovertemplate='%{y}<br>%{x}일 후: %{z}% (%{customdata:,}명)<extra></extra>',
+        colorbar=dict(title='재방문율 (%)')
+    ))
+    
+    fig.update_layout(
+        title='첫 방문일별 재방문율',
+        xaxis_title='첫 방문 후 경과 일수',
+        yaxis_title='첫 방문일',
+        template='plotly_white',
+        yaxis=dict(autorange='reversed'),
+        height=max(400, 18 * len(retention['cohorts']) + 150)
+    )
+    
+    return fig
+
+@cached(TTLCache(maxsize=32, ttl=SESSION_CACHE_TTL))
+def load_session_depth_counts(start_date, end_date):
+    """선택된 기간의 날짜별, 세션 깊이별 세션 수를 계산합니다."""
+    try:
+        if has_session_index():
+            df = session_depth_counts(start_date, end_date)
+        else:
+            query = f"""
+            WITH events AS (
+                -- 같은 방문자의 이전 요청과 간격이 길면 새 세션 시작
+                SELECT 
+                    ip,
+                    user_agent,
+                    timestamp_utc,
+                    DATE(timestamp_utc) as visit_date,
+                    IF(TIMESTAMP_DIFF(timestamp_utc, LAG(timestamp_utc) OVER (
+                        PARTITION BY ip, user_agent, DATE(timestamp_utc) ORDER BY timestamp_utc
+                    ), SECOND) <= {SESSION_GAP_SECONDS}, 0, 1) as is_session_start
+                FROM `{project_id}.{dataset}.{table}`
+                WHERE DATE(timestamp_utc) BETWEEN '{start_date}' AND '{end_date}'
+            ),
+            numbered AS (
+                SELECT 
+                    *,
+                    SUM(is_session_start) OVER (
+                        PARTITION BY ip, user_agent, visit_date ORDER BY timestamp_utc
+                    ) as session_number
+                FROM events
+            ),
+            sessions AS (
+                SELECT 
+                    visit_date,
+                    COUNT(*) as hits
+                FROM numbered
+                GROUP BY ip, user_agent, visit_date, session_number
+            )
+            SELECT 
+                visit_date,
+                LEAST(hits, {SESSION_DEPTH_LIMIT}) as depth,
+                COUNT(*) as sessions
+            FROM sessions
+            GROUP BY visit_date, depth
+            ORDER BY visit_date, depth
+            """
+            
+            df = load_bigquery_data(query)
+        
+        if df is not None and not df.empty:
+            df['visit_date'] = df['visit_date'].astype(str)
+            return df.to_dict('records')
+        return None
+    except Exception as e:
+        return None
+
+@callback(
+    Output('session-stats', 'data'),
+    [Input('date-range', 'start_date'),
+     Input('date-range', 'end_date')]
+)
+def update_session_stats(start_date, end_date):
+    """기간이 바뀔 때 세션 깊이 집계를 한 번 조회합니다."""
+    if not start_date or not end_date:
+        return None
+    
+    return load_session_depth_counts(start_date, end_date)
+
+@callback(
+    Output('bounce-rate-graph', 'figure'),
+    [Input('session-stats', 'data')]
+)
+def update_bounce_rate_graph(session_stats):
+    """일별 이탈률(요청 1회로 끝난 세션 비율) 그래프를 업데이트합니다."""
+    if not session_stats:
+        return go.Figure()
+    
+    df = pd.DataFrame(session_stats)
+    daily = df.groupby('visit_date')['sessions'].sum().to_frame()
+    daily['bounces'] = df[df['depth'] == 1].groupby('visit_date')['sessions'].sum()
+    daily = daily.fillna(0).reset_index()
+    daily['bounce_rate'] = (daily['bounces'] / daily['sessions'] * 100).round(1)
+    
+    fig = go.Figure(data=[go.Scatter(
+        x=daily['visit_date'],
+        y=daily['bounce_rate'],
+        mode='lines+markers',
+        customdata=daily['sessions'],
+        hovertemplate='%{x}<br>이탈률: %{y}%<br>세션: %{customdata:,}<extra></extra>',
+        line=dict(color=COLOR_SCHEME['new'])
+    )])
+    
+    fig.update_layout(
+        title='일별 이탈률',
+        xaxis_title='날짜',
+        yaxis_title='이탈률 (%)',
+        template='plotly_white',
+        yaxis=dict(range=[0, 100])
+    )
+    
+    return fig
+
+@callback(
+    Output('session-depth-graph', 'figure'),
+    [Input('session-stats', 'data')]
+)
+def update_session_depth_graph(session_stats):
+    """세션 깊이(세션당 요청 수) 분포 그래프를 업데이트합니다."""
+    if not session_stats:
+        return go.Figure()
+    
+    depth = pd.DataFrame(session_stats).groupby('depth')['sessions'].sum()
+    labels = [f"{value}+" if value == SESSION_DEPTH_LIMIT else str(value) for value in depth.index]
+    
+    fig = go.Figure(data=[go.Bar(
+        x=labels,
+        y=depth.values,
+        marker_color=COLOR_SCHEME['returning']
+    )])
+    
+    fig.update_layout(
+        title='세션 깊이 분포',
+        xaxis_title='세션당 요청 수',
+        yaxis_title='세션 수',
+        template='plotly_white',
+        xaxis=dict(type='category')
+    )
+    
+    return fig
+
+@cached(TTLCache(maxsize=32, ttl=SESSION_CACHE_TTL))
+def load_entry_paths(start_date, end_date):
+    """선택된 기간의 유입 채널 → 첫 페이지 → 다음 페이지별 세션 수를 계산합니다."""
+    try:
+        if has_path_index():
+            return entry_paths(start_date, end_date)
+
+        # 로컬 경로 색인과 같은 경로 템플릿으로 묶음 (템플릿 백필 전 테이블이나 아직 채워지지 않은 행은 원본 url_path)
+        page_expression = 'l.url_path'
+        template_join = ''
+        if has_url_templates():
+            page_expression = 'COALESCE(t.url_template, l.url_path)'
+            template_join = f"LEFT JOIN `{project_id}.{dataset}.{table}{URL_TEMPLATE_TABLE_SUFFIX}` t ON t.url_template_id = l.url_template_id"
+
+        query = f"""
+        WITH events AS (
+            -- 같은 방문자의 이전 요청과 간격이 길면 새 세션 시작
+            SELECT 
+                l.ip,
+                l.user_agent,
+                l.timestamp_utc,
+                {page_expression} as page_path,
+                l.channel_id,
+                DATE(l.timestamp_utc) as visit_date,
+                IF(TIMESTAMP_DIFF(l.timestamp_utc, LAG(l.timestamp_utc) OVER (
+                    PARTITION BY l.ip, l.user_agent, DATE(l.timestamp_utc) ORDER BY l.timestamp_utc
+                ), SECOND) <= {SESSION_GAP_SECONDS}, 0, 1) as is_session_start
+            FROM `{project_id}.{dataset}.{table}` l
+            {template_join}
+            WHERE DATE(l.timestamp_utc) BETWEEN '{start_date}' AND '{end_date}'
+        ),
+        numbered AS (
+            SELECT 
+                *,
+                SUM(is_session_start) OVER (
+                    PARTITION BY ip, user_agent, visit_date ORDER BY timestamp_utc
+                ) as session_number
+            FROM events
+        ),
+        ordered AS (
+            SELECT 
+                *,
+                LEAD(page_path) OVER (
+                    PARTITION BY ip, user_agent, visit_date, session_number ORDER BY timestamp_utc
+                ) as following_path
+            FROM numbered
+        )
+        SELECT 
+            channel_id,
+            page_path as landing_path,
+            IFNULL(following_path, '{EXIT_LABEL}') as next_path,
+            COUNT(*) as sessions
+        FROM ordered
+        WHERE is_session_start = 1
+        GROUP BY channel_id, landing_path, next_path
+        """
+        
+        df = load_bigquery_data(query)
+        
+        if df is not None and not df.empty:
+            df.insert(0, 'channel', df.pop('channel_id').map(CHANNEL_ID_LABELS))
+            return df
+        return None
+    except Exception as e:
+        return None
+
+def group_top_paths(paths, sessions, limit):
+    """세션 수 상위 limit개 경로만 남기고 나머지는 '기타'로 묶습니다."""
+    top = sessions.groupby(paths).sum().nlargest(limit).index
+    return paths.where(paths.isin(top) | (paths == EXIT_LABEL), '기타')
+
+@callback(
+    Output('path-sankey-graph', 'figure'),
+    [Input('date-range', 'start_date'),
+     Input('date-range', 'end_date')]
+)
+def update_path_sankey(start_date, end_date):
+    """유입 채널 → 첫 페이지 → 다음 페이지 Sankey 그래프를 업데이트합니다."""
+    if not start_date or not end_date:
+        return go.Figure()
+    
+    df = load_entry_paths(start_date, end_date)
+    
+    if df is None:
+        return go.Figure()
+    
+    df = df.assign(
+        channel=df['channel'].fillna('기타'),
+        landing_path=group_top_paths(df['landing_path'], df['sessions'], PATH_SANKEY_LIMIT),
+        next_path=group_top_paths(df['next_path'], df['sessions'], PATH_SANKEY_LIMIT)
+    )
+    
+    # 같은 경로라도 단계(유입 채널, 첫 페이지, 다음 페이지)가 다르면 다른 노드
+    steps = [
+        df.groupby(['channel', 'landing_path'])['sessions'].sum(),
+        df.groupby(['landing_path', 'next_path'])['sessions'].sum()
+    ]
+    step_labels = [
+        steps[0].index.unique(0).tolist(),
+        steps[0].index.unique(1).tolist(),
+        steps[1].index.unique(1).tolist()
+    ]
+    offsets = [0, len(step_labels[0]), len(step_labels[0]) + len(step_labels[1])]
+    node_ids = [{label: offset + i for i, label in enumerate(labels)} for labels, offset in zip(step_labels, offsets)]
+    
+    sources, targets, values = [], [], []
+    for step, links in enumerate(steps):
+        for (source, target), value in links.items():
+            sources.append(node_ids[step][source])
+            targets.append(node_ids[step + 1][target])
+            values.append(int(value))
+    
+    fig = go.Figure(data=[go.Sankey(
+        node=dict(
+            label=step_labels[0] + step_labels[1] + step_labels[2],
+            pad=15,
+            thickness=15,
+            color=(
+                [COLOR_SCHEME['total']] * len(step_labels[0]) +
+                [COLOR_SCHEME['new']] * len(step_labels[1]) +
+                [COLOR_SCHEME['returning']] * len(step_labels[2])
+            )
+        ),
+        link=dict(
+            source=sources,
+            target=targets,
+            value=values,
+            hovertemplate='%{source.label} → %{target.label}<br>세션: %{value:,}<extra></extra>'
+        )
+    )])
+    
+    fig.update_layout(
+        title='유입 채널 → 첫 페이지 → 다음 페이지',
+        template='plotly_white',
+        height=600
+    )
+    
+    return fig
+
+@cached(TTLCache(maxsize=32, ttl=ENVIRONMENT_CACHE_TTL))
+def load_environment_cube(start_date, end_date):
+    """선택된 기간의 (모바일 여부, 브라우저, OS) 조합별 방문자 수를 계산합니다."""
+    try:
+        if has_visitor_index():
+            df = environment_cube(start_date, end_date)
+        else:
+            query = f"""
+            WITH visitor_stats AS (
+                SELECT 
+                    ip,
+                    user_agent,
+                    user_is_mobile,
+                    user_browser,
+                    user_os
+                FROM `{project_id}.{dataset}.{table}`
+                WHERE DATE(timestamp_utc) BETWEEN '{start_date}' AND '{end_date}'
+                GROUP BY ip, user_agent, user_is_mobile, user_browser, user_os
+            )
+            SELECT 
+                user_is_mobile,
+                user_browser,
+                user_os,
+                COUNT(*) as visitors
+            FROM visitor_stats
+            GROUP BY user_is_mobile, user_browser, user_os
+            """
+            
+            df = load_bigquery_data(query)
+        
+        if df is not None and not df.empty:
+            return df.to_dict('records')
+        return None
+    except Exception as e:
+        return None
+
+@callback(
+    Output('environment-cube', 'data'),
+    [Input('date-range', 'start_date'),
+     Input('date-range', 'end_date')]
+)
+def update_environment_cube(start_date, end_date):
+    """기간이 바뀔 때만 방문자 환경 집계를 한 번 조회합니다."""
+    if not start_date or not end_date:
+        return None
+    
+    return load_environment_cube(start_date, end_date)
+
+def get_environment_stats(cube, device_type='all'):
+    """환경 집계에서 기기 유형에 맞는 기기/브라우저/OS 분포를 계산합니다."""
+    if not cube:
+        return None
+    
+    df = pd.DataFrame(cube)
+    # 'all' 집계에 모바일/데스크톱 구분이 모두 들어 있으므로 기기 필터는 다시 조회하지 않고 거름
+    if device_type == 'mobile':
+        df = df[df['user_is_mobile'] == True]
+    elif device_type == 'desktop':
+        df = df[df['user_is_mobile'] == False]
+    
+    if df.empty:
+        return None
+    
+    mobile = int(df.loc[df['user_is_mobile'] == True, 'visitors'].sum())
+    return {
+        'device': {'mobile': mobile, 'desktop': int(df['visitors'].sum()) - mobile},
+        'browser': df.groupby('user_browser')['visitors'].sum().to_dict(),
+        'os': df.groupby('user_os')['visitors'].sum().to_dict()
+    }
+
+@callback(
+    Output('device-distribution', 'figure'),
+    [Input('environment-cube', 'data'),
+     Input('device-filter', 'value')]
+)
+def update_device_distribution(cube, device_type):
+    """기기 분포 그래프를 업데이트합니다."""
+    stats = get_environment_stats(cube, device_type)
     
     if stats is None:
         return go.Figure()
@@ -550,16 +1009,12 @@ def update_device_distribution(start_date, end_date, device_type):
 
 @callback(
     Output('browser-distribution', 'figure'),
-    [Input('date-range', 'start_date'),
-     Input('date-range', 'end_date'),
+    [Input('environment-cube', 'data'),
      Input('device-filter', 'value')]
 )
-def update_browser_distribution(start_date, end_date, device_type):
+def update_browser_distribution(cube, device_type):
     """브라우저 분포 그래프를 업데이트합니다."""
-    if not start_date or not end_date:
-        return go.Figure()
-    
-    stats = load_environment_stats(start_date, end_date, device_type)
+    stats = get_environment_stats(cube, device_type)
     
     if stats is None:
         return go.Figure()
@@ -586,16 +1041,12 @@ def update_browser_distribution(start_date, end_date, device_type):
 
 @callback(
     Output('os-distribution', 'figure'),
-    [Input('date-range', 'start_date'),
-     Input('date-range', 'end_date'),
+    [Input('environment-cube', 'data'),
      Input('device-filter', 'value')]
 )
-def update_os_distribution(start_date, end_date, device_type):
+def update_os_distribution(cube, device_type):
     """OS 분포 그래프를 업데이트합니다."""
-    if not start_date or not end_date:
-        return go.Figure()
-    
-    stats = load_environment_stats(start_date, end_date, device_type)
+    stats = get_environment_stats(cube, device_type)
     
     if stats is None:
         return go.Figure()
@@ -0,0 +1,37 @@
+"""
+회전되는 nginx access.log를 따라 읽으며 로컬 로그 저장소에 마이크로 배치로 추가하는 CLI
+
+대시보드 실시간 모드는 저장소에 새로 추가된 파일을 몇 초마다 읽어 집계하므로,
+ingest.py로 과거 로그를 적재한 뒤 이 테일러를 계속 실행해 두면 됩니다.
+
+사용 예:
+    python tailer.py /var/log/nginx/access.log
+    python tailer.py /var/log/nginx/access.log --store data/logs --interval 1 --geoip data/geoip
+"""
+import argparse
+
+from utils.store_utils import get_store_path
+from utils.tail_utils import DEFAULT_BATCH_INTERVAL, LogTailer
+from utils.ua_utils import UA_PARSER, get_ua_cache_path
+from utils.url_utils import URL_TEMPLATER, get_url_template_path
+from utils.geoip_utils import GEOIP_TABLE, get_geoip_path
+
+def main():
+    parser = argparse.ArgumentParser(description="access.log를 따라 읽으며 일 단위 Parquet 저장소에 추가합니다.")
+    parser.add_argument('log_path', help="nginx combined 형식 access.log 경로")
+    parser.add_argument('--store', default=get_store_path(), help="저장소 경로 (기본값: LOCAL_STORE_PATH)")
+    parser.add_argument('--interval', type=float, default=DEFAULT_BATCH_INTERVAL, help="마이크로 배치 주기 (초)")
+    parser.add_argument('--geoip', default=get_geoip_path(), help="GeoIP 테이블 디렉터리 (없으면 geo를 채우지 않음)")
+    parser.add_argument('--from-start', action='store_true', help="이어서 읽을 위치가 없을 때 파일 끝 대신 처음부터 읽기")
+    args = parser.parse_args()
+
+    if GEOIP_TABLE.load(args.geoip):
+        print(f"GeoIP 테이블 사용: {args.geoip} ({len(GEOIP_TABLE.starts):,}개 대역)")
+    UA_PARSER.load(get_ua_cache_path(args.store))
+    URL_TEMPLATER.load(get_url_template_path(args.store))
+
+    print(f"{args.log_path} 테일링 시작 (Ctrl+C로 종료)")
+    LogTailer(args.log_path, args.store, batch_interval=args.interval, from_start=args.from_start).run()
+
+if __name__ == '__main__':
+    main()
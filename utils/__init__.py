@@ -1,6 +1,9 @@
 from .utils import (
     get_bigquery_config,
     load_bigquery_data,
+    get_table_ref,
+    execute_bigquery,
+    write_bigquery_table,
     get_sample_data,
     create_404_page
 )
@@ -8,6 +11,9 @@ from .utils import (
 __all__ = [
     'get_bigquery_config',
     'load_bigquery_data',
+    'get_table_ref',
+    'execute_bigquery',
+    'write_bigquery_table',
     'get_sample_data',
     'create_404_page'
 ] 
\ No newline at end of file
@@ -0,0 +1,76 @@
+import math
+from typing import Iterable, Tuple
+import numpy as np
+import pandas as pd
+
+# 기본 오탐률 1%
+DEFAULT_FALSE_POSITIVE_RATE = 0.01
+MIN_BLOOM_BITS = 64
+
+def hash_values(values: Iterable) -> np.ndarray:
+    """
+    값 목록을 64비트 해시로 바꾸는 함수 (pandas의 벡터화된 SipHash 사용)
+
+    Args:
+        values (Iterable): 문자열 값 목록
+
+    Returns:
+        np.ndarray: uint64 해시 배열
+    """
+    return pd.util.hash_array(np.asarray(values, dtype=object), categorize=False)
+
+def bloom_positions(hashes: np.ndarray, num_bits: int, num_hashes: int) -> np.ndarray:
+    """
+    더블 해싱(h1 + i * h2)으로 해시마다 비트 위치 num_hashes개를 구하는 함수
+
+    Args:
+        hashes (np.ndarray): uint64 해시 배열
+        num_bits (int): 필터 비트 수
+        num_hashes (int): 해시 함수 수
+
+    Returns:
+        np.ndarray: (len(hashes), num_hashes) 비트 위치 배열
+    """
+    h1 = (hashes & np.uint64(0xFFFFFFFF)).astype(np.int64)
+    h2 = ((hashes >> np.uint64(32)) | np.uint64(1)).astype(np.int64)
+    steps = np.arange(num_hashes, dtype=np.int64)
+    return (h1[:, None] + steps[None, :] * h2[:, None]) % num_bits
+
+def build_bloom(values: Iterable, false_positive_rate: float = DEFAULT_FALSE_POSITIVE_RATE) -> Tuple[np.ndarray, int, int]:
+    """
+    고유 값 목록으로 Bloom 필터를 만드는 함수
+
+    Args:
+        values (Iterable): 필터에 넣을 값 목록 (결측값 제외)
+        false_positive_rate (float): 목표 오탐률
+
+    Returns:
+        Tuple[np.ndarray, int, int]: (packbits로 압축한 비트 배열, 비트 수, 해시 함수 수)
+    """
+    hashes = hash_values(values)
+    count = max(len(hashes), 1)
+    num_bits = max(int(math.ceil(-count * math.log(false_positive_rate) / math.log(2) ** 2)), MIN_BLOOM_BITS)
+    num_hashes = max(int(round(num_bits / count * math.log(2))), 1)
+
+    bits = np.zeros(num_bits, dtype=bool)
+    if len(hashes):
+        bits[bloom_positions(hashes, num_bits, num_hashes).ravel()] = True
+    return np.packbits(bits), num_bits, num_hashes
+
+def bloom_might_contain(packed_bits: np.ndarray, num_bits: int, num_hashes: int, values: Iterable) -> bool:
+    """
+    값 중 하나라도 Bloom 필터에 들어 있을 수 있는지 확인하는 함수
+
+    Args:
+        packed_bits (np.ndarray): build_bloom이 만든 비트 배열
+        num_bits (int): 비트 수
+        num_hashes (int): 해시 함수 수
+        values (Iterable): 찾을 값 목록
+
+    Returns:
+        bool: 하나라도 들어 있을 수 있으면 True (False면 확실히 없음)
+    """
+    positions = bloom_positions(hash_values(values), num_bits, num_hashes)
+    # packbits는 큰 비트가 앞이므로 위치 p는 바이트 p // 8의 (7 - p % 8)번 비트
+    hits = (packed_bits[positions >> 3] >> (7 - (positions & 7)).astype(np.uint8)) & 1
+    return bool(hits.all(axis=1).any())
@@ -0,0 +1,111 @@
+import io
+from typing import Iterator
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from flask import Response, abort, request, stream_with_context
+from utils.log_search_utils import get_search_session
+
+# 내보내기 형식별 응답 설정
+EXPORT_FORMATS = {
+    'csv': {'mimetype': 'text/csv', 'extension': 'csv'},
+    'parquet': {'mimetype': 'application/vnd.apache.parquet', 'extension': 'parquet'},
+}
+
+class ChunkBuffer(io.RawIOBase):
+    """
+    Parquet 작성기가 쓴 바이트를 모아 두었다가 응답 조각으로 꺼내는 쓰기 전용 버퍼
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def drain(self) -> bytes:
+        """지금까지 쓴 바이트를 꺼내고 버퍼를 비웁니다."""
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+def stream_csv(batches: Iterator[pa.RecordBatch], schema: pa.Schema) -> Iterator[bytes]:
+    """
+    레코드 배치를 CSV 조각으로 바꾸는 제너레이터 (결과가 비어도 헤더는 항상 첫 조각으로 내보냄)
+
+    Args:
+        batches (Iterator[pa.RecordBatch]): 레코드 배치
+        schema (pa.Schema): 결과 스키마
+
+    Yields:
+        bytes: CSV 조각
+    """
+    sink = io.BytesIO()
+    pa_csv.write_csv(schema.empty_table(), sink)
+    yield sink.getvalue()
+    for batch in batches:
+        sink = io.BytesIO()
+        pa_csv.write_csv(batch, sink, write_options=pa_csv.WriteOptions(include_header=False))
+        yield sink.getvalue()
+
+def stream_parquet(batches: Iterator[pa.RecordBatch], schema: pa.Schema) -> Iterator[bytes]:
+    """
+    레코드 배치를 배치마다 row group 하나로 쓰면서 Parquet 조각을 내보내는 제너레이터
+
+    결과가 비어도 스키마만 담긴 올바른 Parquet 파일(footer 포함)을 내보냅니다.
+
+    Args:
+        batches (Iterator[pa.RecordBatch]): 레코드 배치
+        schema (pa.Schema): 결과 스키마 (배치가 없을 때 사용)
+
+    Yields:
+        bytes: Parquet 파일 조각 (마지막 조각에 footer 포함)
+    """
+    buffer = ChunkBuffer()
+    writer = None
+    for batch in batches:
+        if writer is None:
+            writer = pq.ParquetWriter(buffer, batch.schema, compression='zstd')
+        writer.write_batch(batch)
+        yield buffer.drain()
+    if writer is None:
+        writer = pq.ParquetWriter(buffer, schema, compression='zstd')
+    writer.close()
+    yield buffer.drain()
+
+def register_export_routes(server) -> None:
+    """
+    로그 검색 결과 내보내기 라우트를 Flask 서버에 등록하는 함수
+
+    /export/logs?session=<검색 세션 ID>&format=csv|parquet
+
+    Args:
+        server: Dash 앱의 Flask 서버
+    """
+
+    @server.route('/export/logs')
+    def export_logs():
+        export_format = request.args.get('format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            abort(400, description="format은 csv 또는 parquet이어야 합니다.")
+
+        session = get_search_session(request.args.get('session'))
+        if session is None:
+            abort(404, description="검색 세션이 만료되었습니다. 다시 검색해 주세요.")
+
+        stream = stream_csv if export_format == 'csv' else stream_parquet
+        settings = EXPORT_FORMATS[export_format]
+        return Response(
+            stream_with_context(stream(session.iter_batches(), session.schema)),
+            mimetype=settings['mimetype'],
+            headers={'Content-Disposition': f"attachment; filename=log_search.{settings['extension']}"}
+        )
@@ -0,0 +1,116 @@
+from functools import lru_cache
+from typing import Optional
+import pandas as pd
+import pycountry
+from utils.utils import get_table_ref, load_bigquery_data, execute_bigquery, write_bigquery_table
+
+# geo 컬럼 형태: "국가 (상세 이름), 도시"
+GEO_PAREN_PATTERN = r'\s*\([^)]*\)'
+GEO_COLUMNS = ['country', 'city', 'iso3']
+GEO_TABLE_SUFFIX = '_geo'
+
+@lru_cache(maxsize=None)
+def country_to_iso3(country_name: str) -> Optional[str]:
+    """
+    국가 이름을 ISO 3166 alpha-3 코드로 변환하는 함수
+
+    Args:
+        country_name (str): 국가 이름
+
+    Returns:
+        Optional[str]: alpha-3 코드 또는 변환 실패 시 None
+    """
+    try:
+        return pycountry.countries.lookup(country_name).alpha_3
+    except LookupError:
+        return None
+
+def parse_geo(geo: pd.Series) -> pd.DataFrame:
+    """
+    geo 컬럼을 country, city, iso3 컬럼으로 분리하는 함수
+
+    고유한 geo 값만 한 번씩 파싱한 뒤 원래 행으로 다시 펼치므로
+    비용은 행 수가 아니라 고유 값 수에 비례합니다.
+
+    Args:
+        geo (pd.Series): 원본 geo 컬럼
+
+    Returns:
+        pd.DataFrame: geo와 같은 인덱스를 갖는 country, city, iso3 데이터프레임
+    """
+    codes, uniques = pd.factorize(geo)
+
+    # 괄호 안 상세 이름 제거 후 쉼표로 분리
+    parts = (
+        pd.Series(uniques, dtype='object')
+        .str.replace(GEO_PAREN_PATTERN, '', regex=True)
+        .str.split(',', expand=True)
+        .reindex(columns=[0, 1])
+        .astype('string')
+    )
+    parsed = pd.DataFrame({
+        'country': parts[0].str.strip(),
+        'city': parts[1].str.strip()
+    })
+
+    # 빈 값과 '-'는 지역 정보가 없는 것으로 처리
+    parsed = parsed.where(~parsed.isin(['', '-']))
+    parsed['iso3'] = parsed['country'].map(country_to_iso3, na_action='ignore')
+
+    # 코드로 원래 행에 펼치기 (결측값의 -1 코드는 빈 행이 됨)
+    result = parsed.reindex(codes)[GEO_COLUMNS].astype('string')
+    result.index = geo.index
+    return result
+
+def enrich_geo(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    로그 데이터프레임에 country, city, iso3 컬럼을 추가하는 함수
+
+    Args:
+        df (pd.DataFrame): geo 컬럼을 포함한 로그 데이터프레임
+
+    Returns:
+        pd.DataFrame: 지역 컬럼이 추가된 데이터프레임
+    """
+    df[GEO_COLUMNS] = parse_geo(df['geo'])
+    return df
+
+def backfill_geo_columns() -> bool:
+    """
+    BigQuery 로그 테이블에 country, city, iso3 컬럼을 채우는 함수
+
+    고유한 geo 값으로 작은 차원 테이블을 만든 뒤 조인 UPDATE로
+    로그 테이블에 한 번만 기록합니다.
+
+    Returns:
+        bool: 성공 여부
+    """
+    table_ref = get_table_ref()
+
+    dim_df = load_bigquery_data(f"""
+    SELECT DISTINCT geo
+    FROM `{table_ref}`
+    WHERE geo IS NOT NULL
+    """)
+    if dim_df is None or dim_df.empty:
+        return False
+
+    dim_df = enrich_geo(dim_df)
+    if not write_bigquery_table(dim_df, GEO_TABLE_SUFFIX):
+        return False
+
+    return execute_bigquery(f"""
+    ALTER TABLE `{table_ref}`
+        ADD COLUMN IF NOT EXISTS country STRING,
+        ADD COLUMN IF NOT EXISTS city STRING,
+        ADD COLUMN IF NOT EXISTS iso3 STRING
+    """) and execute_bigquery(f"""
+    UPDATE `{table_ref}` t
+    SET country = d.country, city = d.city, iso3 = d.iso3
+    FROM `{get_table_ref(GEO_TABLE_SUFFIX)}` d
+    WHERE t.geo = d.geo
+    """)
+
+if __name__ == '__main__':
+    # python -m utils.geo_utils 로 기존 테이블에 지역 컬럼 채우기
+    print("완료" if backfill_geo_columns() else "실패")
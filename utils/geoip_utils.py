@@ -0,0 +1,238 @@
+import os
+import socket
+import struct
+import sys
+from typing import Dict, Iterable, Optional
+import numpy as np
+import pandas as pd
+import pycountry
+from dotenv import load_dotenv
+
+# 환경변수 로드
+load_dotenv()
+
+# IP 대역 테이블 (IPv4, 시작 IP 기준 오름차순 정렬된 배열)
+DEFAULT_GEOIP_PATH = 'data/geoip'
+GEOIP_FILES = {
+    'starts': 'starts.npy',
+    'ends': 'ends.npy',
+    'location_ids': 'location_ids.npy',
+    'locations': 'locations.parquet',
+}
+# 원본 CSV 컬럼 (DB-IP city lite 형식: 시작 IP, 끝 IP, 대륙, 국가 코드, 지역, 도시, 위도, 경도)
+GEOIP_CSV_COLUMNS = {0: 'start', 1: 'end', 3: 'country_code', 5: 'city'}
+
+def get_geoip_path() -> str:
+    """
+    GeoIP 테이블 디렉터리 경로를 반환하는 함수
+
+    Returns:
+        str: GEOIP_PATH 환경변수 또는 기본값
+    """
+    return os.getenv('GEOIP_PATH', DEFAULT_GEOIP_PATH)
+
+def ip_to_int(ip) -> int:
+    """
+    IPv4 주소 하나를 정수로 변환하는 함수
+
+    Args:
+        ip: 점 표기 IPv4 주소 또는 정수 문자열
+
+    Returns:
+        int: IP 정수값 (IPv6나 잘못된 값은 -1)
+    """
+    try:
+        if ip.isdigit():
+            return int(ip)
+        return struct.unpack('!I', socket.inet_pton(socket.AF_INET, ip))[0]
+    except (AttributeError, OSError):
+        return -1
+
+def ips_to_ints(ips: Iterable) -> np.ndarray:
+    """
+    IPv4 주소 목록을 정수 배열로 변환하는 함수
+
+    Args:
+        ips (Iterable): IP 주소 목록
+
+    Returns:
+        np.ndarray: int64 배열 (IPv6나 잘못된 값은 -1)
+    """
+    return np.fromiter((ip_to_int(ip) for ip in ips), dtype=np.int64)
+
+def country_code_to_name(country_code: Optional[str]) -> Optional[str]:
+    """
+    ISO 3166 alpha-2 국가 코드를 geo 컬럼에 쓰는 국가 이름으로 변환하는 함수
+
+    Args:
+        country_code (Optional[str]): alpha-2 국가 코드
+
+    Returns:
+        Optional[str]: 국가 이름 또는 변환 실패 시 None
+    """
+    if not isinstance(country_code, str):
+        return None
+    country = pycountry.countries.get(alpha_2=country_code.upper())
+    if country is None:
+        return None
+    # "Iran, Islamic Republic of" -> "Iran (Islamic Republic of)" (geo 컬럼의 쉼표는 국가/도시 구분자)
+    name, _, detail = getattr(country, 'common_name', country.name).partition(', ')
+    return f"{name} ({detail})" if detail else name
+
+def build_geoip_table(csv_path: str, output_path: Optional[str] = None) -> bool:
+    """
+    IP 대역 CSV를 메모리 맵으로 읽을 수 있는 NumPy 배열 파일로 변환하는 함수
+
+    고유한 "국가, 도시" 위치는 locations.parquet에 한 번만 저장하고
+    대역마다 위치 번호만 갖도록 만들어 배열을 작게 유지합니다.
+
+    Args:
+        csv_path (str): DB-IP city lite 형식 CSV 경로
+        output_path (Optional[str]): 출력 디렉터리 (기본값: get_geoip_path())
+
+    Returns:
+        bool: 성공 여부
+    """
+    output_path = output_path or get_geoip_path()
+    try:
+        df = pd.read_csv(
+            csv_path, header=None, usecols=list(GEOIP_CSV_COLUMNS),
+            dtype=str, keep_default_na=False
+        ).rename(columns=GEOIP_CSV_COLUMNS)
+
+        df['start'] = ips_to_ints(df['start'])
+        df['end'] = ips_to_ints(df['end'])
+        # IPv6 대역 제외
+        df = df[(df['start'] >= 0) & (df['end'] >= 0)].sort_values('start')
+
+        # 국가 코드는 고유 값 단위로 이름 변환
+        country_codes, unique_codes = pd.factorize(df['country_code'])
+        countries = pd.Series(unique_codes).map(country_code_to_name).reindex(country_codes).astype('string')
+        cities = df['city'].replace('', None).astype('string').reset_index(drop=True)
+        # geo 컬럼과 같은 "국가, 도시" 형태 (도시가 없으면 국가만)
+        geo = (countries.reset_index(drop=True) + ', ' + cities).fillna(countries.reset_index(drop=True))
+
+        location_ids, locations = pd.factorize(geo)
+
+        os.makedirs(output_path, exist_ok=True)
+        np.save(os.path.join(output_path, GEOIP_FILES['starts']), df['start'].to_numpy(dtype=np.uint32))
+        np.save(os.path.join(output_path, GEOIP_FILES['ends']), df['end'].to_numpy(dtype=np.uint32))
+        np.save(os.path.join(output_path, GEOIP_FILES['location_ids']), location_ids.astype(np.int32))
+        pd.DataFrame({'geo': locations}).to_parquet(os.path.join(output_path, GEOIP_FILES['locations']), index=False)
+        print(f"GeoIP 테이블 생성: {len(df):,}개 대역, {len(locations):,}개 위치")
+        return True
+    except Exception as e:
+        print(f"GeoIP 테이블 생성 오류: {e}")
+        return False
+
+class GeoIPTable:
+    """
+    정렬된 IP 대역 배열로 IP 컬럼 전체를 한 번에 geo 값으로 변환하는 클래스
+
+    배열은 mmap_mode='r'로 열어 필요한 페이지만 읽고,
+    이미 조회한 IP는 캐시에서 바로 가져옵니다.
+    """
+
+    def __init__(self):
+        self.starts = None
+        self.ends = None
+        self.location_ids = None
+        self.locations = None
+        self.cache: Dict[str, Optional[str]] = {}
+
+    @property
+    def loaded(self) -> bool:
+        return self.starts is not None
+
+    def load(self, path: Optional[str] = None) -> bool:
+        """
+        build_geoip_table로 만든 배열 파일을 메모리 맵으로 여는 함수
+
+        Args:
+            path (Optional[str]): GeoIP 테이블 디렉터리 (기본값: get_geoip_path())
+
+        Returns:
+            bool: 성공 여부 (파일이 없으면 False)
+        """
+        path = path or get_geoip_path()
+        if not all(os.path.exists(os.path.join(path, name)) for name in GEOIP_FILES.values()):
+            return False
+        try:
+            self.starts = np.load(os.path.join(path, GEOIP_FILES['starts']), mmap_mode='r')
+            self.ends = np.load(os.path.join(path, GEOIP_FILES['ends']), mmap_mode='r')
+            self.location_ids = np.load(os.path.join(path, GEOIP_FILES['location_ids']), mmap_mode='r')
+            locations = pd.read_parquet(os.path.join(path, GEOIP_FILES['locations']))['geo']
+            # 마지막 칸은 대역에 없는 IP용
+            self.locations = np.append(locations.to_numpy(dtype=object), None)
+            self.cache.clear()
+            return True
+        except Exception as e:
+            print(f"GeoIP 테이블 로드 오류: {e}")
+            self.starts = None
+            return False
+
+    def lookup(self, ips: np.ndarray) -> np.ndarray:
+        """
+        정수 IP 배열을 searchsorted로 대역에 매칭하는 함수
+
+        Args:
+            ips (np.ndarray): uint32 IP 배열
+
+        Returns:
+            np.ndarray: geo 값 배열 (대역에 없으면 None)
+        """
+        idx = np.searchsorted(self.starts, ips, side='right') - 1
+        clipped = np.clip(idx, 0, None)
+        matched = (idx >= 0) & (ips <= self.ends[clipped])
+        location_ids = np.where(matched, self.location_ids[clipped], -1)
+        return self.locations[location_ids]
+
+    def resolve(self, ips: pd.Series) -> pd.Series:
+        """
+        IP 컬럼을 geo 컬럼으로 변환하는 함수 (고유 IP 중 캐시에 없는 것만 조회)
+
+        Args:
+            ips (pd.Series): IP 주소 컬럼
+
+        Returns:
+            pd.Series: 같은 인덱스를 갖는 geo 컬럼
+        """
+        codes, uniques = pd.factorize(ips)
+
+        missing = [ip for ip in uniques if ip not in self.cache]
+        if missing:
+            numeric = ips_to_ints(missing)
+            geo = np.full(len(missing), None, dtype=object)
+            valid = numeric >= 0
+            geo[valid] = self.lookup(numeric[valid].astype(np.uint32))
+            self.cache.update(zip(missing, geo))
+
+        # 마지막 칸은 결측 IP(코드 -1)용
+        resolved = np.array([self.cache[ip] for ip in uniques] + [None], dtype=object)
+        return pd.Series(resolved[codes], index=ips.index, dtype='object')
+
+# 모듈 전체에서 공유하는 GeoIP 테이블
+GEOIP_TABLE = GeoIPTable()
+
+def enrich_geoip(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    GeoIP 테이블이 로드되어 있으면 비어 있는 geo 컬럼을 IP로 채우는 함수
+
+    Args:
+        df (pd.DataFrame): ip, geo 컬럼을 포함한 데이터프레임
+
+    Returns:
+        pd.DataFrame: geo가 채워진 데이터프레임
+    """
+    if not GEOIP_TABLE.loaded:
+        return df
+    df = df.copy()
+    df['geo'] = df['geo'].fillna(GEOIP_TABLE.resolve(df['ip']))
+    return df
+
+if __name__ == '__main__':
+    # python -m utils.geoip_utils dbip-city-lite.csv 로 GeoIP 테이블 만들기
+    if len(sys.argv) < 2:
+        print("사용법: python -m utils.geoip_utils <IP 대역 CSV> [출력 디렉터리]")
+        sys.exit(1)
+    print("완료" if build_geoip_table(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None) else "실패")
@@ -0,0 +1,132 @@
+import mmap
+import os
+import re
+from typing import List, Tuple
+import pandas as pd
+import pyarrow as pa
+from utils.geo_utils import enrich_geo
+from utils.geoip_utils import enrich_geoip
+from utils.referrer_utils import enrich_referrer
+from utils.ua_utils import enrich_user_agent
+from utils.url_utils import enrich_url_template
+from utils.store_utils import LOG_SCHEMA
+
+# nginx combined 로그 형식 (+ 마지막 "-" 필드가 있을 수 있음)
+# 54.36.149.41 - - [22/Jan/2019:03:56:14 +0330] "GET /path HTTP/1.1" 200 30577 "-" "Mozilla/5.0 ..." "-"
+LOG_PATTERN = re.compile(
+    r'^(\S+) \S+ \S+ \[([^\]]+)\] '
+    r'"(?:([A-Z]+) (\S+)(?: [^"]*)?|[^"]*)" '
+    r'(\d{3}) (\S+)'
+    r'(?: "((?:[^"\\]|\\.)*)" "((?:[^"\\]|\\.)*)")?.*$',
+    re.MULTILINE
+)
+LOG_FIELDS = ['ip', 'time', 'http_method', 'url', 'status_code', 'size', 'referrer', 'user_agent']
+TIME_FORMAT = '%d/%b/%Y:%H:%M:%S %z'
+REFERRER_DOMAIN_PATTERN = r'^[a-zA-Z][a-zA-Z0-9+.-]*://(?:[^@/]*@)?([^/:?#]+)'
+
+DEFAULT_CHUNK_SIZE = 64 * 1024 * 1024
+
+def find_chunk_boundaries(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[Tuple[int, int]]:
+    """
+    로그 파일을 줄바꿈 경계에 맞춰 (시작, 끝) 바이트 구간으로 나누는 함수
+
+    Args:
+        path (str): 로그 파일 경로
+        chunk_size (int): 구간 크기 목표값 (바이트)
+
+    Returns:
+        List[Tuple[int, int]]: 바이트 구간 목록
+    """
+    file_size = os.path.getsize(path)
+    if file_size == 0:
+        return []
+
+    boundaries = []
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = 0
+        while start < file_size:
+            end = mm.find(b'\n', min(start + chunk_size, file_size) - 1)
+            end = file_size if end < 0 else end + 1
+            boundaries.append((start, end))
+            start = end
+    return boundaries
+
+def parse_lines(text: str) -> pd.DataFrame:
+    """
+    access.log 텍스트를 로그 테이블 컬럼으로 파싱하는 함수
+
+    Args:
+        text (str): 줄바꿈으로 구분된 로그 줄들
+
+    Returns:
+        pd.DataFrame: 파싱된 로그 데이터프레임 (형식이 맞지 않는 줄은 제외)
+    """
+    df = pd.DataFrame(LOG_PATTERN.findall(text), columns=LOG_FIELDS)
+
+    timestamps = pd.to_datetime(df['time'], format=TIME_FORMAT, errors='coerce', utc=True)
+    df = df[timestamps.notna()].copy()
+    df['timestamp_utc'] = timestamps[timestamps.notna()]
+
+    # 행마다 strftime 하지 않고 고유한 시간대만 포맷한 뒤 펼치기
+    hour_codes, hours = pd.factorize(df['timestamp_utc'].dt.floor('h'))
+    df['day'] = hours.strftime('%Y-%m-%d').to_numpy()[hour_codes]
+    df['hour'] = hours.strftime('%Y-%m-%dT%H').to_numpy()[hour_codes]
+
+    df['status_code'] = df['status_code'].astype('int16')
+    df['size'] = pd.to_numeric(df['size'], errors='coerce').fillna(0).astype('int64')
+    df['http_method'] = df['http_method'].replace('', None)
+    df['url'] = df['url'].replace('', None)
+    df['url_path'] = df['url'].str.split('?', n=1).str[0]
+
+    df['referrer'] = df['referrer'].replace({'': None, '-': None})
+    df['referrer_domain'] = df['referrer'].str.extract(REFERRER_DOMAIN_PATTERN, expand=False).str.lower()
+    df['user_agent'] = df['user_agent'].replace({'': None, '-': None})
+    df['geo'] = None
+    return df.drop(columns=['time'])
+
+def parse_chunk(path: str, start: int, end: int) -> pd.DataFrame:
+    """
+    로그 파일의 바이트 구간 하나를 읽어 파싱하는 함수 (프로세스 풀 작업 단위)
+
+    Args:
+        path (str): 로그 파일 경로
+        start (int): 시작 바이트
+        end (int): 끝 바이트 (줄바꿈 다음 위치)
+
+    Returns:
+        pd.DataFrame: 파싱된 로그 데이터프레임
+    """
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        text = mm[start:end].decode('utf-8', errors='replace')
+    return parse_lines(text)
+
+def enrich_logs(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    파싱된 로그에 적재 시점 보강 컬럼(유입 채널, 지역, 브라우저/OS, URL 템플릿)을 추가하는 함수
+
+    GeoIP 테이블이 로드되어 있으면 geo 컬럼을 IP로 먼저 채운 뒤 지역 컬럼을 만듭니다.
+
+    Args:
+        df (pd.DataFrame): parse_lines 결과
+
+    Returns:
+        pd.DataFrame: 보강 컬럼이 추가된 데이터프레임
+    """
+    df = enrich_referrer(df)
+    df = enrich_geoip(df)
+    df = enrich_geo(df)
+    df = enrich_user_agent(df)
+    df = enrich_url_template(df)
+    return df
+
+def to_log_table(df: pd.DataFrame) -> pa.Table:
+    """
+    로그 데이터프레임을 LOG_SCHEMA 형태의 Arrow 테이블로 변환하는 함수
+
+    Args:
+        df (pd.DataFrame): 보강까지 끝난 로그 데이터프레임
+
+    Returns:
+        pa.Table: 로그 테이블
+    """
+    return pa.Table.from_pandas(df[LOG_SCHEMA.names], schema=LOG_SCHEMA, preserve_index=False)
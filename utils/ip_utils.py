@@ -0,0 +1,103 @@
+from typing import List, Optional, Tuple
+import pandas as pd
+from utils.geoip_utils import ips_to_ints
+
+# IP 집계 단위 (단일 IP, /24, /16)
+IP_LEVELS = [32, 24, 16]
+OCTET_BITS = 8
+
+class PrefixNode:
+    """PrefixTrie의 노드 (하위 옥텟별 자식, 합산 건수, IP 수, 건수가 가장 많은 IP의 지역)"""
+
+    __slots__ = ('children', 'count', 'ip_count', 'top_count', 'top_geo')
+
+    def __init__(self):
+        self.children = {}
+        self.count = 0
+        self.ip_count = 0
+        self.top_count = 0
+        self.top_geo = None
+
+class PrefixTrie:
+    """
+    IPv4 주소를 옥텟 단위로 나누어 저장하는 접두사 트라이
+
+    IP마다 경로의 모든 노드에 건수를 더해 두므로, 여러 IP에 흩어진 스캐너도
+    /24, /16 노드에서 한 줄로 모아 볼 수 있습니다.
+    """
+
+    def __init__(self):
+        self.root = PrefixNode()
+
+    def insert(self, ip: int, count: int, geo: Optional[str] = None) -> None:
+        """
+        IP 하나의 건수를 경로의 모든 접두사 노드에 더하는 함수
+
+        Args:
+            ip (int): IPv4 정수값
+            count (int): 요청 수
+            geo (Optional[str]): 지역
+        """
+        node = self.root
+        for shift in (24, 16, 8, 0):
+            octet = (ip >> shift) & 0xFF
+            node = node.children.setdefault(octet, PrefixNode())
+            node.count += count
+            node.ip_count += 1
+            if count > node.top_count:
+                node.top_count, node.top_geo = count, geo
+
+    def rollup(self, prefix_length: int) -> List[Tuple[str, int, int, Optional[str]]]:
+        """
+        지정한 접두사 길이의 노드별 합계를 반환하는 함수
+
+        Args:
+            prefix_length (int): 접두사 길이 (8의 배수, 예: 16, 24, 32)
+
+        Returns:
+            List[Tuple[str, int, int, Optional[str]]]: (접두사, 건수, IP 수, 대표 지역) 목록
+        """
+        depth = prefix_length // OCTET_BITS
+        results = []
+        stack = [(self.root, [])]
+        while stack:
+            node, octets = stack.pop()
+            if len(octets) == depth:
+                address = '.'.join(str(o) for o in octets + [0] * (4 - depth))
+                label = address if prefix_length == 32 else f"{address}/{prefix_length}"
+                results.append((label, node.count, node.ip_count, node.top_geo))
+                continue
+            stack.extend((child, octets + [octet]) for octet, child in node.children.items())
+        return results
+
+def build_prefix_trie(df: pd.DataFrame) -> PrefixTrie:
+    """
+    IP별 건수 데이터프레임으로 접두사 트라이를 만드는 함수
+
+    Args:
+        df (pd.DataFrame): ip, count, geo 컬럼을 포함한 IP별 건수
+
+    Returns:
+        PrefixTrie: IPv4 주소만 넣은 트라이 (IPv6나 잘못된 주소는 제외)
+    """
+    trie = PrefixTrie()
+    ip_ints = ips_to_ints(df['ip'])
+    for ip, count, geo in zip(ip_ints, df['count'].to_numpy(), df['geo'].to_numpy()):
+        if ip >= 0:
+            trie.insert(int(ip), int(count), geo)
+    return trie
+
+def rank_ip_prefixes(trie: PrefixTrie, prefix_length: int, limit: int = 10) -> pd.DataFrame:
+    """
+    트라이에서 접두사 단위 합계의 상위 목록을 만드는 함수
+
+    Args:
+        trie (PrefixTrie): build_prefix_trie 결과
+        prefix_length (int): 접두사 길이 (32면 단일 IP)
+        limit (int): 반환할 개수
+
+    Returns:
+        pd.DataFrame: ip, count, ip_count, geo 컬럼 (건수 내림차순)
+    """
+    ranked = pd.DataFrame(trie.rollup(prefix_length), columns=['ip', 'count', 'ip_count', 'geo'])
+    return ranked.sort_values('count', ascending=False, kind='stable').head(limit).reset_index(drop=True)
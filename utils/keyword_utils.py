@@ -0,0 +1,183 @@
+import re
+import unicodedata
+from typing import Optional
+from urllib.parse import unquote_plus
+import numpy as np
+import pandas as pd
+from utils.utils import get_bigquery_config, get_table_ref, load_bigquery_data, write_bigquery_table
+from utils.referrer_utils import CHANNEL_IDS
+
+# 검색 엔진(호스트 부분 문자열)별 검색어 파라미터 (위에서부터 먼저 일치하는 엔진 사용)
+SEARCH_QUERY_PARAMS = {
+    'google.': 'q',
+    'bing.': 'q',
+    'duckduckgo.': 'q',
+    'daum.': 'q',
+    'naver.': 'query',
+    'yahoo.': 'p',
+    'baidu.': 'wd',
+    'yandex.': 'text',
+}
+SEARCH_QUERY_PATTERNS = {
+    engine: re.compile(r'[?&#]' + param + r'=([^&#]*)')
+    for engine, param in SEARCH_QUERY_PARAMS.items()
+}
+HOST_PATTERN = re.compile(r'^(?:[a-zA-Z][\w+.-]*:)?//([^/?#:]+)')
+
+# 페르시아어 표기 통일 (아랍어 ي/ك -> 페르시아어 ی/ک, 아랍/페르시아 숫자 -> 아라비아 숫자)
+PERSIAN_TRANSLATION = str.maketrans({
+    'ي': 'ی', 'ى': 'ی', 'ك': 'ک', 'ة': 'ه', '\u0640': '', '\u200c': '',
+    **{chr(0x06F0 + i): str(i) for i in range(10)},
+    **{chr(0x0660 + i): str(i) for i in range(10)},
+})
+TOKEN_PATTERN = re.compile(r'\w+')
+MIN_TOKEN_LENGTH = 2
+
+DEFAULT_TOP_K = 200
+KEYWORD_TABLE_SUFFIX = '_keyword_daily'
+
+def normalize_search_term(term: Optional[str]) -> Optional[str]:
+    """
+    URL 인코딩된 검색어를 디코딩하고 표기를 통일하는 함수
+
+    Args:
+        term (Optional[str]): 검색어 파라미터 원본 값
+
+    Returns:
+        Optional[str]: 정규화된 검색어 또는 빈 값이면 None
+    """
+    if not isinstance(term, str):
+        return None
+    term = unquote_plus(term, errors='replace')
+    term = unicodedata.normalize('NFKC', term).translate(PERSIAN_TRANSLATION).lower().strip()
+    return term or None
+
+def extract_search_term(referrer: Optional[str]) -> Optional[str]:
+    """
+    referrer URL 하나에서 해당 검색 엔진의 검색어 파라미터 값을 추출하는 함수
+
+    Args:
+        referrer (Optional[str]): referrer URL
+
+    Returns:
+        Optional[str]: 정규화된 검색어 또는 알 수 없는 엔진이거나 검색어가 없으면 None
+    """
+    if not isinstance(referrer, str):
+        return None
+    host = HOST_PATTERN.match(referrer)
+    if host is None:
+        return None
+    host = host.group(1).lower()
+    for engine, pattern in SEARCH_QUERY_PATTERNS.items():
+        if engine in host:
+            matched = pattern.search(referrer)
+            return normalize_search_term(matched.group(1)) if matched else None
+    return None
+
+def extract_search_terms(referrers: pd.Series) -> pd.Series:
+    """
+    referrer URL 컬럼에서 검색어를 추출하는 함수
+
+    고유 URL 단위로 엔진 판별, 정규식 추출과 디코딩을 한 번씩만 수행합니다.
+
+    Args:
+        referrers (pd.Series): referrer URL 컬럼
+
+    Returns:
+        pd.Series: 정규화된 검색어 컬럼 (검색어가 없으면 결측값)
+    """
+    codes, uniques = pd.factorize(referrers)
+    # 마지막 칸은 결측값(-1 코드)용
+    lookup = np.array([extract_search_term(referrer) for referrer in uniques] + [None], dtype=object)
+    return pd.Series(lookup[codes], index=referrers.index)
+
+def tokenize_search_terms(terms: pd.Series) -> pd.Series:
+    """
+    검색어를 단어 단위로 나누는 함수 (한글, 페르시아어 등 유니코드 문자 포함)
+
+    Args:
+        terms (pd.Series): 정규화된 검색어 컬럼
+
+    Returns:
+        pd.Series: 같은 인덱스를 갖는 단어 컬럼 (한 행에 여러 단어면 인덱스 반복)
+    """
+    tokens = terms.dropna().str.findall(TOKEN_PATTERN).explode().dropna()
+    return tokens[(tokens.str.len() >= MIN_TOKEN_LENGTH) & ~tokens.str.isdigit()]
+
+def count_daily_keywords(df: pd.DataFrame, top_k: int = DEFAULT_TOP_K) -> pd.DataFrame:
+    """
+    일별 상위 K개 검색 키워드 수를 집계하는 함수
+
+    Args:
+        df (pd.DataFrame): day, referrer 컬럼을 포함한 데이터프레임
+        top_k (int): 일별로 남길 키워드 수
+
+    Returns:
+        pd.DataFrame: day, keyword, count 데이터프레임
+    """
+    tokens = tokenize_search_terms(extract_search_terms(df['referrer']))
+    if tokens.empty:
+        return pd.DataFrame(columns=['day', 'keyword', 'count'])
+
+    keyword_df = pd.DataFrame({
+        'day': pd.to_datetime(df.loc[tokens.index, 'day']).dt.strftime('%Y-%m-%d').to_numpy(),
+        'keyword': tokens.to_numpy()
+    })
+    counts = keyword_df.groupby(['day', 'keyword']).size().reset_index(name='count')
+    counts = counts.sort_values(['day', 'count'], ascending=[True, False])
+    return counts.groupby('day').head(top_k).reset_index(drop=True)
+
+def backfill_keyword_counts(top_k: int = DEFAULT_TOP_K) -> bool:
+    """
+    검색 엔진 유입 로그에서 일별 키워드 집계 테이블을 만드는 함수
+
+    날짜별로 검색 채널 referrer만 읽어 집계하므로 원본 전체를 한 번에 올리지 않습니다.
+    검색어는 referrer_domain에는 없으므로 로그 테이블에 전체 URL이 담긴 referrer 컬럼이 있어야 합니다
+    (ingest.py로 적재한 로그와 같은 스키마). 컬럼이 없으면 빈 집계를 만들지 않고 실패를 반환합니다.
+
+    Args:
+        top_k (int): 일별로 남길 키워드 수
+
+    Returns:
+        bool: 성공 여부
+    """
+    config = get_bigquery_config()
+    table_ref = get_table_ref()
+
+    columns_df = load_bigquery_data(f"""
+    SELECT column_name
+    FROM `{config['project_id']}.{config['dataset']}.INFORMATION_SCHEMA.COLUMNS`
+    WHERE table_name = '{config['table']}' AND column_name = 'referrer'
+    """)
+    if columns_df is None or columns_df.empty:
+        print(f"{table_ref} 테이블에 referrer 컬럼이 없어 검색어를 추출할 수 없습니다 (전체 referrer URL을 적재해야 함)")
+        return False
+
+    days_df = load_bigquery_data(f"""
+    SELECT DISTINCT DATE(timestamp_utc) as day
+    FROM `{table_ref}`
+    WHERE channel_id = {CHANNEL_IDS['search']}
+    ORDER BY day
+    """)
+    if days_df is None:
+        return False
+
+    daily_counts = []
+    for day in days_df['day'].astype(str):
+        df = load_bigquery_data(f"""
+        SELECT DATE(timestamp_utc) as day, referrer
+        FROM `{table_ref}`
+        WHERE DATE(timestamp_utc) = '{day}'
+            AND channel_id = {CHANNEL_IDS['search']}
+            AND STRPOS(referrer, '=') > 0
+        """)
+        if df is not None and not df.empty:
+            daily_counts.append(count_daily_keywords(df, top_k))
+
+    if not daily_counts:
+        return False
+    return write_bigquery_table(pd.concat(daily_counts, ignore_index=True), KEYWORD_TABLE_SUFFIX)
+
+if __name__ == '__main__':
+    # python -m utils.keyword_utils 로 일별 검색 키워드 집계 테이블 만들기
+    print("완료" if backfill_keyword_counts() else "실패")
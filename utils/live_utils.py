@@ -0,0 +1,343 @@
+import os
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+from utils.store_utils import get_compacted_sources, has_local_store, list_days, list_day_files, list_compacted_files
+from utils.url_utils import URL_TEMPLATER
+
+# 실시간 모드 설정 (분 단위 버킷 24시간, 폴링 주기 5초)
+LIVE_WINDOW_MINUTES = 24 * 60
+LIVE_POLL_INTERVAL = 5
+# 실시간 집계에 필요한 컬럼
+LIVE_COLUMNS = ['timestamp_utc', 'status_code', 'country', 'iso3', 'url_path', 'ip', 'user_agent']
+# 방문자 수 HyperLogLog 정밀도 (레지스터 2^12개, 오차 약 1.6%)
+HLL_PRECISION = 12
+TOP_PATH_LIMIT = 10
+EXCLUDED_PATHS = {'', '/'}
+
+def hash_visitors(df: pd.DataFrame) -> np.ndarray:
+    """
+    (IP, User-agent) 쌍을 64비트 해시로 바꾸는 함수
+
+    Args:
+        df (pd.DataFrame): ip, user_agent 컬럼을 포함한 데이터프레임
+
+    Returns:
+        np.ndarray: uint64 해시 배열
+    """
+    return pd.util.hash_pandas_object(df[['ip', 'user_agent']], index=False).to_numpy()
+
+def hll_index_rank(hashes: np.ndarray, precision: int = HLL_PRECISION) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    해시마다 HyperLogLog 레지스터 번호와 값(첫 1비트 위치)을 구하는 함수
+
+    Args:
+        hashes (np.ndarray): uint64 해시 배열
+        precision (int): 레지스터 인덱스 비트 수
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (레지스터 번호, uint8 레지스터 값)
+    """
+    rest_bits = 64 - precision
+    index = (hashes >> np.uint64(rest_bits)).astype(np.int64)
+    rest = hashes & np.uint64((1 << rest_bits) - 1)
+
+    # 남은 비트의 bit length를 32비트씩 나누어 frexp로 정확히 계산
+    high = (rest >> np.uint64(32)).astype(np.float64)
+    low = (rest & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    bit_length = np.where(high > 0, np.frexp(high)[1] + 32, np.frexp(low)[1])
+    return index, (rest_bits - bit_length + 1).astype(np.uint8)
+
+def hll_registers(hashes: np.ndarray, precision: int = HLL_PRECISION) -> np.ndarray:
+    """
+    해시 목록으로 HyperLogLog 레지스터를 만드는 함수
+
+    Args:
+        hashes (np.ndarray): uint64 해시 배열
+        precision (int): 레지스터 인덱스 비트 수
+
+    Returns:
+        np.ndarray: 2^precision 크기의 uint8 레지스터
+    """
+    registers = np.zeros(1 << precision, dtype=np.uint8)
+    index, rank = hll_index_rank(hashes, precision)
+    np.maximum.at(registers, index, rank)
+    return registers
+
+def hll_estimate(registers: np.ndarray) -> int:
+    """
+    HyperLogLog 레지스터로 고유 개수를 추정하는 함수
+
+    Args:
+        registers (np.ndarray): hll_registers 결과 (여러 개는 np.maximum으로 합침)
+
+    Returns:
+        int: 추정 고유 개수
+    """
+    m = len(registers)
+    alpha = 0.7213 / (1 + 1.079 / m)
+    estimate = alpha * m * m / np.sum(np.ldexp(1.0, -registers.astype(np.int64)))
+    zeros = int(np.count_nonzero(registers == 0))
+    # 작은 값은 빈 레지스터 비율로 보정 (linear counting)
+    if estimate <= 2.5 * m and zeros > 0:
+        estimate = m * np.log(m / zeros)
+    return int(round(estimate))
+
+class LiveAggregator:
+    """
+    분 단위 버킷을 원형 버퍼로 유지하는 실시간 집계기
+
+    버킷마다 요청 수, 상태 코드별 건수, 국가별 건수, 경로별 건수, 방문자 HLL 레지스터를 두고,
+    화면 갱신 때는 창 안의 버킷만 합치므로 로그 양과 관계없이 O(버킷 수)입니다.
+    시각은 로그의 timestamp_utc 기준이며 가장 최근 로그의 분이 창의 끝입니다.
+    """
+
+    def __init__(self, window_minutes: int = LIVE_WINDOW_MINUTES, precision: int = HLL_PRECISION):
+        self.window_minutes = window_minutes
+        self.precision = precision
+        self.lock = threading.Lock()
+        self.minutes = np.full(window_minutes, -1, dtype=np.int64)
+        self.requests = np.zeros(window_minutes, dtype=np.int64)
+        self.status_codes: List[Counter] = [Counter() for _ in range(window_minutes)]
+        self.countries: List[Counter] = [Counter() for _ in range(window_minutes)]
+        self.paths: List[Counter] = [Counter() for _ in range(window_minutes)]
+        self.sketches = np.zeros((window_minutes, 1 << precision), dtype=np.uint8)
+        self.latest_minute = -1
+
+    def clear(self) -> None:
+        """모든 버킷을 비웁니다 (폴러가 처음부터 다시 읽을 때 사용)."""
+        with self.lock:
+            for slot in range(self.window_minutes):
+                self._reset_slot(slot, -1)
+            self.latest_minute = -1
+
+    def _reset_slot(self, slot: int, minute: int) -> None:
+        self.minutes[slot] = minute
+        self.requests[slot] = 0
+        self.status_codes[slot] = Counter()
+        self.countries[slot] = Counter()
+        self.paths[slot] = Counter()
+        self.sketches[slot] = 0
+
+    def add(self, df: pd.DataFrame) -> None:
+        """
+        새 로그 묶음을 분 단위 버킷에 더하는 함수 (창보다 오래된 로그는 버림)
+
+        Args:
+            df (pd.DataFrame): LIVE_COLUMNS를 포함한 로그 데이터프레임
+        """
+        if df.empty:
+            return
+        minutes = df['timestamp_utc'].to_numpy(dtype='datetime64[m]').astype(np.int64)
+        index, rank = hll_index_rank(hash_visitors(df), self.precision)
+        # 경로는 템플릿으로 묶어 버킷별 카운터 크기를 줄임
+        templates = URL_TEMPLATER.template_series(df['url_path'])
+
+        with self.lock:
+            self.latest_minute = max(self.latest_minute, int(minutes.max()))
+            keep = minutes >= self.latest_minute - self.window_minutes + 1
+            df, templates, minutes, index, rank = df[keep], templates[keep], minutes[keep], index[keep], rank[keep]
+
+            # 새 분이 들어오는 버킷은 예전 분의 값을 비움
+            for minute in np.unique(minutes):
+                slot = minute % self.window_minutes
+                if self.minutes[slot] != minute:
+                    self._reset_slot(slot, minute)
+
+            slots = minutes % self.window_minutes
+            np.add.at(self.requests, slots, 1)
+            np.maximum.at(self.sketches, (slots, index), rank)
+
+            # 버킷x값 조합별 건수를 한 번에 세고 조합마다 카운터에 더함
+            for (slot, code), count in df['status_code'].groupby([slots, df['status_code']]).size().items():
+                self.status_codes[slot][int(code)] += int(count)
+            for (slot, country, iso3), count in df.groupby([slots, df['country'], df['iso3']]).size().items():
+                self.countries[slot][(country, iso3)] += int(count)
+            for (slot, path), count in templates.groupby([slots, templates]).size().items():
+                self.paths[slot][path] += int(count)
+
+    def snapshot(self) -> Optional[Dict]:
+        """
+        창 안의 버킷을 합쳐 홈 스냅샷과 같은 형태의 데이터를 만드는 함수
+
+        Returns:
+            Optional[Dict]: version, region, status, traffic, visitors, urls 키를 가진 딕셔너리
+                또는 아직 받은 로그가 없으면 None
+        """
+        with self.lock:
+            if self.latest_minute < 0:
+                return None
+            oldest_minute = self.latest_minute - self.window_minutes + 1
+            slots = np.flatnonzero(self.minutes >= oldest_minute)
+
+            status_codes, countries, paths = Counter(), Counter(), Counter()
+            for slot in slots:
+                status_codes.update(self.status_codes[slot])
+                countries.update(self.countries[slot])
+                paths.update(self.paths[slot])
+            visitors = hll_estimate(np.max(self.sketches[slots], axis=0)) if len(slots) else 0
+
+            # 가장 최근 정시 직전까지 23시간의 시간별 요청 수
+            hours = self.minutes[slots] // 60
+            hour_counts = pd.Series(self.requests[slots]).groupby(hours).sum()
+            latest_hour = self.latest_minute // 60
+            hour_counts = hour_counts[(hour_counts.index >= latest_hour - 23) & (hour_counts.index < latest_hour)]
+            latest_minute = self.latest_minute
+
+        for path in EXCLUDED_PATHS:
+            paths.pop(path, None)
+        top_paths = paths.most_common(TOP_PATH_LIMIT)
+        hour_labels = pd.to_datetime(hour_counts.index.to_numpy() * 3600, unit='s').strftime('%Y-%m-%d %H:00')
+
+        return {
+            'version': pd.Timestamp(latest_minute * 60, unit='s', tz='UTC').isoformat(),
+            'region': [
+                {'country': country, 'iso_alpha': iso3, 'count': count}
+                for (country, iso3), count in countries.most_common()
+            ],
+            'status': [
+                {'status_code': code, 'status_group': code // 100 * 100, 'count': count}
+                for code, count in status_codes.items()
+            ],
+            'traffic': [
+                {'hour_label': label, 'count': int(count)}
+                for label, count in zip(hour_labels, hour_counts.to_numpy())
+            ],
+            # 신규/재방문 구분은 전체 기간 첫 방문 기록이 필요하므로 실시간 모드에서는 제공하지 않음
+            'visitors': {'total': visitors, 'new': None, 'returning': None},
+            'urls': {
+                'pages': [path for path, _ in top_paths],
+                'counts': [count for _, count in top_paths]
+            } if top_paths else None
+        }
+
+class LivePoller(threading.Thread):
+    """
+    로컬 저장소에 새로 추가된 파일을 주기적으로 읽어 집계기에 넣는 마이크로 배치 폴러
+
+    저장소 파일은 추가만 되므로 아직 읽지 않은 파일만 읽습니다.
+    (시각 기준으로 거르면 테일러 배치 경계에 걸친 같은 초의 로그를 놓칠 수 있음)
+    처음에는 최근 두 일 파티션을 읽고, 이후에는 가장 최근 일 파티션 디렉터리만 확인합니다.
+    테일러가 배치 파일을 시간대 파일로 합치면 합친 원본이 모두 읽은 파일인지 보고 다시 세지 않습니다.
+    """
+
+    def __init__(self, aggregator: LiveAggregator, interval: float = LIVE_POLL_INTERVAL, store_path: Optional[str] = None):
+        super().__init__(daemon=True)
+        self.aggregator = aggregator
+        self.interval = interval
+        self.store_path = store_path
+        # 일 파티션별 읽은 파일 이름 -> (수정 시각, 크기) (합친 파일의 원본 이름은 None)
+        self.seen_files: Dict[str, Dict[str, Optional[Tuple[int, int]]]] = {}
+        self.day: Optional[str] = None
+        self.stop_event = threading.Event()
+
+    def poll_day(self, day: str) -> Optional[int]:
+        """
+        일 파티션 하나에서 새 파일을 읽어 집계기에 넣는 함수
+
+        Args:
+            day (str): 'YYYY-MM-DD' 날짜
+
+        Returns:
+            Optional[int]: 읽은 로그 수 (일부만 읽은 배치를 합친 파일이 있어 처음부터 다시 읽어야 하면 None)
+        """
+        seen = self.seen_files.setdefault(day, {})
+        total_rows = 0
+        paths = list_day_files(day, self.store_path)
+        compacted = set(list_compacted_files(paths))
+        for path in paths:
+            name = os.path.basename(path)
+            if path in compacted:
+                # 합친 파일에 이미 들어간 배치 파일 (행은 합친 파일로 셈)
+                continue
+            try:
+                stat = os.stat(path)
+                version = (stat.st_mtime_ns, stat.st_size)
+                if name in seen and seen[name] in (None, version):
+                    continue
+                parquet_file = pq.ParquetFile(path)
+                sources = get_compacted_sources(parquet_file.schema_arrow)
+                unseen = sum(source not in seen for source in sources)
+                if sources and unseen == 0:
+                    seen[name] = version
+                    continue
+                if sources and unseen < len(sources):
+                    return None
+                df = parquet_file.read(columns=LIVE_COLUMNS).to_pandas()
+            except FileNotFoundError:
+                # 테일러가 합치면서 지운 배치 파일 (행은 합친 파일로 읽음)
+                continue
+            self.aggregator.add(df)
+            seen[name] = version
+            seen.update((source, None) for source in sources)
+            total_rows += len(df)
+        return total_rows
+
+    def poll(self) -> int:
+        """
+        새 파일을 한 번 읽어 집계기에 넣는 함수
+
+        Returns:
+            int: 읽은 로그 수
+        """
+        days = list_days(self.store_path)[-2:]
+        if not days:
+            return 0
+        if self.day is not None:
+            # 날짜가 바뀌는 폴링에서만 이전 날짜를 한 번 더 확인
+            days = [day for day in days if day >= self.day]
+
+        total_rows = 0
+        for day in days:
+            rows = self.poll_day(day)
+            if rows is None:
+                self.aggregator.clear()
+                self.seen_files = {}
+                self.day = None
+                return self.poll()
+            total_rows += rows
+
+        if self.day != days[-1]:
+            # 지난 날짜의 읽은 파일 기록은 버림 (seen_files가 하루치 이상 쌓이지 않도록)
+            self.day = days[-1]
+            self.seen_files = {day: seen for day, seen in self.seen_files.items() if day == self.day}
+        return total_rows
+
+    def run(self) -> None:
+        while not self.stop_event.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"Error in LivePoller: {str(e)}")
+            self.stop_event.wait(self.interval)
+
+    def stop(self) -> None:
+        self.stop_event.set()
+
+# 앱 전체에서 공유하는 실시간 집계기와 폴러
+LIVE_AGGREGATOR = LiveAggregator()
+_live_poller: Optional[LivePoller] = None
+_live_poller_lock = threading.Lock()
+
+def start_live_poller(store_path: Optional[str] = None) -> bool:
+    """
+    로컬 저장소 폴러를 한 번만 시작하는 함수
+
+    Args:
+        store_path (Optional[str]): 저장소 경로 (기본값: get_store_path())
+
+    Returns:
+        bool: 폴러가 실행 중이면 True (로컬 저장소가 없으면 False)
+    """
+    global _live_poller
+    with _live_poller_lock:
+        if _live_poller is not None and _live_poller.is_alive():
+            return True
+        if not has_local_store(store_path):
+            return False
+        _live_poller = LivePoller(LIVE_AGGREGATOR, store_path=store_path)
+        _live_poller.start()
+        return True
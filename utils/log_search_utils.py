@@ -0,0 +1,245 @@
+import datetime
+import uuid
+from typing import Dict, Iterator, List, Optional, Tuple
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from cachetools import TTLCache
+from utils.utils import get_bigquery_config
+
+# 검색 세션 보관 (검색 결과를 한 번만 만들고 페이지/정렬 변경은 세션에서 처리)
+SEARCH_SESSION_TTL = 30 * 60
+SEARCH_SESSIONS = TTLCache(maxsize=64, ttl=SEARCH_SESSION_TTL)
+
+# 내보내기 배치 크기 (행)
+EXPORT_BATCH_SIZE = 64 * 1024
+
+# 로그 검색 결과 컬럼
+SEARCH_RESULT_COLUMNS = [
+    'ip', 'status_code', 'timestamp_utc', 'url', 'geo', 'http_method',
+    'user_agent', 'user_browser', 'user_os', 'user_is_mobile', 'user_is_bot'
+]
+
+# 검색 결과 테이블 컬럼 ID -> 정렬 컬럼
+SEARCH_SORT_COLUMNS = {
+    'timestamp': 'timestamp_utc',
+    'status_code': 'status_code',
+    'ip': 'ip',
+    'url': 'url',
+    'geo': 'geo',
+    'http_method': 'http_method',
+    'user_browser': 'user_browser',
+    'user_os': 'user_os',
+    'user_is_mobile': 'user_is_mobile',
+    'user_is_bot': 'user_is_bot'
+}
+
+# BigQuery 키셋 페이지네이션용 정렬 키 (NULL도 비교할 수 있도록 기본값 사용)
+BIGQUERY_SORT_KEYS = {
+    'timestamp_utc': 'timestamp_utc',
+    'status_code': 'CAST(status_code AS INT64)',
+    'ip': "IFNULL(ip, '')",
+    'url': "IFNULL(url, '')",
+    'geo': "IFNULL(geo, '')",
+    'http_method': "IFNULL(http_method, '')",
+    'user_browser': "IFNULL(user_browser, '')",
+    'user_os': "IFNULL(user_os, '')",
+    'user_is_mobile': 'IFNULL(CAST(user_is_mobile AS INT64), -1)',
+    'user_is_bot': 'IFNULL(CAST(user_is_bot AS INT64), -1)',
+}
+DEFAULT_SORT = ('timestamp_utc', True)
+
+def to_query_value(value):
+    """pandas/NumPy 스칼라를 쿼리 파라미터로 쓸 수 있는 파이썬 값으로 바꿉니다."""
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    return value.item() if hasattr(value, 'item') else value
+
+def query_parameter_type(value) -> str:
+    """쿼리 파라미터 값의 BigQuery 타입을 반환합니다."""
+    if isinstance(value, datetime.datetime):
+        return 'TIMESTAMP'
+    if isinstance(value, int):
+        return 'INT64'
+    return 'STRING'
+
+class LocalSearchSession:
+    """
+    로컬 저장소 검색 결과(Arrow 테이블)를 들고 있는 검색 세션
+
+    정렬 기준별 정렬 순서를 한 번만 계산해 두고 페이지는 그 순서에서 잘라 가져옵니다.
+    """
+
+    def __init__(self, table: pa.Table):
+        self.table = table
+        self.schema = table.schema
+        self.total_count = table.num_rows
+        self.sort_indices: Dict[Tuple[str, bool], pa.Array] = {}
+
+    def get_page(self, page: int, page_size: int, sort_column: str, descending: bool) -> pd.DataFrame:
+        """
+        정렬된 결과에서 한 페이지를 가져오는 함수
+
+        Args:
+            page (int): 페이지 번호 (0부터)
+            page_size (int): 페이지 크기
+            sort_column (str): 정렬 컬럼
+            descending (bool): 내림차순 여부
+
+        Returns:
+            pd.DataFrame: 페이지 데이터프레임
+        """
+        key = (sort_column, descending)
+        if key not in self.sort_indices:
+            self.sort_indices[key] = pc.sort_indices(
+                self.table,
+                sort_keys=[(sort_column, 'descending' if descending else 'ascending')]
+            )
+        indices = self.sort_indices[key].slice(page * page_size, page_size)
+        return self.table.take(indices).to_pandas()
+
+    def iter_batches(self) -> Iterator[pa.RecordBatch]:
+        """
+        검색 결과 전체를 레코드 배치 단위로 내보내는 함수 (복사 없이 테이블을 잘라서 반환)
+
+        Returns:
+            Iterator[pa.RecordBatch]: 레코드 배치
+        """
+        return iter(self.table.to_batches(max_chunksize=EXPORT_BATCH_SIZE))
+
+class BigQuerySearchSession:
+    """
+    BigQuery 검색 결과(쿼리 작업의 임시 결과 테이블)를 가리키는 검색 세션
+
+    필터 쿼리는 세션을 만들 때 한 번만 실행하고, 페이지는 결과 테이블에서
+    (정렬 키, row_id) 키셋 조건으로 가져옵니다. 읽은 페이지의 경계 값을 기억해 두어
+    다음/이전 페이지는 OFFSET 없이, 멀리 떨어진 페이지는 가장 가까운 경계부터 읽습니다.
+    """
+
+    def __init__(self, query: str):
+        from google.cloud import bigquery
+
+        config = get_bigquery_config()
+        self.client = bigquery.Client(project=config['project_id'])
+        # row_id는 정렬 키가 같은 행들 사이의 순서를 고정하는 보조 키
+        job = self.client.query(f"SELECT *, GENERATE_UUID() AS row_id FROM ({query})")
+        self.total_count = job.result().total_rows
+        destination = job.destination
+        self.result_table = f"{destination.project}.{destination.dataset_id}.{destination.table_id}"
+        # 결과가 비어도 내보내기 파일에 헤더/스키마를 쓸 수 있도록 결과 스키마를 미리 읽어 둠
+        self.schema = self.client.list_rows(
+            self.result_table, selected_fields=self.export_fields(), max_results=0
+        ).to_arrow(create_bqstorage_client=False).schema
+        # (정렬 컬럼, 내림차순 여부) -> {페이지 크기: {페이지 번호: 마지막 행의 (정렬 키, row_id)}}
+        self.boundaries: Dict[Tuple[str, bool], Dict[int, Dict[int, tuple]]] = {}
+
+    def get_page(self, page: int, page_size: int, sort_column: str, descending: bool) -> pd.DataFrame:
+        """
+        키셋 페이지네이션으로 한 페이지를 가져오는 함수
+
+        Args:
+            page (int): 페이지 번호 (0부터)
+            page_size (int): 페이지 크기
+            sort_column (str): 정렬 컬럼
+            descending (bool): 내림차순 여부
+
+        Returns:
+            pd.DataFrame: 페이지 데이터프레임
+        """
+        from google.cloud import bigquery
+
+        sort_key = BIGQUERY_SORT_KEYS.get(sort_column, BIGQUERY_SORT_KEYS[DEFAULT_SORT[0]])
+        direction, comparison = ('DESC', '<') if descending else ('ASC', '>')
+        boundaries = self.boundaries.setdefault((sort_column, descending), {}).setdefault(page_size, {})
+
+        # 요청한 페이지 직전에서 가장 가까운 경계부터 읽기
+        known_pages = [p for p in boundaries if p < page]
+        anchor_page = max(known_pages, default=-1)
+        offset = (page - anchor_page - 1) * page_size
+
+        where_clause = "TRUE"
+        parameters = []
+        if anchor_page >= 0:
+            sort_value, row_id = boundaries[anchor_page]
+            where_clause = f"({sort_key} {comparison} @sort_value OR ({sort_key} = @sort_value AND row_id {comparison} @row_id))"
+            parameters = [
+                bigquery.ScalarQueryParameter('sort_value', query_parameter_type(sort_value), sort_value),
+                bigquery.ScalarQueryParameter('row_id', 'STRING', row_id),
+            ]
+
+        query = f"""
+        SELECT *, {sort_key} AS sort_value
+        FROM `{self.result_table}`
+        WHERE {where_clause}
+        ORDER BY sort_value {direction}, row_id {direction}
+        LIMIT {page_size} OFFSET {offset}
+        """
+        df = self.client.query(query, job_config=bigquery.QueryJobConfig(query_parameters=parameters)).to_dataframe()
+
+        if not df.empty:
+            last = df.iloc[-1]
+            boundaries[page] = (to_query_value(last['sort_value']), last['row_id'])
+        return df.drop(columns=['sort_value', 'row_id'])
+
+    def export_fields(self) -> list:
+        """결과 테이블에서 내보낼 컬럼(row_id 제외)의 스키마 필드를 반환합니다."""
+        table = self.client.get_table(self.result_table)
+        return [field for field in table.schema if field.name != 'row_id']
+
+    def iter_batches(self) -> Iterator[pa.RecordBatch]:
+        """
+        결과 테이블 전체를 레코드 배치 단위로 내보내는 함수
+
+        BigQuery Storage API(BigQueryReadClient)로 결과 테이블을 스트림으로 읽으므로
+        전체 결과를 메모리에 올리지 않습니다.
+
+        Returns:
+            Iterator[pa.RecordBatch]: 레코드 배치 (row_id 컬럼 제외)
+        """
+        from google.cloud import bigquery_storage
+
+        rows = self.client.list_rows(self.result_table, selected_fields=self.export_fields(), page_size=EXPORT_BATCH_SIZE)
+        return iter(rows.to_arrow_iterable(bqstorage_client=bigquery_storage.BigQueryReadClient()))
+
+def create_search_session(session) -> str:
+    """
+    검색 세션을 보관하고 세션 ID를 반환하는 함수
+
+    Args:
+        session: LocalSearchSession 또는 BigQuerySearchSession
+
+    Returns:
+        str: 세션 ID
+    """
+    session_id = uuid.uuid4().hex
+    SEARCH_SESSIONS[session_id] = session
+    return session_id
+
+def get_search_session(session_id: Optional[str]):
+    """
+    세션 ID로 검색 세션을 찾는 함수
+
+    Args:
+        session_id (Optional[str]): 세션 ID
+
+    Returns:
+        검색 세션 또는 만료되었거나 없으면 None
+    """
+    if not session_id:
+        return None
+    return SEARCH_SESSIONS.get(session_id)
+
+def parse_sort_by(sort_by: Optional[List[dict]], column_mapping: Dict[str, str]) -> Tuple[str, bool]:
+    """
+    DataTable의 sort_by 값을 (정렬 컬럼, 내림차순 여부)로 바꾸는 함수
+
+    Args:
+        sort_by (Optional[List[dict]]): DataTable sort_by 값
+        column_mapping (Dict[str, str]): 테이블 컬럼 ID -> 결과 컬럼 이름
+
+    Returns:
+        Tuple[str, bool]: (정렬 컬럼, 내림차순 여부)
+    """
+    if not sort_by or sort_by[0]['column_id'] not in column_mapping:
+        return DEFAULT_SORT
+    return column_mapping[sort_by[0]['column_id']], sort_by[0]['direction'] == 'desc'
@@ -0,0 +1,269 @@
+import os
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+from utils.store_utils import get_store_path, list_days, open_log_dataset, atomic_write, mtime_cache
+from utils.visitor_utils import load_visitor_dictionary, visitor_keys
+from utils.session_utils import assign_sessions
+from utils.referrer_utils import CHANNEL_ID_LABELS
+from utils.url_utils import URL_TEMPLATER, UrlTemplater, get_url_template_path
+
+# 저장소 안의 경로 분석 색인 디렉터리 ('_' 접두사라 데이터셋 스캔에서 제외됨)
+PATH_INDEX_DIRNAME = '_path_index'
+PATH_DICTIONARY_FILENAME = 'paths.parquet'
+PATH_COLUMNS = ['ip', 'user_agent', 'timestamp_utc', 'url_path', 'channel_id']
+# 세션 경로 n-gram 길이 (유입 채널 → 첫 페이지 → 다음 페이지)
+PATH_NGRAM_SIZE = 3
+# 세션 마지막 페이지 뒤에 붙이는 이탈 토큰
+EXIT_LABEL = '(이탈)'
+# n-gram 키를 만들 때 토큰마다 곱하는 홀수 상수 (토큰 순서가 키에 반영되도록)
+NGRAM_HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+def hash_tokens(values: np.ndarray) -> np.ndarray:
+    """
+    url_path 같은 문자열 토큰을 64비트 정수로 바꾸는 함수
+
+    Args:
+        values (np.ndarray): 문자열 배열
+
+    Returns:
+        np.ndarray: uint64 해시 배열
+    """
+    return pd.util.hash_array(np.asarray(values, dtype=object))
+
+def channel_token(channel_id: int) -> str:
+    """유입 채널을 경로 토큰 문자열로 바꿉니다."""
+    return f"[{CHANNEL_ID_LABELS.get(channel_id, channel_id)}]"
+
+# 유입 채널 토큰 해시 (n-gram 첫 토큰이 이 값이면 세션 시작 n-gram)
+CHANNEL_TOKENS = {
+    int(token_hash): channel_id
+    for channel_id, token_hash in zip(CHANNEL_ID_LABELS, hash_tokens([channel_token(channel_id) for channel_id in CHANNEL_ID_LABELS]))
+}
+
+def count_ngrams(tokens: np.ndarray, session_ids: np.ndarray, n: int) -> pd.DataFrame:
+    """
+    세션 순서대로 정렬된 토큰 시퀀스에서 같은 세션 안의 연속된 n개 토큰(n-gram)을 세는 함수
+
+    n개 토큰 해시를 하나의 64비트 키로 섞은 뒤 고유 키별로 한 번에 세므로 반복문 없이 희소 집계됩니다.
+
+    Args:
+        tokens (np.ndarray): uint64 토큰 해시 (세션별로 연속, 세션 안에서 시간순)
+        session_ids (np.ndarray): 토큰별 세션 번호
+        n (int): n-gram 길이
+
+    Returns:
+        pd.DataFrame: token_0 ~ token_{n-1}, count 컬럼 데이터프레임 (COO 희소 텐서)
+    """
+    columns = [f"token_{i}" for i in range(n)] + ['count']
+    if len(tokens) < n:
+        return pd.DataFrame({column: pd.Series(dtype='uint64') for column in columns})
+
+    # 시작 위치 i에서 i+n-1까지 같은 세션이면 유효한 n-gram
+    starts = np.flatnonzero(session_ids[:len(tokens) - n + 1] == session_ids[n - 1:])
+    grams = np.stack([tokens[starts + i] for i in range(n)], axis=1)
+
+    keys = np.zeros(len(starts), dtype=np.uint64)
+    for i in range(n):
+        keys = keys * NGRAM_HASH_MULTIPLIER + grams[:, i]
+    unique_keys, first, counts = np.unique(keys, return_index=True, return_counts=True)
+
+    result = pd.DataFrame(grams[first], columns=columns[:-1])
+    result['count'] = counts.astype(np.uint64)
+    return result
+
+def build_session_tokens(
+    df: pd.DataFrame,
+    dictionary,
+    templater: UrlTemplater = URL_TEMPLATER
+) -> Tuple[np.ndarray, np.ndarray, pd.DataFrame]:
+    """
+    하루치 로그를 세션별 [유입 채널, 페이지..., 이탈] 토큰 시퀀스로 바꾸는 함수
+
+    페이지 토큰은 원본 url_path가 아니라 경로 템플릿(/product/{id}/* 등)이라 상품 ID마다 갈라지지 않습니다.
+
+    Args:
+        df (pd.DataFrame): PATH_COLUMNS(있으면 url_template_id 포함)를 포함한 하루치 로그
+        dictionary (VisitorDictionary): 방문자 사전
+        templater (UrlTemplater): url_template_id를 템플릿 문자열로 바꿀 템플릿 사전
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, pd.DataFrame]: (토큰 해시, 토큰별 세션 번호, token_hash/label 토큰 사전)
+    """
+    seconds = df['timestamp_utc'].dt.tz_localize(None).to_numpy().astype('datetime64[s]').astype(np.int64)
+    order, boundary = assign_sessions(dictionary.lookup(visitor_keys(df)), seconds)
+    templates = templater.template_labels(df['url_path'], df.get('url_template_id'))
+    paths = templates.fillna('').to_numpy(dtype=object)[order]
+    channel_ids = df['channel_id'].fillna(-1).to_numpy(dtype=np.int64)[order][boundary]
+
+    starts = np.flatnonzero(boundary)
+    ends = np.append(starts[1:], len(order))
+    channel_labels = np.array([channel_token(channel_id) for channel_id in channel_ids], dtype=object)
+
+    # 세션 시작 앞에 채널 토큰, 세션 끝 뒤에 이탈 토큰 삽입
+    labels = np.insert(paths, ends, EXIT_LABEL)
+    labels = np.insert(labels, starts + np.arange(len(starts)), channel_labels)
+    session_ids = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, len(order))) + 2)
+
+    unique_labels, inverse = np.unique(labels.astype(str), return_inverse=True)
+    unique_hashes = hash_tokens(unique_labels)
+    vocabulary = pd.DataFrame({'token_hash': unique_hashes, 'label': unique_labels.astype(object)})
+    return unique_hashes[inverse], session_ids, vocabulary
+
+def get_path_index_dir(store_path: Optional[str] = None) -> str:
+    """
+    경로 분석 색인 디렉터리 경로를 반환하는 함수
+
+    Args:
+        store_path (Optional[str]): 저장소 경로 (기본값: get_store_path())
+
+    Returns:
+        str: 디렉터리 경로
+    """
+    return os.path.join(store_path or get_store_path(), PATH_INDEX_DIRNAME)
+
+def build_path_index(
+    days: Optional[List[str]] = None,
+    store_path: Optional[str] = None,
+    templater: Optional[UrlTemplater] = None
+) -> None:
+    """
+    일 파티션별 세션 경로 n-gram 집계와 토큰 사전을 만드는 함수 (방문자 색인을 먼저 만들어야 함)
+
+    Args:
+        days (Optional[List[str]]): 색인을 만들 날짜 목록 (기본값: 전체)
+        store_path (Optional[str]): 저장소 경로 (기본값: get_store_path())
+        templater (Optional[UrlTemplater]): URL 템플릿 사전 (기본값: URL_TEMPLATER, 다른 스레드에서 부를 때는 사본을 넘김)
+    """
+    dictionary = load_visitor_dictionary(store_path)
+    if dictionary is None:
+        return
+
+    index_dir = get_path_index_dir(store_path)
+    os.makedirs(index_dir, exist_ok=True)
+    dictionary_path = os.path.join(index_dir, PATH_DICTIONARY_FILENAME)
+    vocabularies = [pd.read_parquet(dictionary_path)] if os.path.exists(dictionary_path) else []
+
+    # 적재/테일러 프로세스가 아니면 템플릿 사전을 저장소에서 불러옴
+    if templater is None:
+        templater = URL_TEMPLATER
+        if not templater.templates:
+            templater.load(get_url_template_path(store_path))
+
+    dataset = open_log_dataset(store_path)
+    # url_template_id 컬럼이 생기기 전 저장소는 경로를 바로 템플릿으로 바꿈
+    columns = PATH_COLUMNS + (['url_template_id'] if 'url_template_id' in dataset.schema.names else [])
+    for day in days or list_days(store_path):
+        df = dataset.to_table(columns=columns, filter=ds.field('day') == day).to_pandas()
+        if df.empty:
+            continue
+        tokens, session_ids, vocabulary = build_session_tokens(df, dictionary, templater)
+        vocabularies.append(vocabulary)
+
+        with atomic_write(os.path.join(index_dir, f"day={day}.parquet")) as temp_path:
+            count_ngrams(tokens, session_ids, PATH_NGRAM_SIZE).to_parquet(temp_path, index=False, compression='zstd')
+
+    if vocabularies:
+        vocabulary = pd.concat(vocabularies, ignore_index=True).drop_duplicates('token_hash')
+        with atomic_write(dictionary_path) as temp_path:
+            vocabulary.to_parquet(temp_path, index=False, compression='zstd')
+
+@mtime_cache(maxsize=256)
+def _load_day_ngrams(path: str, first_tokens: Optional[Tuple[int, ...]]) -> pd.DataFrame:
+    # 첫 토큰 조건이 있으면 해당 n-gram만 읽어 캐시 (하루치 전체 n-gram을 들고 있지 않음)
+    filters = ds.field('token_0').isin(pa.array(first_tokens, pa.uint64())) if first_tokens is not None else None
+    return pd.read_parquet(path, filters=filters)
+
+@mtime_cache(maxsize=4)
+def _load_vocabulary(path: str) -> Dict[int, str]:
+    vocabulary = pd.read_parquet(path)
+    return dict(zip(vocabulary['token_hash'].astype(np.uint64).tolist(), vocabulary['label']))
+
+def load_path_ngrams(
+    start_date: str,
+    end_date: str,
+    first_tokens: Optional[List[int]] = None,
+    store_path: Optional[str] = None
+) -> Optional[pd.DataFrame]:
+    """
+    기간의 일별 n-gram 희소 집계를 더해 하나로 합치는 함수
+
+    Args:
+        start_date (str): 시작 날짜
+        end_date (str): 종료 날짜
+        first_tokens (Optional[List[int]]): 첫 토큰이 이 해시 중 하나인 n-gram만 읽음 (기본값: 전체)
+        store_path (Optional[str]): 저장소 경로
+
+    Returns:
+        Optional[pd.DataFrame]: token_0 ~ token_{n-1}, count 데이터프레임 또는 데이터가 없으면 None
+    """
+    index_dir = get_path_index_dir(store_path)
+    first_tokens = tuple(sorted(first_tokens)) if first_tokens is not None else None
+    frames = []
+    for day in list_days(store_path):
+        if start_date <= day <= end_date:
+            ngrams = _load_day_ngrams(os.path.join(index_dir, f"day={day}.parquet"), first_tokens)
+            if ngrams is not None:
+                frames.append(ngrams)
+    if not frames:
+        return None
+
+    token_columns = [f"token_{i}" for i in range(PATH_NGRAM_SIZE)]
+    return pd.concat(frames, ignore_index=True).groupby(token_columns, as_index=False)['count'].sum()
+
+def load_path_vocabulary(store_path: Optional[str] = None) -> Dict[int, str]:
+    """
+    토큰 해시 → 라벨(url_path, 채널, 이탈) 사전을 불러오는 함수
+
+    Args:
+        store_path (Optional[str]): 저장소 경로
+
+    Returns:
+        Dict[int, str]: 토큰 해시별 라벨 (색인이 없으면 빈 딕셔너리)
+    """
+    vocabulary = _load_vocabulary(os.path.join(get_path_index_dir(store_path), PATH_DICTIONARY_FILENAME))
+    return vocabulary if vocabulary is not None else {}
+
+def has_path_index(store_path: Optional[str] = None) -> bool:
+    """
+    경로 분석 색인이 있는지 확인하는 함수
+
+    Args:
+        store_path (Optional[str]): 저장소 경로
+
+    Returns:
+        bool: 토큰 사전 파일이 있으면 True
+    """
+    return os.path.exists(os.path.join(get_path_index_dir(store_path), PATH_DICTIONARY_FILENAME))
+
+def entry_paths(start_date: str, end_date: str, store_path: Optional[str] = None) -> Optional[pd.DataFrame]:
+    """
+    기간의 유입 채널 → 첫 페이지 → 다음 페이지별 세션 수를 계산하는 함수
+
+    세션 시작 n-gram(첫 토큰이 유입 채널)만 골라 라벨로 바꿉니다. 한 페이지만 본 세션의 다음 페이지는 EXIT_LABEL입니다.
+
+    Args:
+        start_date (str): 시작 날짜
+        end_date (str): 종료 날짜
+        store_path (Optional[str]): 저장소 경로
+
+    Returns:
+        Optional[pd.DataFrame]: channel, landing_path, next_path, sessions 컬럼 데이터프레임 또는 데이터가 없으면 None
+    """
+    entries = load_path_ngrams(start_date, end_date, list(CHANNEL_TOKENS), store_path)
+    if entries is None or entries.empty:
+        return None
+    vocabulary = load_path_vocabulary(store_path)
+    return pd.DataFrame({
+        'channel': entries['token_0'].map(CHANNEL_TOKENS).map(CHANNEL_ID_LABELS).to_numpy(),
+        'landing_path': entries['token_1'].map(vocabulary).to_numpy(),
+        'next_path': entries['token_2'].map(vocabulary).to_numpy(),
+        'sessions': entries['count'].astype(np.int64).to_numpy()
+    })
+
+if __name__ == '__main__':
+    # python -m utils.path_utils 로 전체 일 파티션의 경로 분석 색인 다시 만들기
+    build_path_index()
+    print("완료")
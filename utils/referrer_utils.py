@@ -0,0 +1,288 @@
+from collections import deque
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+from utils.utils import get_table_ref, load_bigquery_data, execute_bigquery, write_bigquery_table
+
+# 유입 채널 분류 정의 (도메인 자신 또는 서브도메인과 일치)
+REFERRER_CHANNELS = {
+    'direct': ['direct', '(direct)', '', None, 'zanbil.ir', 'znbl.ir', 'www.zanbil.ir', 'www.znbl.ir'],
+    'social': [
+        'facebook.com', 'instagram.com', 'twitter.com', 'linkedin.com',
+        't.co', 'fb.com', 'lnkd.in', 'social.com'
+    ],
+    'search': [
+        'google.com', 'naver.com', 'daum.net', 'bing.com',
+        'yahoo.com', 'duckduckgo.com'
+    ],
+}
+
+# 부분 문자열 규칙 (국가별 도메인 등, 예: google.co.kr, m.facebook.ir)
+REFERRER_KEYWORDS = {
+    'social': ['facebook.', 'instagram.', 'twitter.', 'linkedin.'],
+    'search': ['google.', 'naver.', 'daum.', 'bing.', 'yahoo.', 'duckduckgo.'],
+}
+
+# 화면에 표시할 채널 이름 (딕셔너리 순서가 규칙 우선순위)
+CHANNEL_LABELS = {
+    'direct': '직접 접속',
+    'social': '소셜 미디어',
+    'search': '검색 엔진',
+    'others': '기타',
+}
+
+# 로그 테이블에 저장하는 정수 채널 키
+CHANNEL_IDS = {channel: i for i, channel in enumerate(CHANNEL_LABELS)}
+CHANNEL_ID_LABELS = {CHANNEL_IDS[channel]: label for channel, label in CHANNEL_LABELS.items()}
+LABEL_CHANNEL_IDS = {label: channel_id for channel_id, label in CHANNEL_ID_LABELS.items()}
+
+# 등록 가능 도메인 계산 시 한 단계 더 포함하는 2단계 접미사 (예: google.co.kr)
+SECOND_LEVEL_LABELS = {'co', 'com', 'net', 'org', 'ac', 'gov', 'edu', 'or', 'ne', 'go', 'sch', 'id'}
+REFERRER_TABLE_SUFFIX = '_referrer'
+
+class ChannelMatcher:
+    """
+    유입 채널 규칙을 한 번 컴파일해 두고 도메인을 분류하는 클래스
+
+    - 도메인 규칙: 레이블을 뒤집어 넣은 접미사 트라이 (facebook.com -> com, facebook)
+    - 부분 문자열 규칙: Aho-Corasick 오토마톤
+    - 여러 규칙이 일치하면 CHANNEL_LABELS 순서가 앞선 채널을 선택
+    """
+
+    def __init__(self, channels: Dict[str, List[Optional[str]]], keywords: Dict[str, List[str]]):
+        self.channels = list(CHANNEL_LABELS)
+        self.priority = {channel: i for i, channel in enumerate(self.channels)}
+        self.default = len(self.channels) - 1  # 기타
+
+        # 점이 없는 값은 정확히 일치해야 하는 토큰으로 취급
+        self.exact = {}
+        self.suffixes = {}
+        for channel, domains in channels.items():
+            for domain in domains:
+                domain = (domain or '').lower()
+                if '.' in domain:
+                    self.suffixes.setdefault(domain, self.priority[channel])
+                else:
+                    self.exact.setdefault(domain, self.priority[channel])
+        self.keywords = {
+            keyword.lower(): self.priority[channel]
+            for channel, words in keywords.items() for keyword in words
+        }
+
+        self._build_trie()
+        self._build_automaton()
+
+    def _build_trie(self):
+        self.trie = {}
+        for domain, priority in self.suffixes.items():
+            node = self.trie
+            for label in reversed(domain.split('.')):
+                node = node.setdefault(label, {})
+            node['$'] = min(priority, node.get('$', priority))
+
+    def _build_automaton(self):
+        # goto 테이블, 실패 링크, 출력(상태에서 끝나는 규칙 중 최우선 채널)
+        self.goto = [{}]
+        self.out = [self.default + 1]
+        for keyword, priority in self.keywords.items():
+            state = 0
+            for char in keyword:
+                if char not in self.goto[state]:
+                    self.goto.append({})
+                    self.out.append(self.default + 1)
+                    self.goto[state][char] = len(self.goto) - 1
+                state = self.goto[state][char]
+            self.out[state] = min(self.out[state], priority)
+
+        self.fail = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self.goto[state].items():
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                self.out[child] = min(self.out[child], self.out[self.fail[child]])
+                queue.append(child)
+
+    def _match_suffix(self, domain: str) -> int:
+        best = self.default + 1
+        node = self.trie
+        for label in reversed(domain.split('.')):
+            node = node.get(label)
+            if node is None:
+                break
+            best = min(best, node.get('$', best))
+        return best
+
+    def _match_keywords(self, domain: str) -> int:
+        best = self.default + 1
+        state = 0
+        for char in domain:
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            best = min(best, self.out[state])
+        return best
+
+    def match(self, domain: Optional[str]) -> str:
+        """도메인 하나의 채널 키('direct', 'social', 'search', 'others')를 반환합니다."""
+        if not isinstance(domain, str):
+            return self.channels[self.exact.get('', self.default)]
+        domain = domain.strip().lower()
+        if domain in self.exact:
+            return self.channels[self.exact[domain]]
+        best = min(self._match_suffix(domain), self._match_keywords(domain))
+        return self.channels[min(best, self.default)]
+
+    def classify(self, domains: pd.Series) -> pd.Series:
+        """
+        도메인 컬럼 전체를 채널 키로 분류합니다.
+
+        고유 도메인만 분류한 뒤 원래 행으로 펼치므로 행 수와 무관하게
+        고유 도메인 수만큼만 매칭합니다.
+        """
+        codes, uniques = pd.factorize(domains)
+        # 마지막 칸은 결측값(-1 코드)용
+        lookup = np.array([self.match(domain) for domain in uniques] + [self.match(None)], dtype=object)
+        return pd.Series(lookup[codes], index=domains.index)
+
+    def to_sql_case(self, column: str, values: Optional[Dict[str, str]] = None) -> str:
+        """
+        같은 규칙으로 BigQuery CASE 식을 생성합니다.
+
+        Args:
+            column (str): 도메인 컬럼 이름
+            values (Optional[Dict[str, str]]): 채널 키별 결과 SQL 값 (기본값: 채널 이름 문자열)
+
+        Returns:
+            str: CASE ... END 식
+        """
+        if values is None:
+            values = {channel: f"'{label}'" for channel, label in CHANNEL_LABELS.items()}
+        col = f"LOWER(TRIM({column}))"
+
+        conditions = {channel: [] for channel in self.channels}
+        for channel in self.channels:
+            tokens = [f"'{token}'" for token, priority in self.exact.items() if self.channels[priority] == channel]
+            if tokens:
+                conditions[channel].append(f"{col} IN ({', '.join(tokens)})")
+        for domain, priority in self.suffixes.items():
+            conditions[self.channels[priority]].append(f"({col} = '{domain}' OR ENDS_WITH({col}, '.{domain}'))")
+        for keyword, priority in self.keywords.items():
+            conditions[self.channels[priority]].append(f"STRPOS({col}, '{keyword}') > 0")
+        if '' in self.exact:
+            conditions[self.channels[self.exact['']]].insert(0, f"{column} IS NULL")
+
+        lines = ["CASE"]
+        for channel in self.channels[:self.default]:
+            if conditions[channel]:
+                lines.append(f"    WHEN {' OR '.join(conditions[channel])} THEN {values[channel]}")
+        lines.append(f"    ELSE {values[self.channels[self.default]]}")
+        lines.append("END")
+        return "\n".join(lines)
+
+# 모듈 로드 시 한 번만 컴파일
+CHANNEL_MATCHER = ChannelMatcher(REFERRER_CHANNELS, REFERRER_KEYWORDS)
+
+def registrable_domain(domain: Optional[str]) -> Optional[str]:
+    """
+    서브도메인을 제거한 등록 가능 도메인을 반환하는 함수 (예: m.blog.naver.com -> naver.com)
+
+    Args:
+        domain (Optional[str]): referrer_domain 값
+
+    Returns:
+        Optional[str]: 등록 가능 도메인 또는 빈 값이면 None
+    """
+    if not isinstance(domain, str) or not domain.strip():
+        return None
+    labels = domain.strip().lower().rstrip('.').split('.')
+    size = 2
+    if len(labels) >= 3 and len(labels[-1]) == 2 and labels[-2] in SECOND_LEVEL_LABELS:
+        size = 3
+    return '.'.join(labels[-size:])
+
+def build_referrer_dimension(domains: pd.Series) -> pd.DataFrame:
+    """
+    고유 referrer_domain별 channel_id와 registrable_domain 차원 테이블을 만드는 함수
+
+    Args:
+        domains (pd.Series): referrer_domain 컬럼
+
+    Returns:
+        pd.DataFrame: referrer_domain, registrable_domain, channel_id 데이터프레임
+    """
+    unique_domains = pd.Series(domains.dropna().unique(), dtype='object')
+    return pd.DataFrame({
+        'referrer_domain': unique_domains,
+        'registrable_domain': unique_domains.map(registrable_domain),
+        'channel_id': CHANNEL_MATCHER.classify(unique_domains).map(CHANNEL_IDS).astype('int64')
+    })
+
+def enrich_referrer(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    로그 데이터프레임에 channel_id, registrable_domain 컬럼을 추가하는 함수
+
+    Args:
+        df (pd.DataFrame): referrer_domain 컬럼을 포함한 로그 데이터프레임
+
+    Returns:
+        pd.DataFrame: 유입 채널 컬럼이 추가된 데이터프레임
+    """
+    codes, uniques = pd.factorize(df['referrer_domain'])
+    unique_domains = pd.Series(uniques, dtype='object')
+    # 마지막 칸은 결측값(-1 코드)용
+    channel_ids = np.append(CHANNEL_MATCHER.classify(unique_domains).map(CHANNEL_IDS).to_numpy(dtype='int8'),
+                            CHANNEL_IDS[CHANNEL_MATCHER.match(None)])
+    domains = np.append(unique_domains.map(registrable_domain).to_numpy(dtype=object), None)
+    df['channel_id'] = channel_ids[codes]
+    df['registrable_domain'] = domains[codes]
+    return df
+
+def backfill_referrer_columns() -> bool:
+    """
+    BigQuery 로그 테이블에 channel_id, registrable_domain 컬럼을 채우는 함수
+
+    channel_id는 같은 규칙에서 생성한 CASE 식으로, registrable_domain은
+    고유 도메인 차원 테이블과의 조인으로 한 번만 기록합니다.
+
+    Returns:
+        bool: 성공 여부
+    """
+    table_ref = get_table_ref()
+
+    dim_df = load_bigquery_data(f"""
+    SELECT DISTINCT referrer_domain
+    FROM `{table_ref}`
+    WHERE referrer_domain IS NOT NULL
+    """)
+    if dim_df is None:
+        return False
+
+    dim_df = build_referrer_dimension(dim_df['referrer_domain'])
+    if not write_bigquery_table(dim_df, REFERRER_TABLE_SUFFIX):
+        return False
+
+    channel_id_case = CHANNEL_MATCHER.to_sql_case(
+        'referrer_domain', values={channel: str(channel_id) for channel, channel_id in CHANNEL_IDS.items()}
+    )
+    return execute_bigquery(f"""
+    ALTER TABLE `{table_ref}`
+        ADD COLUMN IF NOT EXISTS channel_id INT64,
+        ADD COLUMN IF NOT EXISTS registrable_domain STRING
+    """) and execute_bigquery(f"""
+    UPDATE `{table_ref}`
+    SET channel_id = {channel_id_case}
+    WHERE TRUE
+    """) and execute_bigquery(f"""
+    UPDATE `{table_ref}` t
+    SET registrable_domain = d.registrable_domain
+    FROM `{get_table_ref(REFERRER_TABLE_SUFFIX)}` d
+    WHERE t.referrer_domain = d.referrer_domain
+    """)
+
+if __name__ == '__main__':
+    # python -m utils.referrer_utils 로 기존 테이블에 유입 채널 컬럼 채우기
+    print("완료" if backfill_referrer_columns() else "실패")
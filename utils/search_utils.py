@@ -0,0 +1,253 @@
+import os
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from utils.store_utils import get_store_path, list_days, open_log_dataset, scan_store, atomic_write, mtime_cache
+
+# 검색 필드별 대상 컬럼 (user_agent 검색은 브라우저/OS/원본 UA 중 하나만 맞으면 됨)
+SEARCH_FIELDS = {
+    'ip': ['ip'],
+    'url': ['url'],
+    'geo': ['geo'],
+    'user_agent': ['user_browser', 'user_os', 'user_agent'],
+}
+INDEXED_COLUMNS = [column for columns in SEARCH_FIELDS.values() for column in columns]
+
+# 저장소 안의 인덱스 디렉터리 ('_' 접두사라 데이터셋 스캔에서 제외됨)
+SEARCH_INDEX_DIRNAME = '_search_index'
+TRIGRAM_SIZE = 3
+# IP 검색 결과가 이 개수 이하이면 row group Bloom 필터로 건너뛰기
+MAX_BLOOM_LOOKUP_VALUES = 256
+
+def get_index_dir(day: str, store_path: Optional[str] = None) -> str:
+    """
+    하루치 검색 인덱스 디렉터리 경로를 반환하는 함수
+
+    Args:
+        day (str): 'YYYY-MM-DD' 날짜
+        store_path (Optional[str]): 저장소 경로 (기본값: get_store_path())
+
+    Returns:
+        str: 인덱스 디렉터리 경로
+    """
+    return os.path.join(store_path or get_store_path(), SEARCH_INDEX_DIRNAME, f"day={day}")
+
+def build_trigram_postings(values: pa.StringArray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    고유 값 목록에서 바이트 트라이그램별 값 번호 목록(CSR 형태)을 만드는 함수
+
+    UTF-8 바이트 3개를 24비트 정수 하나로 인코딩하므로 한글/페르시아어도 부분 문자열 검색이 됩니다.
+
+    Args:
+        values (pa.StringArray): 소문자로 바꾼 고유 값 배열 (결측값 없음)
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: (정렬된 트라이그램 코드, 시작 위치, 값 번호)
+    """
+    offsets = np.frombuffer(values.buffers()[1], dtype=np.int32)[values.offset:values.offset + len(values) + 1]
+    data = np.frombuffer(values.buffers()[2], dtype=np.uint8).astype(np.int64)
+
+    # 값 경계를 넘지 않는 트라이그램 시작 위치만 사용
+    positions = np.arange(offsets[0], max(offsets[-1] - TRIGRAM_SIZE + 1, offsets[0]))
+    value_ids = np.searchsorted(offsets, positions, side='right') - 1
+    valid = positions + TRIGRAM_SIZE <= offsets[value_ids + 1]
+    positions, value_ids = positions[valid], value_ids[valid]
+
+    codes = (data[positions] << 16) | (data[positions + 1] << 8) | data[positions + 2]
+    pairs = np.unique((codes << 32) | value_ids)
+
+    keys, starts = np.unique(pairs >> 32, return_index=True)
+    postings = (pairs & 0xFFFFFFFF).astype(np.int32)
+    return keys, np.append(starts, len(postings)).astype(np.int64), postings
+
+def build_search_index(days: Optional[List[str]] = None, store_path: Optional[str] = None) -> None:
+    """
+    일 파티션별로 검색 대상 컬럼의 트라이그램 인덱스를 만드는 함수
+
+    컬럼마다 고유 값 목록(values.parquet)과 트라이그램 목록(trigrams.npz)을 이 순서로 저장합니다.
+
+    Args:
+        days (Optional[List[str]]): 인덱스를 만들 날짜 목록 (기본값: 전체)
+        store_path (Optional[str]): 저장소 경로 (기본값: get_store_path())
+    """
+    dataset = open_log_dataset(store_path)
+    for day in days or list_days(store_path):
+        table = dataset.to_table(columns=INDEXED_COLUMNS, filter=ds.field('day') == day)
+        index_dir = get_index_dir(day, store_path)
+        os.makedirs(index_dir, exist_ok=True)
+
+        for column in INDEXED_COLUMNS:
+            values = pc.unique(table[column]).drop_null().cast(pa.string())
+            keys, starts, postings = build_trigram_postings(pc.utf8_lower(values))
+            # 테일러가 색인을 다시 만드는 동안 검색이 쓰다 만 파일을 읽지 않도록 임시 파일에 쓴 뒤 교체
+            with atomic_write(os.path.join(index_dir, f"{column}.values.parquet")) as temp_path:
+                pq.write_table(pa.table({'value': values}), temp_path)
+            with atomic_write(os.path.join(index_dir, f"{column}.trigrams.npz")) as temp_path:
+                np.savez(temp_path, keys=keys, starts=starts, postings=postings)
+
+@mtime_cache(maxsize=256)
+def _load_column_index(trigram_path: str, values_path: str, values_mtime: float) -> Tuple[pa.Array, np.ndarray, np.ndarray, np.ndarray]:
+    # 두 파일의 수정 시각이 모두 캐시 키 (한쪽만 바뀐 상태의 값/트라이그램 조합을 재사용하지 않음)
+    values = pq.read_table(values_path)['value'].combine_chunks()
+    with np.load(trigram_path) as npz:
+        return values, npz['keys'], npz['starts'], npz['postings']
+
+def load_column_index(day: str, column: str, store_path: Optional[str] = None):
+    """
+    하루치 컬럼 인덱스를 불러오는 함수 (인덱스 파일이 바뀌지 않았으면 메모리 캐시 사용)
+
+    Args:
+        day (str): 'YYYY-MM-DD' 날짜
+        column (str): 컬럼 이름
+        store_path (Optional[str]): 저장소 경로
+
+    Returns:
+        (values, keys, starts, postings) 튜플 또는 인덱스가 없으면 None
+    """
+    index_dir = get_index_dir(day, store_path)
+    values_path = os.path.join(index_dir, f"{column}.values.parquet")
+    trigram_path = os.path.join(index_dir, f"{column}.trigrams.npz")
+    try:
+        mtimes = (os.path.getmtime(values_path), os.path.getmtime(trigram_path))
+        # 값 파일 다음에 트라이그램 파일을 쓰므로 값 파일만 새것이면 다시 만드는 중 (원본 스캔으로 대신함)
+        if mtimes[1] < mtimes[0]:
+            return None
+        index = _load_column_index(trigram_path, values_path, mtimes[0])
+        # 읽는 도중 교체되었으면 새 값과 예전 트라이그램이 섞였을 수 있음
+        if (os.path.getmtime(values_path), os.path.getmtime(trigram_path)) != mtimes:
+            return None
+    except FileNotFoundError:
+        return None
+    return index
+
+def match_column_values(day: str, column: str, needle: str, store_path: Optional[str] = None) -> Optional[pa.Array]:
+    """
+    하루치 컬럼에서 검색어를 부분 문자열로 포함하는 고유 값을 찾는 함수
+
+    검색어 트라이그램들의 값 번호 목록을 짧은 것부터 교집합한 뒤 후보만 실제 문자열로 확인합니다.
+
+    Args:
+        day (str): 'YYYY-MM-DD' 날짜
+        column (str): 컬럼 이름
+        needle (str): 검색어 (대소문자 무시)
+        store_path (Optional[str]): 저장소 경로
+
+    Returns:
+        Optional[pa.Array]: 일치하는 원본 값 배열 또는 인덱스가 없으면 None
+    """
+    index = load_column_index(day, column, store_path)
+    if index is None:
+        return None
+    values, keys, starts, postings = index
+
+    needle_bytes = np.frombuffer(pc.utf8_lower(pa.scalar(needle)).as_py().encode('utf-8'), dtype=np.uint8).astype(np.int64)
+    if len(needle_bytes) >= TRIGRAM_SIZE:
+        codes = np.unique((needle_bytes[:-2] << 16) | (needle_bytes[1:-1] << 8) | needle_bytes[2:])
+        slots = np.searchsorted(keys, codes)
+        if np.any(slots >= len(keys)) or np.any(keys[np.minimum(slots, len(keys) - 1)] != codes):
+            return values.slice(0, 0)
+
+        lists = sorted((postings[starts[s]:starts[s + 1]] for s in slots), key=len)
+        candidates = lists[0]
+        for posting in lists[1:]:
+            candidates = np.intersect1d(candidates, posting, assume_unique=True)
+            if len(candidates) == 0:
+                break
+        values = values.take(pa.array(candidates))
+
+    # 트라이그램은 순서를 보지 않으므로 후보를 실제 문자열로 확인
+    return values.filter(pc.match_substring(values, pattern=needle, ignore_case=True))
+
+def build_search_filter(
+    day: str,
+    filters: Dict[str, str],
+    store_path: Optional[str] = None
+) -> Tuple[Optional[ds.Expression], Optional[List[str]]]:
+    """
+    하루치 검색 조건을 데이터셋 필터 식으로 만드는 함수
+
+    인덱스가 있으면 일치하는 고유 값 목록으로 is_in 필터를,
+    없으면 부분 문자열 비교 필터를 만듭니다.
+
+    Args:
+        day (str): 'YYYY-MM-DD' 날짜
+        filters (Dict[str, str]): SEARCH_FIELDS 키별 검색어
+        store_path (Optional[str]): 저장소 경로
+
+    Returns:
+        Tuple[Optional[ds.Expression], Optional[List[str]]]:
+            (필터 식 또는 그날 일치하는 행이 없으면 None,
+             Bloom 필터로 찾을 정확한 ip 목록 또는 None)
+    """
+    expression = ds.field('day') == day
+    ips = None
+    for field, needle in filters.items():
+        if not needle:
+            continue
+        field_expression = None
+        for column in SEARCH_FIELDS[field]:
+            matched = match_column_values(day, column, needle, store_path)
+            if matched is None:
+                column_expression = pc.match_substring(ds.field(column), pattern=needle, ignore_case=True)
+            elif len(matched) == 0:
+                continue
+            else:
+                column_expression = ds.field(column).isin(matched)
+                if column == 'ip' and len(matched) <= MAX_BLOOM_LOOKUP_VALUES:
+                    ips = matched.to_pylist()
+            field_expression = column_expression if field_expression is None else field_expression | column_expression
+        if field_expression is None:
+            return None, None
+        expression = expression & field_expression
+    return expression, ips
+
+def search_logs(
+    start_datetime: pd.Timestamp,
+    end_datetime: pd.Timestamp,
+    filters: Dict[str, str],
+    columns: List[str],
+    store_path: Optional[str] = None
+) -> pa.Table:
+    """
+    로컬 저장소에서 기간과 부분 문자열 조건에 맞는 로그를 찾는 함수
+
+    기간에 포함되는 일 파티션만 읽고, 파티션마다 트라이그램 인덱스로 후보 값을 좁힙니다.
+    IP 검색이 소수의 IP로 좁혀지면 row group Bloom 필터로 읽을 row group도 줄입니다.
+
+    Args:
+        start_datetime (pd.Timestamp): 시작 시각 (UTC)
+        end_datetime (pd.Timestamp): 종료 시각 (UTC)
+        filters (Dict[str, str]): SEARCH_FIELDS 키별 검색어
+        columns (List[str]): 반환할 컬럼 목록
+        store_path (Optional[str]): 저장소 경로
+
+    Returns:
+        pa.Table: 검색 결과 테이블
+    """
+    dataset = open_log_dataset(store_path)
+    time_filter = (
+        (ds.field('timestamp_utc') >= pa.scalar(start_datetime, type=pa.timestamp('us', tz='UTC')))
+        & (ds.field('timestamp_utc') <= pa.scalar(end_datetime, type=pa.timestamp('us', tz='UTC')))
+    )
+
+    start_day, end_day = start_datetime.strftime('%Y-%m-%d'), end_datetime.strftime('%Y-%m-%d')
+    tables = []
+    for day in list_days(store_path):
+        if not start_day <= day <= end_day:
+            continue
+        expression, ips = build_search_filter(day, filters, store_path)
+        if expression is not None:
+            tables.append(scan_store(columns, expression & time_filter, ips, store_path))
+
+    if not tables:
+        return dataset.schema.empty_table().select(columns)
+    return pa.concat_tables(tables)
+
+if __name__ == '__main__':
+    # python -m utils.search_utils 로 전체 일 파티션의 검색 인덱스 다시 만들기
+    build_search_index()
+    print("완료")
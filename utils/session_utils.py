@@ -0,0 +1,192 @@
+import os
+from typing import List, Optional, Tuple
+import numpy as np
+import pandas as pd
+import pyarrow.dataset as ds
+from utils.store_utils import get_store_path, list_days, open_log_dataset, atomic_write, mtime_cache
+from utils.visitor_utils import load_visitor_dictionary, visitor_keys
+
+# 저장소 안의 세션 색인 디렉터리 ('_' 접두사라 데이터셋 스캔에서 제외됨)
+SESSION_INDEX_DIRNAME = '_session_index'
+# 같은 방문자의 다음 요청까지 이 시간(초)을 넘게 비면 새 세션
+SESSION_GAP_SECONDS = 30 * 60
+# 세션 깊이(페이지 수) 분포에서 이 값 이상은 한 구간으로 묶음
+SESSION_DEPTH_LIMIT = 10
+SESSION_COLUMNS = ['ip', 'user_agent', 'timestamp_utc', 'url_path']
+
+def assign_sessions(visitor_ids: np.ndarray, seconds: np.ndarray, gap_seconds: int = SESSION_GAP_SECONDS) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    요청을 방문자, 시각 순으로 정렬하고 세션이 시작되는 위치를 표시하는 함수
+
+    방문자가 바뀌거나 이전 요청과 gap_seconds보다 많이 떨어진 요청에서 새 세션이 시작됩니다.
+
+    Args:
+        visitor_ids (np.ndarray): 요청별 방문자 ID
+        seconds (np.ndarray): 요청별 시각 (epoch 초)
+        gap_seconds (int): 세션을 나누는 비활성 간격 (초)
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (정렬 순서, 정렬된 요청별 세션 시작 여부)
+    """
+    if len(seconds) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=bool)
+    # (방문자 ID, 시각)을 int64 키 하나로 묶어 한 번에 정렬 (상위 32비트: 방문자, 하위 32비트: 첫 요청부터 경과 초)
+    sort_keys = (visitor_ids.astype(np.int64) << 32) | (seconds - seconds.min())
+    order = np.argsort(sort_keys, kind='stable')
+    visitor_ids, seconds = visitor_ids[order], seconds[order]
+
+    boundary = np.ones(len(order), dtype=bool)
+    boundary[1:] = (np.diff(visitor_ids) != 0) | (np.diff(seconds) > gap_seconds)
+    return order, boundary
+
+def sessionize(visitor_ids: np.ndarray, timestamps: np.ndarray, paths: np.ndarray, gap_seconds: int = SESSION_GAP_SECONDS) -> pd.DataFrame:
+    """
+    요청을 비활성 간격 기준 세션으로 묶어 세션별 요약을 만드는 함수
+
+    세션 시작 표시를 누적합(cumsum)해 세션 ID를 부여하므로 반복문 없이 계산됩니다.
+
+    Args:
+        visitor_ids (np.ndarray): 요청별 방문자 ID
+        timestamps (np.ndarray): 요청별 시각 (datetime64)
+        paths (np.ndarray): 요청별 url_path
+        gap_seconds (int): 세션을 나누는 비활성 간격 (초)
+
+    Returns:
+        pd.DataFrame: 세션별 visitor_id, start, hits(요청 수), duration(초), landing_path, exit_path 데이터프레임
+    """
+    if len(timestamps) == 0:
+        return pd.DataFrame(columns=['session_id', 'visitor_id', 'start', 'hits', 'duration', 'landing_path', 'exit_path'])
+    seconds = timestamps.astype('datetime64[s]').astype(np.int64)
+    order, boundary = assign_sessions(visitor_ids, seconds, gap_seconds)
+    visitor_ids, seconds = visitor_ids[order], seconds[order]
+    session_ids = np.cumsum(boundary) - 1
+
+    starts = np.flatnonzero(boundary)
+    ends = np.append(starts[1:], len(order)) - 1
+    return pd.DataFrame({
+        'session_id': np.arange(len(starts), dtype=np.int32),
+        'visitor_id': visitor_ids[starts],
+        'start': seconds[starts].astype('datetime64[s]'),
+        'hits': np.bincount(session_ids, minlength=len(starts)).astype(np.int32),
+        'duration': (seconds[ends] - seconds[starts]).astype(np.int32),
+        'landing_path': paths[order[starts]],
+        'exit_path': paths[order[ends]]
+    })
+
+def get_session_index_dir(store_path: Optional[str] = None) -> str:
+    """
+    세션 색인 디렉터리 경로를 반환하는 함수
+
+    Args:
+        store_path (Optional[str]): 저장소 경로 (기본값: get_store_path())
+
+    Returns:
+        str: 디렉터리 경로
+    """
+    return os.path.join(store_path or get_store_path(), SESSION_INDEX_DIRNAME)
+
+def build_session_index(days: Optional[List[str]] = None, store_path: Optional[str] = None) -> None:
+    """
+    일 파티션별 세션 테이블을 만드는 함수 (방문자 색인을 먼저 만들어야 함)
+
+    세션은 일 파티션 경계(UTC 자정)에서 끊깁니다.
+
+    Args:
+        days (Optional[List[str]]): 색인을 만들 날짜 목록 (기본값: 전체)
+        store_path (Optional[str]): 저장소 경로 (기본값: get_store_path())
+    """
+    dictionary = load_visitor_dictionary(store_path)
+    if dictionary is None:
+        return
+
+    index_dir = get_session_index_dir(store_path)
+    os.makedirs(index_dir, exist_ok=True)
+    dataset = open_log_dataset(store_path)
+    for day in days or list_days(store_path):
+        df = dataset.to_table(columns=SESSION_COLUMNS, filter=ds.field('day') == day).to_pandas()
+        sessions = sessionize(
+            dictionary.lookup(visitor_keys(df)),
+            df['timestamp_utc'].dt.tz_localize(None).to_numpy(),
+            df['url_path'].to_numpy(dtype=object)
+        )
+        with atomic_write(os.path.join(index_dir, f"day={day}.parquet")) as temp_path:
+            sessions.to_parquet(temp_path, index=False, compression='zstd')
+
+def load_day_sessions(day: str, columns: Optional[List[str]] = None, store_path: Optional[str] = None) -> Optional[pd.DataFrame]:
+    """
+    하루치 세션 테이블을 불러오는 함수
+
+    Args:
+        day (str): 'YYYY-MM-DD' 날짜
+        columns (Optional[List[str]]): 읽을 컬럼 (기본값: 전체)
+        store_path (Optional[str]): 저장소 경로
+
+    Returns:
+        Optional[pd.DataFrame]: 세션 데이터프레임 또는 색인이 없으면 None
+    """
+    path = os.path.join(get_session_index_dir(store_path), f"day={day}.parquet")
+    if not os.path.exists(path):
+        return None
+    return pd.read_parquet(path, columns=columns)
+
+@mtime_cache(maxsize=1024)
+def _load_day_depth_counts(path: str) -> np.ndarray:
+    # 세션 깊이 분포에는 hits만 필요하므로 경로 문자열 컬럼은 읽지 않고 일별 분포만 캐시
+    hits = pd.read_parquet(path, columns=['hits'])['hits'].to_numpy(dtype=np.int64)
+    return np.bincount(np.minimum(hits, SESSION_DEPTH_LIMIT), minlength=SESSION_DEPTH_LIMIT + 1)
+
+def load_day_depth_counts(day: str, store_path: Optional[str] = None) -> Optional[np.ndarray]:
+    """
+    하루치 세션 깊이(요청 수)별 세션 수를 불러오는 함수 (세션 파일이 바뀌지 않았으면 메모리 캐시 사용)
+
+    Args:
+        day (str): 'YYYY-MM-DD' 날짜
+        store_path (Optional[str]): 저장소 경로
+
+    Returns:
+        Optional[np.ndarray]: 깊이(0 ~ SESSION_DEPTH_LIMIT, 마지막 칸은 그 이상)별 세션 수 또는 색인이 없으면 None
+    """
+    return _load_day_depth_counts(os.path.join(get_session_index_dir(store_path), f"day={day}.parquet"))
+
+def has_session_index(store_path: Optional[str] = None) -> bool:
+    """
+    세션 색인이 있는지 확인하는 함수
+
+    Args:
+        store_path (Optional[str]): 저장소 경로
+
+    Returns:
+        bool: 세션 색인 디렉터리가 있으면 True
+    """
+    return os.path.isdir(get_session_index_dir(store_path))
+
+def session_depth_counts(start_date: str, end_date: str, store_path: Optional[str] = None) -> Optional[pd.DataFrame]:
+    """
+    기간의 날짜별, 세션 깊이(요청 수)별 세션 수를 계산하는 함수
+
+    Args:
+        start_date (str): 시작 날짜
+        end_date (str): 종료 날짜
+        store_path (Optional[str]): 저장소 경로
+
+    Returns:
+        Optional[pd.DataFrame]: visit_date, depth(SESSION_DEPTH_LIMIT 이상은 묶음), sessions 컬럼 데이터프레임 또는 데이터가 없으면 None
+    """
+    frames = []
+    for day in list_days(store_path):
+        if not start_date <= day <= end_date:
+            continue
+        counts = load_day_depth_counts(day, store_path)
+        if counts is None or not counts.any():
+            continue
+        depths = np.flatnonzero(counts)
+        frames.append(pd.DataFrame({'visit_date': day, 'depth': depths, 'sessions': counts[depths]}))
+
+    if not frames:
+        return None
+    return pd.concat(frames, ignore_index=True)
+
+if __name__ == '__main__':
+    # python -m utils.session_utils 로 전체 일 파티션의 세션 색인 다시 만들기
+    build_session_index()
+    print("완료")
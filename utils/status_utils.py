@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+# 공통 상수 정의
+ORDERED_STATUS_CODES = ['1xx', '2xx', '3xx', '4xx', '5xx']
+COLOR_MAP = {
+    '1xx': '#9C27B0',  # 정보 응답 - 보라색
+    '2xx': '#66BB6A',  # 성공 - 녹색
+    '3xx': '#42A5F5',  # 리다이렉션 - 파란색
+    '4xx': '#FFA726',  # 클라이언트 오류 - 주황색
+    '5xx': '#EF5350'   # 서버 오류 - 빨간색
+}
+DEFAULT_COLOR = '#CCCCCC'
+
+def format_counts(counts: pd.Series) -> pd.Series:
+    """
+    건수 컬럼을 천 단위 구분 기호가 있는 문자열로 바꾸는 함수
+
+    Args:
+        counts (pd.Series): 정수 건수 컬럼
+
+    Returns:
+        pd.Series: '1,234' 형태의 문자열 컬럼
+    """
+    return counts.astype('int64').map('{:,}'.format)
+
+def status_group_names(status_groups: pd.Series) -> pd.Series:
+    """
+    상태 그룹(200, 400 ...) 컬럼을 '2xx', '4xx' 형태의 이름으로 바꾸는 함수
+
+    Args:
+        status_groups (pd.Series): 상태 그룹 컬럼
+
+    Returns:
+        pd.Series: 상태 그룹 이름 컬럼
+    """
+    return (status_groups // 100).astype('int64').astype(str) + 'xx'
+
+def prepare_status_groups(df: pd.DataFrame, log_scale: bool = False) -> pd.DataFrame:
+    """
+    상태 코드별 건수를 파이 차트용 그룹 데이터(비율, 표시값, 툴팁)로 만드는 함수
+
+    행 반복 없이 groupby와 문자열 연산으로 만들므로 상태 코드 수와 관계없이 빠릅니다.
+
+    Args:
+        df (pd.DataFrame): status_code, status_group, count 컬럼을 포함한 데이터프레임
+        log_scale (bool): 표시값에 로그 스케일 적용 여부
+
+    Returns:
+        pd.DataFrame: status_group_name, count, percentage, display_value, text, hover_text, color 컬럼
+    """
+    df = df.sort_values('status_code')
+    names = status_group_names(df['status_group'])
+
+    # 그룹별 세부 상태 코드 툴팁 ("상태 코드 404: 1,234건" 줄들을 <br>로 연결)
+    detail_lines = "상태 코드 " + df['status_code'].astype('int64').astype(str) + ": " + format_counts(df['count']) + "건"
+    details = detail_lines.groupby(names).agg('<br>'.join)
+
+    groups = df['count'].groupby(names).sum().rename('count').to_frame()
+    groups.index.name = 'status_group_name'
+    groups = groups.reset_index()
+
+    groups['percentage'] = groups['count'] / groups['count'].sum() * 100
+    groups['text'] = groups['percentage'].map('{:.1f}'.format)
+
+    display_values = groups['count'].astype(float)
+    if log_scale:
+        display_values = np.log10(np.maximum(display_values, 1))
+        min_val = display_values.min()
+        if min_val < 1:
+            display_values = display_values - min_val + 1
+    groups['display_value'] = display_values
+
+    groups['hover_text'] = (
+        "<b>" + groups['status_group_name'] + "</b><br>총 건수: " + format_counts(groups['count'])
+        + " (" + groups['text'] + "%)<br><br>세부 상태 코드:<br>"
+        + groups['status_group_name'].map(details)
+    )
+    groups['color'] = groups['status_group_name'].map(COLOR_MAP).fillna(DEFAULT_COLOR)
+    return groups
+
+def create_status_pie_trace(groups: pd.DataFrame) -> go.Pie:
+    """
+    prepare_status_groups 결과로 상태 코드 분포 파이 차트 trace를 만드는 함수
+
+    Args:
+        groups (pd.DataFrame): prepare_status_groups 결과
+
+    Returns:
+        go.Pie: 파이 차트 trace
+    """
+    return go.Pie(
+        labels=groups['status_group_name'],
+        values=groups['display_value'],
+        text=groups['text'],
+        texttemplate='%{label}<br>%{text}%',
+        hovertemplate='%{customdata}<extra></extra>',
+        customdata=groups['hover_text'],
+        textinfo='label+text',
+        marker_colors=groups['color'],
+        hole=0.4,
+        sort=False,
+        direction='clockwise',
+        pull=[0.03] * len(groups),
+        textposition='inside'
+    )
@@ -0,0 +1,366 @@
+import json
+import os
+from contextlib import contextmanager
+from functools import lru_cache, wraps
+from typing import Callable, Iterator, List, Optional
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from dotenv import load_dotenv
+from utils.bloom_utils import build_bloom, bloom_might_contain
+
+# 환경변수 로드
+load_dotenv()
+
+# 로컬 로그 저장소 (일 단위 파티션 Parquet)
+DEFAULT_STORE_PATH = 'data/logs'
+ROW_GROUP_SIZE = 64 * 1024
+COMPRESSION = 'zstd'
+
+# 페이지 쿼리가 사용하는 로그 테이블 스키마
+LOG_SCHEMA = pa.schema([
+    ('ip', pa.string()),
+    ('timestamp_utc', pa.timestamp('us', tz='UTC')),
+    ('day', pa.string()),
+    ('hour', pa.string()),
+    ('http_method', pa.string()),
+    ('url', pa.string()),
+    ('url_path', pa.string()),
+    ('url_template_id', pa.int32()),
+    ('status_code', pa.int16()),
+    ('size', pa.int64()),
+    ('referrer', pa.string()),
+    ('referrer_domain', pa.string()),
+    ('registrable_domain', pa.string()),
+    ('channel_id', pa.int8()),
+    ('user_agent', pa.string()),
+    ('user_browser', pa.string()),
+    ('user_os', pa.string()),
+    ('user_is_mobile', pa.bool_()),
+    ('user_is_bot', pa.bool_()),
+    ('geo', pa.string()),
+    ('country', pa.string()),
+    ('city', pa.string()),
+    ('iso3', pa.string()),
+])
+
+# row group 건너뛰기용 색인 (ip Bloom 필터, '_' 접두사라 데이터셋 스캔에서 제외됨)
+ROW_GROUP_INDEX_DIRNAME = '_row_group_index'
+BLOOM_COLUMN = 'ip'
+# min/max 통계를 반드시 남길 컬럼 (pyarrow가 스캔 시 row group 통계로 거름)
+STATISTICS_COLUMNS = ['timestamp_utc', 'status_code', 'ip']
+
+# 여러 파일을 합친 파일의 스키마 메타데이터 키 (합쳐진 원본 파일 이름 목록, JSON)
+COMPACTED_SOURCES_KEY = b'lovi.compacted_sources'
+# 여러 파일을 합친 파일의 이름 접두사 (스캔 시 이 파일에 이미 합쳐진 원본 파일은 건너뜀)
+COMPACTED_FILE_PREFIX = 'compact-'
+
+DAY_PARTITIONING = ds.partitioning(pa.schema([('day', pa.string())]), flavor='hive')
+
+def get_store_path() -> str:
+    """
+    로컬 로그 저장소 경로를 반환하는 함수
+
+    Returns:
+        str: 저장소 경로 (LOCAL_STORE_PATH 환경변수 또는 기본값)
+    """
+    return os.getenv('LOCAL_STORE_PATH', DEFAULT_STORE_PATH)
+
+def has_local_store(store_path: Optional[str] = None) -> bool:
+    """
+    로컬 로그 저장소에 적재된 데이터가 있는지 확인하는 함수
+
+    Args:
+        store_path (Optional[str]): 저장소 경로 (기본값: get_store_path())
+
+    Returns:
+        bool: 일 파티션이 하나 이상 있으면 True
+    """
+    return bool(list_days(store_path))
+
+def list_days(store_path: Optional[str] = None) -> List[str]:
+    """
+    저장소의 일 파티션 목록을 반환하는 함수
+
+    Args:
+        store_path (Optional[str]): 저장소 경로 (기본값: get_store_path())
+
+    Returns:
+        List[str]: 'YYYY-MM-DD' 형태의 날짜 목록 (오름차순)
+    """
+    store_path = store_path or get_store_path()
+    if not os.path.isdir(store_path):
+        return []
+    return sorted(
+        name.split('=', 1)[1] for name in os.listdir(store_path)
+        if name.startswith('day=')
+    )
+
+@contextmanager
+def atomic_write(path: str) -> Iterator[str]:
+    """
+    임시 파일에 쓴 뒤 한 번에 교체해 읽는 쪽이 쓰다 만 파일을 보지 않도록 하는 컨텍스트 관리자
+
+    임시 파일은 확장자를 유지하므로(예: day=...tmp.npy) np.save처럼 확장자를 붙이는 함수에도 쓸 수 있습니다.
+
+    Args:
+        path (str): 최종 파일 경로
+
+    Yields:
+        str: 내용을 쓸 임시 파일 경로
+    """
+    root, extension = os.path.splitext(path)
+    temp_path = f"{root}.tmp{extension}"
+    yield temp_path
+    os.replace(temp_path, path)
+
+def mtime_cache(maxsize: int) -> Callable:
+    """
+    파일 경로를 첫 인자로 받는 로더를 (경로, 수정 시각) 키의 LRU 캐시로 감싸는 데코레이터
+
+    파일을 다시 쓰면 수정 시각이 바뀌어 새로 로드하고, 파일이 없으면 None을 반환합니다.
+
+    Args:
+        maxsize (int): 캐시에 남길 최대 항목 수
+
+    Returns:
+        Callable: 데코레이터
+    """
+    def decorator(load: Callable) -> Callable:
+        @lru_cache(maxsize=maxsize)
+        def load_version(path: str, mtime: float, *args):
+            return load(path, *args)
+
+        @wraps(load)
+        def wrapper(path: str, *args):
+            try:
+                mtime = os.path.getmtime(path)
+            except FileNotFoundError:
+                return None
+            return load_version(path, mtime, *args)
+
+        wrapper.cache_clear = load_version.cache_clear
+        return wrapper
+    return decorator
+
+def list_day_files(day: str, store_path: Optional[str] = None) -> List[str]:
+    """
+    일 파티션 디렉터리 하나의 데이터 파일 목록을 반환하는 함수 (저장소 전체를 탐색하지 않음)
+
+    Args:
+        day (str): 'YYYY-MM-DD' 날짜
+        store_path (Optional[str]): 저장소 경로 (기본값: get_store_path())
+
+    Returns:
+        List[str]: Parquet 파일 경로 목록 (이름순, '_'/'.' 접두사 파일 제외)
+    """
+    day_dir = os.path.join(store_path or get_store_path(), f"day={day}")
+    if not os.path.isdir(day_dir):
+        return []
+    return sorted(
+        os.path.join(day_dir, name) for name in os.listdir(day_dir)
+        if name.endswith('.parquet') and not name.startswith(('_', '.'))
+    )
+
+def get_compacted_sources(schema: pa.Schema) -> List[str]:
+    """
+    합친 파일의 스키마 메타데이터에서 원본 파일 이름 목록을 꺼내는 함수
+
+    Args:
+        schema (pa.Schema): Parquet 파일 스키마
+
+    Returns:
+        List[str]: 원본 파일 이름 목록 (합친 파일이 아니면 빈 리스트)
+    """
+    metadata = schema.metadata or {}
+    return json.loads(metadata[COMPACTED_SOURCES_KEY]) if COMPACTED_SOURCES_KEY in metadata else []
+
+@mtime_cache(maxsize=4096)
+def _load_compacted_sources(path: str) -> List[str]:
+    return get_compacted_sources(pq.read_schema(path))
+
+def list_compacted_files(paths: List[str]) -> List[str]:
+    """
+    파일 목록 중 같은 디렉터리의 합친 파일에 이미 들어간 원본 파일을 찾는 함수
+
+    합친 파일을 교체한 뒤 원본 파일을 지우기 전(또는 그 사이 프로세스가 죽은 경우)에도
+    스캔이 같은 행을 두 번 세지 않도록 건너뛸 파일을 알려줍니다.
+
+    Args:
+        paths (List[str]): 데이터 파일 경로 목록
+
+    Returns:
+        List[str]: 합친 파일에 이미 들어간 원본 파일 경로 목록
+    """
+    covered = set()
+    for path in paths:
+        if os.path.basename(path).startswith(COMPACTED_FILE_PREFIX):
+            day_dir = os.path.dirname(path)
+            covered.update(os.path.join(day_dir, name) for name in _load_compacted_sources(path) or [])
+    return [path for path in paths if path in covered]
+
+def write_log_table(table: pa.Table, basename: str, store_path: Optional[str] = None) -> None:
+    """
+    로그 테이블을 일 단위로 나누어 zstd Parquet 파일로 저장하는 함수
+
+    파일마다 row group별 ip Bloom 필터 색인도 함께 만듭니다.
+
+    Args:
+        table (pa.Table): LOG_SCHEMA 형태의 로그 테이블
+        basename (str): 파일 이름 접두사 (같은 적재 안에서 고유해야 함)
+        store_path (Optional[str]): 저장소 경로 (기본값: get_store_path())
+    """
+    store_path = store_path or get_store_path()
+    written_files = []
+    file_format = ds.ParquetFileFormat()
+    ds.write_dataset(
+        table,
+        store_path,
+        format=file_format,
+        partitioning=DAY_PARTITIONING,
+        file_options=file_format.make_write_options(compression=COMPRESSION, write_statistics=STATISTICS_COLUMNS),
+        basename_template=f"{basename}-{{i}}.parquet",
+        existing_data_behavior='overwrite_or_ignore',
+        max_rows_per_group=ROW_GROUP_SIZE,
+        min_rows_per_group=min(ROW_GROUP_SIZE, max(table.num_rows, 1)),
+        file_visitor=lambda written_file: written_files.append(written_file.path)
+    )
+    for path in written_files:
+        write_row_group_index(path, store_path)
+
+def get_row_group_index_path(data_path: str, store_path: Optional[str] = None) -> str:
+    """
+    데이터 파일의 row group 색인 파일 경로를 반환하는 함수
+
+    Args:
+        data_path (str): 저장소 안의 Parquet 파일 경로
+        store_path (Optional[str]): 저장소 경로 (기본값: get_store_path())
+
+    Returns:
+        str: 색인 파일 경로 (저장소 디렉터리 구조를 그대로 따름)
+    """
+    store_path = store_path or get_store_path()
+    relative_path = os.path.relpath(data_path, store_path)
+    return os.path.join(store_path, ROW_GROUP_INDEX_DIRNAME, f"{relative_path}.npz")
+
+def write_row_group_index(data_path: str, store_path: Optional[str] = None) -> None:
+    """
+    Parquet 파일의 row group마다 ip Bloom 필터를 만들어 저장하는 함수
+
+    Args:
+        data_path (str): 저장소 안의 Parquet 파일 경로
+        store_path (Optional[str]): 저장소 경로 (기본값: get_store_path())
+    """
+    parquet_file = pq.ParquetFile(data_path)
+    blooms = []
+    for i in range(parquet_file.num_row_groups):
+        values = pc.unique(parquet_file.read_row_group(i, columns=[BLOOM_COLUMN])[BLOOM_COLUMN]).drop_null()
+        blooms.append(build_bloom(values.to_numpy(zero_copy_only=False)))
+
+    index_path = get_row_group_index_path(data_path, store_path)
+    os.makedirs(os.path.dirname(index_path), exist_ok=True)
+    np.savez(
+        index_path,
+        bits=np.concatenate([bits for bits, _, _ in blooms]) if blooms else np.zeros(0, dtype=np.uint8),
+        offsets=np.cumsum([0] + [len(bits) for bits, _, _ in blooms]),
+        num_bits=np.array([num_bits for _, num_bits, _ in blooms], dtype=np.int64),
+        num_hashes=np.array([num_hashes for _, _, num_hashes in blooms], dtype=np.int64)
+    )
+
+@lru_cache(maxsize=4096)
+def _load_row_group_index(index_path: str, mtime: float):
+    # mtime은 캐시 키 용도 (파일을 다시 쓰면 새로 로드)
+    with np.load(index_path) as npz:
+        return npz['bits'], npz['offsets'], npz['num_bits'], npz['num_hashes']
+
+def filter_row_groups_by_bloom(data_path: str, row_group_ids: List[int], values: List[str], store_path: Optional[str] = None) -> List[int]:
+    """
+    Bloom 필터로 값이 확실히 없는 row group을 제외하는 함수
+
+    Args:
+        data_path (str): Parquet 파일 경로
+        row_group_ids (List[int]): 후보 row group 번호
+        values (List[str]): 찾을 ip 값 목록
+        store_path (Optional[str]): 저장소 경로
+
+    Returns:
+        List[int]: 값이 있을 수 있는 row group 번호 (색인이 없으면 후보 그대로)
+    """
+    index_path = get_row_group_index_path(data_path, store_path)
+    if not os.path.exists(index_path):
+        return row_group_ids
+    bits, offsets, num_bits, num_hashes = _load_row_group_index(index_path, os.path.getmtime(index_path))
+    return [
+        i for i in row_group_ids
+        if bloom_might_contain(bits[offsets[i]:offsets[i + 1]], int(num_bits[i]), int(num_hashes[i]), values)
+    ]
+
+def scan_store(
+    columns: List[str],
+    filter: Optional[ds.Expression] = None,
+    ips: Optional[List[str]] = None,
+    store_path: Optional[str] = None
+) -> pa.Table:
+    """
+    건너뛸 수 있는 파티션과 row group을 제외하고 로컬 저장소를 읽는 함수
+
+    1. day 파티션 식으로 파일을 거르고
+    2. timestamp_utc, status_code 등의 min/max 통계로 row group을 거른 뒤
+    3. ips가 있으면 ip Bloom 필터로 값이 확실히 없는 row group을 제외합니다.
+
+    Args:
+        columns (List[str]): 읽을 컬럼 목록
+        filter (Optional[ds.Expression]): 행 필터 식
+        ips (Optional[List[str]]): 정확히 일치해야 하는 ip 목록
+        store_path (Optional[str]): 저장소 경로 (기본값: get_store_path())
+
+    Returns:
+        pa.Table: 필터를 적용한 결과 테이블
+    """
+    store_path = store_path or get_store_path()
+    dataset = open_log_dataset(store_path)
+    if ips:
+        ip_filter = ds.field(BLOOM_COLUMN).isin(ips)
+        filter = ip_filter if filter is None else filter & ip_filter
+
+    tables = []
+    for fragment in dataset.get_fragments(filter=filter):
+        candidates = fragment.subset(filter=filter, schema=dataset.schema) if filter is not None else fragment
+        row_group_ids = [row_group.id for row_group in candidates.row_groups]
+        if ips:
+            row_group_ids = filter_row_groups_by_bloom(fragment.path, row_group_ids, ips, store_path)
+        if not row_group_ids:
+            continue
+        tables.append(
+            fragment.subset(row_group_ids=row_group_ids)
+            .to_table(schema=dataset.schema, columns=columns, filter=filter)
+        )
+
+    if not tables:
+        return dataset.schema.empty_table().select(columns)
+    return pa.concat_tables(tables)
+
+def open_log_dataset(store_path: Optional[str] = None) -> ds.Dataset:
+    """
+    로컬 로그 저장소를 pyarrow Dataset으로 여는 함수
+
+    Args:
+        store_path (Optional[str]): 저장소 경로 (기본값: get_store_path())
+
+    Returns:
+        ds.Dataset: day 파티션 컬럼을 포함한 데이터셋 (합친 파일에 이미 들어간 원본 파일 제외)
+    """
+    store_path = store_path or get_store_path()
+    dataset = ds.dataset(store_path, format='parquet', partitioning=DAY_PARTITIONING)
+    compacted = set(list_compacted_files(dataset.files))
+    if not compacted:
+        return dataset
+    return ds.dataset(
+        [path for path in dataset.files if path not in compacted],
+        schema=dataset.schema,
+        format='parquet',
+        partitioning=DAY_PARTITIONING,
+        partition_base_dir=store_path
+    )
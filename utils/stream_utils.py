@@ -0,0 +1,233 @@
+import json
+import queue
+import threading
+import time
+from typing import Dict, Optional
+import pandas as pd
+from flask import Response, abort
+from utils.live_utils import LIVE_AGGREGATOR, LiveAggregator, start_live_poller
+from utils.status_utils import prepare_status_groups
+from utils.tail_utils import load_tail_state
+
+# 실시간 푸시 설정 (1초마다 바뀐 패널만 전송)
+STREAM_TICK_SECONDS = 1
+STREAM_KEEPALIVE_SECONDS = 15
+# gunicorn 스레드(8개)를 스트림이 모두 점유하지 않도록 동시 구독 수 제한 (초과 시 클라이언트는 폴링으로 전환)
+STREAM_MAX_CLIENTS = 4
+# 연결을 주기적으로 끊어 스레드를 돌려줌 (EventSource가 자동으로 다시 연결하고 전체 프레임을 받음)
+STREAM_MAX_SECONDS = 300
+STREAM_QUEUE_SIZE = 8
+
+def build_live_panels(snapshot: Dict) -> Dict[str, Dict]:
+    """
+    실시간 스냅샷을 홈 패널별 갱신 데이터(그래프 trace 속성, 텍스트)로 바꾸는 함수
+
+    Args:
+        snapshot (Dict): LiveAggregator.snapshot 결과
+
+    Returns:
+        Dict[str, Dict]: 컴포넌트 ID별 {'figure': trace 속성} 또는 {'children': 텍스트}
+    """
+    panels = {}
+
+    region = pd.DataFrame(snapshot['region'], columns=['country', 'iso_alpha', 'count'])
+    panels['region-map-home'] = {'figure': {
+        'type': 'choropleth',
+        'locations': region['iso_alpha'].tolist(),
+        'z': region['count'].tolist()
+    }}
+
+    traffic = pd.DataFrame(snapshot['traffic'], columns=['hour_label', 'count'])
+    panels['traffic-chart'] = {'figure': {
+        'type': 'bar',
+        'x': traffic['hour_label'].tolist(),
+        'y': traffic['count'].tolist(),
+        'text': traffic['count'].tolist(),
+        'marker.color': traffic['count'].tolist()
+    }}
+
+    if snapshot['status']:
+        groups = prepare_status_groups(pd.DataFrame(snapshot['status']), log_scale=True)
+        panels['status-distribution-home'] = {'figure': {
+            'type': 'pie',
+            'labels': groups['status_group_name'].tolist(),
+            'values': groups['display_value'].tolist(),
+            'text': groups['text'].tolist(),
+            'customdata': groups['hover_text'].tolist(),
+            'marker.colors': groups['color'].tolist(),
+            'pull': [0.03] * len(groups)
+        }}
+
+    urls = snapshot['urls'] or {'pages': [], 'counts': []}
+    panels['url-distribution-home'] = {'figure': {
+        'type': 'pie',
+        'labels': urls['pages'],
+        'values': urls['counts']
+    }}
+
+    visitors = snapshot['visitors']
+    for key in ['total', 'new', 'returning']:
+        value = visitors[key]
+        panels[f"{key}-visitors-24h"] = {'children': "-" if value is None else f"{value:,}"}
+
+    status = "실시간 연결됨"
+    tail_state = load_tail_state()
+    if tail_state and tail_state.get('lag_seconds') is not None:
+        status += f" · 수집 지연 {tail_state['lag_seconds']:.1f}초"
+    panels['home-live-status'] = {'children': status}
+    return panels
+
+def encode_frame(version: Optional[str], encoded_panels: Dict[str, str]) -> str:
+    """
+    패널별 JSON 문자열을 다시 직렬화하지 않고 프레임 하나로 묶는 함수
+
+    Args:
+        version (Optional[str]): 스냅샷 기준 시각
+        encoded_panels (Dict[str, str]): 컴포넌트 ID별 JSON 문자열
+
+    Returns:
+        str: '{"version": ..., "panels": {...}}' 형태의 JSON 문자열
+    """
+    body = ','.join(f"{json.dumps(key)}:{value}" for key, value in encoded_panels.items())
+    return f'{{"version":{json.dumps(version)},"panels":{{{body}}}}}'
+
+class LiveBroadcaster(threading.Thread):
+    """
+    실시간 집계 결과를 모든 구독자에게 보내는 브로드캐스터
+
+    틱마다 스냅샷 계산, 이전 틱과의 비교, JSON 직렬화를 한 번만 하고
+    같은 프레임 문자열을 구독자 큐에 넣으므로 서버 비용은 구독자 수와 관계없이 일정합니다.
+    프레임에는 이전 틱과 달라진 패널만 들어가며, 새 구독자는 먼저 전체 프레임을 받습니다.
+    """
+
+    def __init__(self, aggregator: LiveAggregator, tick_seconds: float = STREAM_TICK_SECONDS):
+        super().__init__(daemon=True)
+        self.aggregator = aggregator
+        self.tick_seconds = tick_seconds
+        self.lock = threading.Lock()
+        self.subscribers = set()
+        self.panels: Dict[str, str] = {}
+        self.version = None
+        self.stop_event = threading.Event()
+
+    def full_frame(self) -> Optional[str]:
+        """지금까지의 모든 패널 상태를 담은 프레임 (아직 없으면 None)"""
+        if not self.panels:
+            return None
+        return encode_frame(self.version, self.panels)
+
+    def subscribe(self) -> Optional[queue.Queue]:
+        """
+        구독자 큐를 만드는 함수
+
+        Returns:
+            Optional[queue.Queue]: 프레임 문자열이 들어올 큐 (동시 구독 수를 넘으면 None)
+        """
+        with self.lock:
+            if len(self.subscribers) >= STREAM_MAX_CLIENTS:
+                return None
+            subscriber = queue.Queue(maxsize=STREAM_QUEUE_SIZE)
+            frame = self.full_frame()
+            if frame is not None:
+                subscriber.put_nowait(frame)
+            self.subscribers.add(subscriber)
+            return subscriber
+
+    def unsubscribe(self, subscriber: queue.Queue) -> None:
+        with self.lock:
+            self.subscribers.discard(subscriber)
+
+    def tick(self) -> None:
+        """스냅샷을 한 번 계산해 달라진 패널만 모든 구독자에게 보냅니다."""
+        snapshot = self.aggregator.snapshot()
+        if snapshot is None:
+            return
+
+        changed = {}
+        for key, panel in build_live_panels(snapshot).items():
+            encoded = json.dumps(panel, ensure_ascii=False, separators=(',', ':'))
+            if self.panels.get(key) != encoded:
+                changed[key] = encoded
+        if not changed:
+            return
+
+        with self.lock:
+            self.panels.update(changed)
+            self.version = snapshot['version']
+            frame = encode_frame(self.version, changed)
+            for subscriber in self.subscribers:
+                try:
+                    subscriber.put_nowait(frame)
+                except queue.Full:
+                    # 느린 구독자는 밀린 프레임을 버리고 전체 프레임으로 다시 맞춤
+                    while not subscriber.empty():
+                        subscriber.get_nowait()
+                    subscriber.put_nowait(self.full_frame())
+
+    def run(self) -> None:
+        while not self.stop_event.is_set():
+            started = time.time()
+            try:
+                self.tick()
+            except Exception as e:
+                print(f"Error in LiveBroadcaster: {str(e)}")
+            self.stop_event.wait(max(self.tick_seconds - (time.time() - started), 0))
+
+    def stop(self) -> None:
+        self.stop_event.set()
+
+_live_broadcaster: Optional[LiveBroadcaster] = None
+_live_broadcaster_lock = threading.Lock()
+
+def start_live_broadcaster() -> Optional[LiveBroadcaster]:
+    """
+    로컬 저장소 폴러와 브로드캐스터를 한 번만 시작하는 함수
+
+    Returns:
+        Optional[LiveBroadcaster]: 실행 중인 브로드캐스터 (로컬 저장소가 없으면 None)
+    """
+    global _live_broadcaster
+    if not start_live_poller():
+        return None
+    with _live_broadcaster_lock:
+        if _live_broadcaster is None or not _live_broadcaster.is_alive():
+            _live_broadcaster = LiveBroadcaster(LIVE_AGGREGATOR)
+            _live_broadcaster.start()
+        return _live_broadcaster
+
+def register_live_routes(server) -> None:
+    """
+    실시간 패널 푸시(Server-Sent Events) 라우트를 Flask 서버에 등록하는 함수
+
+    /live/stream: 'data: {"version": ..., "panels": {컴포넌트 ID: 갱신 데이터}}' 프레임 스트림
+
+    Args:
+        server: Dash 앱의 Flask 서버
+    """
+
+    @server.route('/live/stream')
+    def live_stream():
+        broadcaster = start_live_broadcaster()
+        if broadcaster is None:
+            abort(404, description="로컬 저장소가 없어 실시간 모드를 사용할 수 없습니다.")
+        subscriber = broadcaster.subscribe()
+        if subscriber is None:
+            abort(503, description="실시간 연결 수가 가득 찼습니다.")
+
+        def generate():
+            deadline = time.time() + STREAM_MAX_SECONDS
+            yield "retry: 3000\n\n"
+            while time.time() < deadline:
+                try:
+                    yield f"data: {subscriber.get(timeout=STREAM_KEEPALIVE_SECONDS)}\n\n"
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+
+        response = Response(
+            generate(),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+        # 클라이언트가 끊거나 응답이 끝나면 (첫 프레임 전이라도) 구독 해제
+        response.call_on_close(lambda: broadcaster.unsubscribe(subscriber))
+        return response
@@ -0,0 +1,355 @@
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from utils.ingest_utils import parse_lines, enrich_logs, to_log_table
+from utils.store_utils import (
+    LOG_SCHEMA, ROW_GROUP_SIZE, COMPRESSION, STATISTICS_COLUMNS, COMPACTED_SOURCES_KEY, COMPACTED_FILE_PREFIX,
+    get_compacted_sources, get_store_path, list_days, list_day_files, list_compacted_files,
+    write_log_table, write_row_group_index, get_row_group_index_path
+)
+from utils.ua_utils import UA_PARSER, get_ua_cache_path
+from utils.url_utils import URL_TEMPLATER, UrlTemplater, get_url_template_path
+from utils.search_utils import build_search_index
+from utils.visitor_utils import build_visitor_index
+from utils.session_utils import build_session_index
+from utils.path_utils import build_path_index
+
+# 저장소 안의 테일러 상태 파일 (읽은 위치와 처리 지표, '_' 접두사라 데이터셋 스캔에서 제외됨)
+TAIL_STATE_FILENAME = '_tailer_state.json'
+# 마이크로 배치 주기 (초)와 한 번에 읽을 최대 바이트
+DEFAULT_BATCH_INTERVAL = 1.0
+MAX_BATCH_BYTES = 32 * 1024 * 1024
+# 배치 파일 합치기, 검색 인덱스, 방문자/세션/경로 색인, user_agent 캐시, URL 템플릿 사전을 다시 저장하는 주기 (초)
+INDEX_REFRESH_INTERVAL = 300
+# 마이크로 배치 파일과 시간대별로 합친 파일의 이름 접두사
+TAIL_BATCH_PREFIX = 'tail-'
+TAIL_COMPACT_PREFIX = COMPACTED_FILE_PREFIX
+# 이 시간(초)보다 오래된 배치 파일만 합침 (실시간 폴러가 먼저 읽을 시간을 줌)
+TAIL_COMPACT_MIN_AGE = 60
+# 일 파티션 안의 데이터 파일 스키마 (day는 디렉터리 이름에만 있음)
+TAIL_FILE_SCHEMA = pa.schema([field for field in LOG_SCHEMA if field.name != 'day'])
+
+def get_tail_state_path(store_path: Optional[str] = None) -> str:
+    """
+    테일러 상태 파일 경로를 반환하는 함수
+
+    Args:
+        store_path (Optional[str]): 저장소 경로 (기본값: get_store_path())
+
+    Returns:
+        str: 상태 파일 경로
+    """
+    return os.path.join(store_path or get_store_path(), TAIL_STATE_FILENAME)
+
+def load_tail_state(store_path: Optional[str] = None) -> Optional[Dict]:
+    """
+    테일러 상태(읽은 위치, 처리 지표)를 불러오는 함수
+
+    Args:
+        store_path (Optional[str]): 저장소 경로
+
+    Returns:
+        Optional[Dict]: 상태 딕셔너리 또는 테일러를 실행한 적이 없으면 None
+    """
+    try:
+        with open(get_tail_state_path(store_path), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def save_tail_state(state: Dict, store_path: Optional[str] = None) -> None:
+    """
+    테일러 상태를 임시 파일에 쓴 뒤 교체해 저장하는 함수 (읽는 쪽이 중간 상태를 보지 않도록)
+
+    Args:
+        state (Dict): 상태 딕셔너리
+        store_path (Optional[str]): 저장소 경로
+    """
+    path = get_tail_state_path(store_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+def remove_compacted_batches(day: str, store_path: Optional[str] = None) -> int:
+    """
+    일 파티션에서 시간대 파일에 이미 합쳐진 배치 파일을 지우는 함수
+
+    합친 파일을 교체한 뒤 배치 파일을 지우기 전에 프로세스가 죽으면 배치 파일이 남습니다.
+    스캔은 이런 파일을 건너뛰지만, 다음 합치기에서 같은 행을 다시 합치지 않도록 먼저 정리합니다.
+
+    Args:
+        day (str): 'YYYY-MM-DD' 날짜
+        store_path (Optional[str]): 저장소 경로 (기본값: get_store_path())
+
+    Returns:
+        int: 지운 배치 파일 수
+    """
+    store_path = store_path or get_store_path()
+    batch_paths = list_compacted_files(list_day_files(day, store_path))
+    for path in batch_paths:
+        index_path = get_row_group_index_path(path, store_path)
+        if os.path.exists(index_path):
+            os.remove(index_path)
+        os.remove(path)
+    return len(batch_paths)
+
+def compact_tail_batches(day: str, store_path: Optional[str] = None, min_age: float = TAIL_COMPACT_MIN_AGE) -> int:
+    """
+    일 파티션의 테일러 마이크로 배치 파일을 현재 시간대(UTC)의 파일 하나로 합치는 함수
+
+    1초 배치마다 파일이 생겨 하루 수만 개로 늘어나지 않도록, 새로 쌓인 배치 파일을 같은 시간대의
+    compact-HH.parquet과 합쳐 다시 쓰고 원본 배치 파일은 지웁니다. 하루 파일 수는 시간대 파일 24개와
+    아직 합치지 않은 배치 파일로 제한됩니다. 합친 원본 이름은 스키마 메타데이터에 남겨
+    시간대 파일을 교체한 뒤 배치 파일을 지우기 전에도 스캔과 실시간 폴러가 같은 행을 다시 세지 않도록 합니다.
+
+    Args:
+        day (str): 'YYYY-MM-DD' 날짜
+        store_path (Optional[str]): 저장소 경로 (기본값: get_store_path())
+        min_age (float): 이 시간(초)보다 오래된 배치 파일만 합침
+
+    Returns:
+        int: 합친 배치 파일 수
+    """
+    store_path = store_path or get_store_path()
+    remove_compacted_batches(day, store_path)
+    now = time.time()
+    batch_paths = [
+        path for path in list_day_files(day, store_path)
+        if os.path.basename(path).startswith(TAIL_BATCH_PREFIX) and now - os.path.getmtime(path) >= min_age
+    ]
+    if not batch_paths:
+        return 0
+
+    day_dir = os.path.dirname(batch_paths[0])
+    compact_path = os.path.join(day_dir, f"{TAIL_COMPACT_PREFIX}{time.strftime('%H', time.gmtime(now))}.parquet")
+    sources = [os.path.basename(path) for path in batch_paths]
+    paths = batch_paths
+    if os.path.exists(compact_path):
+        sources = get_compacted_sources(pq.read_schema(compact_path)) + sources
+        paths = [compact_path] + batch_paths
+
+    table = ds.dataset(paths, format='parquet', schema=TAIL_FILE_SCHEMA).to_table().sort_by('timestamp_utc')
+    table = table.replace_schema_metadata({COMPACTED_SOURCES_KEY: json.dumps(sources)})
+    # '_' 접두사 임시 파일은 데이터셋 스캔에서 제외됨
+    temp_path = os.path.join(day_dir, f"_{os.path.basename(compact_path)}.tmp")
+    pq.write_table(
+        table, temp_path,
+        compression=COMPRESSION, row_group_size=ROW_GROUP_SIZE, write_statistics=STATISTICS_COLUMNS
+    )
+
+    # 예전 row group 색인이 새 파일에 쓰이지 않도록 먼저 지움 (색인이 없으면 row group을 건너뛰지 않음)
+    for path in [compact_path] + batch_paths:
+        index_path = get_row_group_index_path(path, store_path)
+        if os.path.exists(index_path):
+            os.remove(index_path)
+    os.replace(temp_path, compact_path)
+    for path in batch_paths:
+        os.remove(path)
+    write_row_group_index(compact_path, store_path)
+    return len(batch_paths)
+
+class LogTailer:
+    """
+    회전(rotate)되는 access.log를 따라 읽으며 마이크로 배치로 저장소에 추가하는 테일러
+
+    파일의 inode를 기억해 logrotate로 파일이 바뀌면 이전 파일의 남은 줄을 마저 읽고 새 파일로 넘어가며,
+    같은 inode인데 크기가 줄면(copytruncate) 처음부터 다시 읽습니다.
+    처리한 위치는 상태 파일에 남겨 재시작해도 중복 없이 이어서 읽습니다.
+    배치 파일 합치기와 색인 갱신은 읽기 루프를 멈추지 않도록 백그라운드 스레드에서 실행합니다.
+    """
+
+    def __init__(
+        self,
+        log_path: str,
+        store_path: Optional[str] = None,
+        aggregator=None,
+        batch_interval: float = DEFAULT_BATCH_INTERVAL,
+        from_start: bool = False
+    ):
+        self.log_path = log_path
+        self.store_path = store_path or get_store_path()
+        self.aggregator = aggregator
+        self.batch_interval = batch_interval
+        self.from_start = from_start
+        self.handle = None
+        self.inode = None
+        self.pending = b''
+        self.run_id = uuid.uuid4().hex[:8]
+        self.sequence = 0
+        self.days = set()
+        self.refresh_thread: Optional[threading.Thread] = None
+        # 아직 합치지 못한(너무 최근) 배치 파일이 남은 날짜 (다음 갱신에 다시 포함)
+        self.unmerged_days: List[str] = []
+        self.metrics = {'lines_total': 0, 'batches': 0, 'lines_per_sec': 0.0, 'lag_seconds': None, 'updated_at': None}
+
+    def _open_file(self, offset: int) -> None:
+        if self.handle is not None:
+            self.handle.close()
+        self.handle = open(self.log_path, 'rb')
+        stat = os.fstat(self.handle.fileno())
+        self.inode = (stat.st_dev, stat.st_ino)
+        self.handle.seek(min(offset, stat.st_size))
+        self.pending = b''
+
+    def open(self) -> None:
+        """상태 파일의 위치가 같은 파일을 가리키면 그 위치부터, 아니면 파일 끝(또는 처음)부터 읽기 시작합니다."""
+        # 이전 실행이 합치는 도중 종료되어 남은 배치 파일 정리
+        for day in list_days(self.store_path):
+            remove_compacted_batches(day, self.store_path)
+        state = load_tail_state(self.store_path) or {}
+        stat = os.stat(self.log_path)
+        if state.get('inode') == [stat.st_dev, stat.st_ino] and state.get('offset', 0) <= stat.st_size:
+            offset = state['offset']
+        else:
+            offset = 0 if self.from_start else stat.st_size
+        self._open_file(offset)
+
+    @property
+    def offset(self) -> int:
+        """처리가 끝난 마지막 완전한 줄 다음 위치"""
+        return self.handle.tell() - len(self.pending)
+
+    def read_lines(self) -> bytes:
+        """
+        새로 쓰인 완전한 줄들을 읽는 함수 (마지막 줄바꿈 뒤의 미완성 줄은 다음 읽기로 미룸)
+
+        Returns:
+            bytes: 줄바꿈으로 끝나는 로그 바이트 (새 줄이 없으면 빈 바이트)
+        """
+        data = self.pending + self.handle.read(MAX_BATCH_BYTES)
+        try:
+            stat = os.stat(self.log_path)
+        except FileNotFoundError:
+            # 회전 중이라 새 파일이 아직 없으면 이전 파일을 계속 읽음
+            stat = None
+
+        if stat is not None and (stat.st_dev, stat.st_ino) != self.inode:
+            # 회전됨: 이전 파일의 남은 부분을 마저 읽고 새 파일 처음으로 이동
+            data += self.handle.read()
+            if data and not data.endswith(b'\n'):
+                data += b'\n'
+            self._open_file(0)
+        elif stat is not None and stat.st_size < self.handle.tell():
+            # copytruncate로 잘림: 잘리기 전에 읽은 완전한 줄은 처리하고 같은 파일을 처음부터 다시 읽음
+            cut = data.rfind(b'\n') + 1
+            self._open_file(0)
+            return data[:cut]
+
+        cut = data.rfind(b'\n') + 1
+        self.pending = data[cut:]
+        return data[:cut]
+
+    def process(self, chunk: bytes) -> int:
+        """
+        로그 바이트 묶음을 파싱해 저장소와 실시간 집계기에 추가하는 함수
+
+        Args:
+            chunk (bytes): 줄바꿈으로 끝나는 로그 바이트
+
+        Returns:
+            int: 추가한 로그 수
+        """
+        started = time.time()
+        df = parse_lines(chunk.decode('utf-8', errors='replace'))
+        if not df.empty:
+            df = enrich_logs(df)
+            write_log_table(to_log_table(df), f"{TAIL_BATCH_PREFIX}{self.run_id}-{self.sequence:06d}", self.store_path)
+            self.sequence += 1
+            self.days.update(df['day'].unique())
+            if self.aggregator is not None:
+                self.aggregator.add(df)
+
+        finished = time.time()
+        self.metrics['batches'] += 1
+        self.metrics['lines_total'] += len(df)
+        self.metrics['lines_per_sec'] = len(df) / max(finished - started, 1e-9)
+        self.metrics['updated_at'] = finished
+        if not df.empty:
+            # 종단 간 지연: 배치의 가장 최근 로그 시각부터 저장소에 보이기까지 걸린 시간
+            self.metrics['lag_seconds'] = finished - df['timestamp_utc'].max().timestamp()
+
+        save_tail_state({'inode': list(self.inode), 'offset': self.offset, **self.metrics}, self.store_path)
+        return len(df)
+
+    def refresh_indexes(self, days: List[str], templater: UrlTemplater, min_age: float = TAIL_COMPACT_MIN_AGE) -> None:
+        """
+        날짜별 배치 파일을 합친 뒤 검색 인덱스와 방문자/세션/경로 색인을 다시 만드는 함수
+
+        Args:
+            days (List[str]): 테일러가 추가한 날짜 목록
+            templater (UrlTemplater): 경로 색인에 쓸 URL 템플릿 사전 사본 (읽기 루프가 계속 템플릿을 추가하므로)
+            min_age (float): 이 시간(초)보다 오래된 배치 파일만 합침
+        """
+        try:
+            for day in days:
+                compact_tail_batches(day, self.store_path, min_age)
+            self.unmerged_days = [
+                day for day in days
+                if any(os.path.basename(path).startswith(TAIL_BATCH_PREFIX) for path in list_day_files(day, self.store_path))
+            ]
+            build_search_index(days, self.store_path)
+            build_visitor_index(days, self.store_path)
+            build_session_index(days, self.store_path)
+            build_path_index(days, self.store_path, templater)
+        except Exception as e:
+            print(f"색인 갱신 오류: {e}")
+
+    def start_refresh(self) -> None:
+        """user_agent 캐시와 URL 템플릿 사전을 저장하고, 이전 갱신이 끝났으면 색인 갱신 스레드를 시작합니다."""
+        UA_PARSER.save(get_ua_cache_path(self.store_path))
+        URL_TEMPLATER.save(get_url_template_path(self.store_path))
+        if self.refresh_thread is not None and self.refresh_thread.is_alive():
+            return
+        self.days.update(self.unmerged_days)
+        self.unmerged_days = []
+        if not self.days:
+            return
+        days = sorted(self.days)
+        self.days = set()
+        self.refresh_thread = threading.Thread(
+            target=self.refresh_indexes, args=(days, URL_TEMPLATER.snapshot()), daemon=True
+        )
+        self.refresh_thread.start()
+
+    def run(self) -> None:
+        """batch_interval마다 새 줄을 읽어 처리하는 루프 (Ctrl+C로 종료하면 인덱스를 정리)"""
+        self.open()
+        last_refresh = time.time()
+        try:
+            while True:
+                started = time.time()
+                chunk = self.read_lines()
+                if chunk:
+                    lines = self.process(chunk)
+                    lag = self.metrics['lag_seconds']
+                    lag_text = "-" if lag is None else f"{lag:.1f}초"
+                    print(f"{lines:,}줄 ({self.metrics['lines_per_sec']:,.0f} lines/sec, 지연 {lag_text})")
+
+                if time.time() - last_refresh >= INDEX_REFRESH_INTERVAL:
+                    self.start_refresh()
+                    last_refresh = time.time()
+
+                # 한 번에 다 읽지 못했으면 쉬지 않고 이어서 읽음
+                if len(chunk) < MAX_BATCH_BYTES:
+                    time.sleep(max(self.batch_interval - (time.time() - started), 0))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            # 진행 중인 갱신을 기다린 뒤 남은 날짜를 마저 정리 (종료 후에는 폴러가 읽을 배치가 없으므로 모두 합침)
+            if self.refresh_thread is not None:
+                self.refresh_thread.join()
+            self.days.update(self.unmerged_days)
+            if self.days:
+                self.refresh_indexes(sorted(self.days), URL_TEMPLATER.snapshot(), min_age=0)
+            UA_PARSER.save(get_ua_cache_path(self.store_path))
+            URL_TEMPLATER.save(get_url_template_path(self.store_path))
+            if self.handle is not None:
+                self.handle.close()
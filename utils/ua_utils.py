@@ -0,0 +1,197 @@
+import os
+import re
+from typing import Dict, Optional, Tuple
+import pandas as pd
+from utils.store_utils import get_store_path
+
+# 규칙을 바꾸면 올려서 이전 실행의 파싱 캐시를 무효화
+UA_RULES_VERSION = 1
+UA_CACHE_FILENAME = '_ua_cache.parquet'
+UA_COLUMNS = ['user_browser', 'user_os', 'user_is_mobile', 'user_is_bot']
+
+# 봇 판별 키워드
+BOT_PATTERN = re.compile(
+    r'bot\b|bot/|crawl|spider|slurp|archiver|fetcher|scanner|monitor|headless|python-requests|'
+    r'python-urllib|curl/|wget/|go-http-client|java/|okhttp|libwww|httpclient|scrapy|facebookexternalhit',
+    re.IGNORECASE
+)
+
+# 모바일 판별 키워드
+MOBILE_PATTERN = re.compile(r'mobile|android|iphone|ipod|ipad|windows phone|opera mini|iemobile', re.IGNORECASE)
+
+# 브라우저 규칙 (위에서부터 먼저 맞는 규칙 사용, Chrome 기반 브라우저는 Chrome보다 먼저)
+BROWSER_RULES = [
+    (r'googlebot', 'Googlebot'),
+    (r'bingbot', 'bingbot'),
+    (r'yandex(?:bot|images)', 'YandexBot'),
+    (r'baiduspider', 'Baiduspider'),
+    (r'ahrefsbot', 'AhrefsBot'),
+    (r'semrushbot', 'SemrushBot'),
+    (r'mj12bot', 'MJ12bot'),
+    (r'dotbot', 'DotBot'),
+    (r'petalbot', 'PetalBot'),
+    (r'applebot', 'Applebot'),
+    (r'facebookexternalhit', 'FacebookBot'),
+    (r'telegrambot', 'TelegramBot'),
+    (r'edg(?:e|a|ios)?/', 'Edge'),
+    (r'opr/|opera', 'Opera'),
+    (r'samsungbrowser', 'Samsung Internet'),
+    (r'ucbrowser', 'UC Browser'),
+    (r'yabrowser', 'Yandex Browser'),
+    (r'instagram', 'Instagram'),
+    (r'fban|fbav', 'Facebook'),
+    (r'crios/', 'Chrome Mobile iOS'),
+    (r'fxios/', 'Firefox iOS'),
+    (r'firefox/', 'Firefox'),
+    (r'chrome/.*mobile', 'Chrome Mobile'),
+    (r'chrome/|chromium/', 'Chrome'),
+    (r'msie |trident/', 'IE'),
+    (r'version/.*mobile.*safari/', 'Mobile Safari'),
+    (r'(?:iphone|ipad|ipod).*applewebkit', 'Mobile Safari'),
+    (r'version/.*safari/', 'Safari'),
+    (r'android.*applewebkit', 'Android'),
+    (r'python-requests|python-urllib', 'Python Requests'),
+    (r'curl/', 'curl'),
+    (r'wget/', 'Wget'),
+    (r'okhttp', 'okhttp'),
+]
+
+# 운영체제 규칙 (위에서부터 먼저 맞는 규칙 사용)
+OS_RULES = [
+    (r'windows phone', 'Windows Phone'),
+    (r'windows', 'Windows'),
+    (r'iphone|ipad|ipod|\bios\b', 'iOS'),
+    (r'android', 'Android'),
+    (r'\bcros\b', 'Chrome OS'),
+    (r'mac os x|macintosh', 'Mac OS X'),
+    (r'ubuntu', 'Ubuntu'),
+    (r'linux', 'Linux'),
+]
+
+UNKNOWN_FAMILY = 'Other'
+
+class UserAgentParser:
+    """
+    user_agent 문자열을 브라우저, OS, 모바일/봇 여부로 파싱하는 클래스
+
+    로그 줄 수와 무관하게 고유 user_agent마다 한 번만 파싱하고,
+    결과를 저장소 캐시 파일에 남겨 다음 적재에서도 재사용합니다.
+    """
+
+    def __init__(self):
+        self.browser_rules = [(re.compile(p, re.IGNORECASE), family) for p, family in BROWSER_RULES]
+        self.os_rules = [(re.compile(p, re.IGNORECASE), family) for p, family in OS_RULES]
+        self.cache: Dict[str, Tuple[str, str, bool, bool]] = {}
+        self.dirty = False
+
+    def parse(self, user_agent: Optional[str]) -> Tuple[str, str, bool, bool]:
+        """
+        user_agent 하나를 파싱하는 함수 (캐시에 있으면 재사용)
+
+        Args:
+            user_agent (Optional[str]): user_agent 문자열
+
+        Returns:
+            Tuple[str, str, bool, bool]: (브라우저, OS, 모바일 여부, 봇 여부)
+        """
+        if not isinstance(user_agent, str):
+            return (UNKNOWN_FAMILY, UNKNOWN_FAMILY, False, False)
+        parsed = self.cache.get(user_agent)
+        if parsed is None:
+            browser = next((family for pattern, family in self.browser_rules if pattern.search(user_agent)), UNKNOWN_FAMILY)
+            os_family = next((family for pattern, family in self.os_rules if pattern.search(user_agent)), UNKNOWN_FAMILY)
+            is_bot = bool(BOT_PATTERN.search(user_agent))
+            is_mobile = not is_bot and bool(MOBILE_PATTERN.search(user_agent))
+            parsed = (browser, os_family, is_mobile, is_bot)
+            self.cache[user_agent] = parsed
+            self.dirty = True
+        return parsed
+
+    def parse_series(self, user_agents: pd.Series) -> pd.DataFrame:
+        """
+        user_agent 컬럼을 사전 인코딩한 뒤 고유 값만 파싱해 행 단위로 펼치는 함수
+
+        Args:
+            user_agents (pd.Series): user_agent 컬럼
+
+        Returns:
+            pd.DataFrame: UA_COLUMNS 컬럼을 갖는 데이터프레임 (입력과 같은 인덱스)
+        """
+        codes, uniques = pd.factorize(user_agents)
+        # 마지막 행은 결측 user_agent(코드 -1)용
+        parsed = pd.DataFrame(
+            [self.parse(ua) for ua in uniques] + [self.parse(None)],
+            columns=UA_COLUMNS
+        )
+        result = parsed.take(codes)
+        result.index = user_agents.index
+        return result
+
+    def load(self, path: str) -> None:
+        """
+        저장된 파싱 캐시를 불러오는 함수 (규칙 버전이 다르면 무시)
+
+        Args:
+            path (str): 캐시 파일 경로
+        """
+        if not os.path.exists(path):
+            return
+        try:
+            df = pd.read_parquet(path)
+            df = df[df['rules_version'] == UA_RULES_VERSION]
+            self.cache.update(zip(
+                df['user_agent'],
+                zip(df['user_browser'], df['user_os'], df['user_is_mobile'].astype(bool), df['user_is_bot'].astype(bool))
+            ))
+        except Exception as e:
+            print(f"UA 캐시 로드 오류: {e}")
+
+    def save(self, path: str) -> None:
+        """
+        파싱 캐시를 파일로 저장하는 함수 (새로 파싱한 값이 있을 때만)
+
+        Args:
+            path (str): 캐시 파일 경로
+        """
+        if not self.dirty:
+            return
+        try:
+            df = pd.DataFrame(
+                [(ua, *parsed) for ua, parsed in self.cache.items()],
+                columns=['user_agent', *UA_COLUMNS]
+            )
+            df['rules_version'] = UA_RULES_VERSION
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            df.to_parquet(path, index=False, compression='zstd')
+            self.dirty = False
+        except Exception as e:
+            print(f"UA 캐시 저장 오류: {e}")
+
+# 모듈 전체에서 공유하는 파서
+UA_PARSER = UserAgentParser()
+
+def get_ua_cache_path(store_path: Optional[str] = None) -> str:
+    """
+    저장소 안의 UA 파싱 캐시 파일 경로를 반환하는 함수 ('_' 접두사라 데이터셋 스캔에서 제외됨)
+
+    Args:
+        store_path (Optional[str]): 저장소 경로 (기본값: get_store_path())
+
+    Returns:
+        str: 캐시 파일 경로
+    """
+    return os.path.join(store_path or get_store_path(), UA_CACHE_FILENAME)
+
+def enrich_user_agent(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    user_agent 컬럼으로 user_browser, user_os, user_is_mobile, user_is_bot 컬럼을 추가하는 함수
+
+    Args:
+        df (pd.DataFrame): user_agent 컬럼을 포함한 데이터프레임
+
+    Returns:
+        pd.DataFrame: UA 컬럼이 추가된 데이터프레임
+    """
+    df = df.copy()
+    df[UA_COLUMNS] = UA_PARSER.parse_series(df['user_agent'])
+    return df
@@ -0,0 +1,352 @@
+import copy
+import os
+import re
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+from cachetools import TTLCache, cached
+from utils.utils import load_bigquery_data, get_bigquery_config, get_table_ref, execute_bigquery, write_bigquery_table
+from utils.store_utils import get_store_path, atomic_write
+
+# 사용자 정의 경로 규칙 (위에서부터 먼저 일치하는 규칙 사용)
+# - 리터럴 세그먼트는 그대로 일치
+# - {id}: 숫자, {hash}: 16자 이상 16진수/UUID, {slug}: 퍼센트 인코딩된 이름, {var}: 아무 세그먼트 하나
+# - *: 나머지 세그먼트 전체 (없어도 일치)
+URL_TEMPLATE_RULES = [
+    '/product/{id}/*',
+    '/m/product/{id}/*',
+    '/filter/*',
+    '/m/filter/*',
+    '/browse/*',
+    '/m/browse/*',
+    '/image/*',
+    '/static/*',
+]
+
+# 규칙에 없는 경로도 세그먼트 모양으로 변수 자리를 찾음 (순서대로 검사)
+SEGMENT_PATTERNS = {
+    '{id}': re.compile(r'\d+'),
+    '{hash}': re.compile(r'[0-9a-fA-F]{16,}|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}'),
+    '{slug}': re.compile(r'.*%[0-9a-fA-F]{2}.*'),
+}
+ANY_SEGMENT = '{var}'
+REST_SEGMENTS = '*'
+URL_TEMPLATE_FILENAME = '_url_templates.parquet'
+URL_PATH_TABLE_SUFFIX = '_url_path'
+URL_TEMPLATE_TABLE_SUFFIX = '_url_template'
+# BigQuery 템플릿 컬럼/차원 테이블 존재 여부를 다시 확인하는 주기 (초)
+URL_TEMPLATE_CHECK_TTL = 10 * 60
+
+class UrlTemplater:
+    """
+    url_path를 경로 템플릿(/product/{id}/* 등)으로 묶고 템플릿마다 작은 정수 ID를 부여하는 클래스
+
+    - 사용자 규칙: 세그먼트 단위 토큰 트라이로 한 번 컴파일 (리터럴 > 변수 > * 순서로 일치)
+    - 규칙에 없는 경로: 숫자/해시/인코딩된 이름 세그먼트를 변수로 바꿈
+    - 템플릿 ID는 처음 본 순서대로 부여하고 저장소의 사전 파일에 남겨 다음 적재에서도 같은 ID를 사용
+    """
+
+    def __init__(self, rules: List[str]):
+        self.trie = {}
+        for rule in rules:
+            node = self.trie
+            for segment in rule.strip('/').split('/'):
+                node = node.setdefault(segment, {})
+            node.setdefault('$', rule)
+
+        self.ids: Dict[str, int] = {}
+        self.templates: List[str] = []
+        self.dirty = False
+
+    def _match(self, node: Dict, segments: List[str], position: int) -> Optional[str]:
+        rest = node.get(REST_SEGMENTS)
+        if position == len(segments):
+            if '$' in node:
+                return node['$']
+            return rest.get('$') if rest else None
+
+        segment = segments[position]
+        candidates = []
+        if segment in node:
+            candidates.append(node[segment])
+        for placeholder, pattern in SEGMENT_PATTERNS.items():
+            if placeholder in node and pattern.fullmatch(segment):
+                candidates.append(node[placeholder])
+        if ANY_SEGMENT in node:
+            candidates.append(node[ANY_SEGMENT])
+        for child in candidates:
+            matched = self._match(child, segments, position + 1)
+            if matched is not None:
+                return matched
+        return rest.get('$') if rest else None
+
+    def template(self, path: Optional[str]) -> str:
+        """경로 하나의 템플릿 문자열을 반환합니다."""
+        if not isinstance(path, str) or path in ('', '/'):
+            return path if isinstance(path, str) else ''
+        segments = path.strip('/').split('/')
+        matched = self._match(self.trie, segments, 0)
+        if matched is not None:
+            return matched
+
+        for i, segment in enumerate(segments):
+            for placeholder, pattern in SEGMENT_PATTERNS.items():
+                if pattern.fullmatch(segment):
+                    segments[i] = placeholder
+                    break
+        return '/' + '/'.join(segments) + ('/' if path.endswith('/') else '')
+
+    def template_series(self, paths: pd.Series) -> pd.Series:
+        """
+        경로 컬럼 전체를 템플릿 문자열로 바꿉니다.
+
+        고유 경로만 템플릿으로 바꾼 뒤 원래 행으로 펼치므로 행 수와 무관하게 고유 경로 수만큼만 매칭합니다.
+        """
+        codes, uniques = pd.factorize(paths)
+        # 마지막 칸은 결측값(-1 코드)용
+        lookup = np.array([self.template(path) for path in uniques] + [self.template(None)], dtype=object)
+        return pd.Series(lookup[codes], index=paths.index)
+
+    def template_id(self, template: str) -> int:
+        """템플릿의 ID를 반환합니다 (처음 보는 템플릿이면 새 ID 부여)."""
+        if template not in self.ids:
+            self.ids[template] = len(self.templates)
+            self.templates.append(template)
+            self.dirty = True
+        return self.ids[template]
+
+    def template_ids(self, paths: pd.Series) -> np.ndarray:
+        """
+        경로 컬럼 전체를 템플릿 ID로 바꿉니다.
+
+        Args:
+            paths (pd.Series): url_path 컬럼
+
+        Returns:
+            np.ndarray: int32 템플릿 ID 배열
+        """
+        codes, uniques = pd.factorize(paths)
+        lookup = np.array(
+            [self.template_id(self.template(path)) for path in uniques] + [self.template_id(self.template(None))],
+            dtype=np.int32
+        )
+        return lookup[codes]
+
+    def template_labels(self, paths: pd.Series, template_ids: Optional[pd.Series] = None) -> pd.Series:
+        """
+        적재 시 채워 둔 url_template_id로 템플릿 문자열을 찾고, ID가 없는 행만 경로를 템플릿으로 바꿉니다.
+
+        Args:
+            paths (pd.Series): url_path 컬럼
+            template_ids (Optional[pd.Series]): url_template_id 컬럼 (컬럼이 생기기 전 파티션이면 None)
+
+        Returns:
+            pd.Series: 템플릿 문자열 컬럼
+        """
+        labels = pd.Series(None, index=paths.index, dtype=object)
+        known = pd.Series(False, index=paths.index)
+        if template_ids is not None:
+            known = template_ids.notna() & (template_ids < len(self.templates))
+            lookup = np.array(self.templates, dtype=object)
+            labels[known] = lookup[template_ids[known].to_numpy(dtype=np.int64)]
+        if not known.all():
+            labels[~known] = self.template_series(paths[~known])
+        return labels
+
+    def snapshot(self) -> 'UrlTemplater':
+        """
+        규칙 트라이는 공유하고 현재 템플릿 사전만 복사한 사본을 반환합니다.
+
+        다른 스레드(색인 갱신)가 읽는 동안 적재 루프가 원본에 템플릿을 추가해도 영향을 받지 않습니다.
+        """
+        templater = copy.copy(self)
+        templater.ids = dict(self.ids)
+        templater.templates = list(self.templates)
+        templater.dirty = False
+        return templater
+
+    def set_templates(self, templates: pd.DataFrame) -> None:
+        """
+        url_template_id, url_template 데이터프레임으로 템플릿 사전을 채웁니다.
+
+        Args:
+            templates (pd.DataFrame): url_template_id, url_template 컬럼 데이터프레임
+        """
+        self.templates = templates.sort_values('url_template_id')['url_template'].tolist()
+        self.ids = {template: i for i, template in enumerate(self.templates)}
+        self.dirty = False
+
+    def load(self, path: str) -> None:
+        """
+        템플릿 사전 파일을 불러오는 함수 (파일이 없으면 빈 사전 유지)
+
+        Args:
+            path (str): 사전 파일 경로
+        """
+        if not os.path.exists(path):
+            return
+        try:
+            self.set_templates(pd.read_parquet(path))
+        except Exception as e:
+            print(f"URL 템플릿 사전 로드 오류: {e}")
+
+    def save(self, path: str) -> None:
+        """
+        템플릿 사전을 파일로 저장하는 함수 (새 템플릿이 있을 때만)
+
+        Args:
+            path (str): 사전 파일 경로
+        """
+        if not self.dirty:
+            return
+        try:
+            df = pd.DataFrame({
+                'url_template_id': np.arange(len(self.templates), dtype=np.int32),
+                'url_template': self.templates
+            })
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            with atomic_write(path) as temp_path:
+                df.to_parquet(temp_path, index=False, compression='zstd')
+            self.dirty = False
+        except Exception as e:
+            print(f"URL 템플릿 사전 저장 오류: {e}")
+
+# 모듈 로드 시 한 번만 컴파일
+URL_TEMPLATER = UrlTemplater(URL_TEMPLATE_RULES)
+
+def get_url_template_path(store_path: Optional[str] = None) -> str:
+    """
+    저장소 안의 URL 템플릿 사전 파일 경로를 반환하는 함수 ('_' 접두사라 데이터셋 스캔에서 제외됨)
+
+    Args:
+        store_path (Optional[str]): 저장소 경로 (기본값: get_store_path())
+
+    Returns:
+        str: 사전 파일 경로
+    """
+    return os.path.join(store_path or get_store_path(), URL_TEMPLATE_FILENAME)
+
+@cached(TTLCache(maxsize=1, ttl=URL_TEMPLATE_CHECK_TTL))
+def has_url_templates() -> bool:
+    """
+    BigQuery 로그 테이블에 url_template_id 컬럼과 템플릿 차원 테이블이 모두 있는지 확인하는 함수
+
+    둘 다 `python -m utils.url_utils` 백필로만 만들어지므로, 백필 전 테이블이면 페이지 쿼리는 원본 url_path로 묶습니다.
+
+    Returns:
+        bool: 템플릿으로 묶을 수 있으면 True
+    """
+    config = get_bigquery_config()
+    schema_ref = f"{config['project_id']}.{config['dataset']}.INFORMATION_SCHEMA"
+    df = load_bigquery_data(f"""
+    SELECT
+        (SELECT COUNT(*) FROM `{schema_ref}.COLUMNS`
+         WHERE table_name = '{config['table']}' AND column_name = 'url_template_id') as template_columns,
+        (SELECT COUNT(*) FROM `{schema_ref}.TABLES`
+         WHERE table_name = '{config['table']}{URL_TEMPLATE_TABLE_SUFFIX}') as template_tables
+    """)
+    if df is None or df.empty:
+        return False
+    return bool(df['template_columns'].iloc[0]) and bool(df['template_tables'].iloc[0])
+
+def enrich_url_template(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    로그 데이터프레임에 url_template_id 컬럼을 추가하는 함수
+
+    Args:
+        df (pd.DataFrame): url_path 컬럼을 포함한 로그 데이터프레임
+
+    Returns:
+        pd.DataFrame: url_template_id 컬럼이 추가된 데이터프레임
+    """
+    df['url_template_id'] = URL_TEMPLATER.template_ids(df['url_path'])
+    return df
+
+def build_url_template_dimension(paths: pd.Series) -> pd.DataFrame:
+    """
+    고유 url_path별 url_template_id 차원 테이블을 만드는 함수
+
+    Args:
+        paths (pd.Series): 고유 url_path 목록
+
+    Returns:
+        pd.DataFrame: url_path, url_template_id, url_template 데이터프레임
+    """
+    unique_paths = pd.Series(paths.dropna().unique(), dtype='object')
+    templates = URL_TEMPLATER.template_series(unique_paths)
+    return pd.DataFrame({
+        'url_path': unique_paths,
+        'url_template_id': templates.map(URL_TEMPLATER.template_id).astype('int64'),
+        'url_template': templates
+    })
+
+def backfill_url_templates() -> bool:
+    """
+    BigQuery 로그 테이블에서 url_template_id가 비어 있는 행을 채우고 템플릿 차원 테이블을 갱신하는 함수
+
+    증분 작업이라 주기적으로(예: 매일) 실행해 새로 들어온 행을 채웁니다.
+    기존 템플릿 차원 테이블로 템플릿 사전을 먼저 채워 이미 부여한 ID를 그대로 유지하고,
+    url_template_id가 NULL인 행의 고유 url_path만 Python에서 템플릿으로 바꾼 뒤
+    이번에 찾은 경로 차원 테이블과의 조인으로 NULL인 행에만 기록합니다.
+
+    Returns:
+        bool: 성공 여부
+    """
+    config = get_bigquery_config()
+    table_ref = get_table_ref()
+    template_table = f"{config['table']}{URL_TEMPLATE_TABLE_SUFFIX}"
+
+    if not execute_bigquery(f"""
+    ALTER TABLE `{table_ref}`
+        ADD COLUMN IF NOT EXISTS url_template_id INT64
+    """):
+        return False
+
+    tables_df = load_bigquery_data(f"""
+    SELECT table_name
+    FROM `{config['project_id']}.{config['dataset']}.INFORMATION_SCHEMA.TABLES`
+    WHERE table_name = '{template_table}'
+    """)
+    if tables_df is None:
+        return False
+    if not tables_df.empty:
+        template_df = load_bigquery_data(f"""
+        SELECT url_template_id, url_template
+        FROM `{get_table_ref(URL_TEMPLATE_TABLE_SUFFIX)}`
+        """)
+        if template_df is None:
+            return False
+        URL_TEMPLATER.set_templates(template_df)
+
+    dim_df = load_bigquery_data(f"""
+    SELECT DISTINCT url_path
+    FROM `{table_ref}`
+    WHERE url_template_id IS NULL
+        AND url_path IS NOT NULL
+    """)
+    if dim_df is None:
+        return False
+    if dim_df.empty:
+        print("새로 채울 url_path가 없습니다.")
+        return True
+
+    dim_df = build_url_template_dimension(dim_df['url_path'])
+    template_df = pd.DataFrame({
+        'url_template_id': np.arange(len(URL_TEMPLATER.templates), dtype=np.int64),
+        'url_template': URL_TEMPLATER.templates
+    })
+    if not (write_bigquery_table(dim_df[['url_path', 'url_template_id']], URL_PATH_TABLE_SUFFIX)
+            and write_bigquery_table(template_df, URL_TEMPLATE_TABLE_SUFFIX)):
+        return False
+
+    return execute_bigquery(f"""
+    UPDATE `{table_ref}` t
+    SET url_template_id = d.url_template_id
+    FROM `{get_table_ref(URL_PATH_TABLE_SUFFIX)}` d
+    WHERE t.url_path = d.url_path
+        AND t.url_template_id IS NULL
+    """)
+
+if __name__ == '__main__':
+    # python -m utils.url_utils 로 url_template_id가 비어 있는 행 채우기 (주기적으로 실행)
+    print("완료" if backfill_url_templates() else "실패")
@@ -41,6 +41,64 @@ def load_bigquery_data(query: str, limit: Optional[int] = None) -> Optional[pd.D
         print(f"BigQuery 데이터 로드 중 에러 발생: {e}")
         return None
 
+def get_table_ref(suffix: str = '') -> str:
+    """
+    BigQuery 테이블의 전체 경로를 반환하는 함수
+    
+    Args:
+        suffix (str): 테이블 이름 뒤에 붙일 접미사 (예: '_geo')
+        
+    Returns:
+        str: `project.dataset.table` 형태의 테이블 경로
+    """
+    config = get_bigquery_config()
+    return f"{config['project_id']}.{config['dataset']}.{config['table']}{suffix}"
+
+def execute_bigquery(query: str) -> bool:
+    """
+    결과를 반환하지 않는 BigQuery 쿼리(DDL/DML)를 실행하는 함수
+    
+    Args:
+        query (str): 실행할 SQL 쿼리
+        
+    Returns:
+        bool: 실행 성공 여부
+    """
+    try:
+        from google.cloud import bigquery
+        
+        config = get_bigquery_config()
+        client = bigquery.Client(project=config['project_id'])
+        client.query(query).result()
+        return True
+    except Exception as e:
+        print(f"BigQuery 쿼리 실행 중 에러 발생: {e}")
+        return False
+
+def write_bigquery_table(df: pd.DataFrame, suffix: str) -> bool:
+    """
+    데이터프레임을 로그 테이블 옆의 보조 테이블로 저장하는 함수
+    
+    Args:
+        df (pd.DataFrame): 저장할 데이터프레임
+        suffix (str): 로그 테이블 이름 뒤에 붙일 접미사 (예: '_geo')
+        
+    Returns:
+        bool: 저장 성공 여부
+    """
+    try:
+        config = get_bigquery_config()
+        pandas_gbq.to_gbq(
+            df,
+            f"{config['dataset']}.{config['table']}{suffix}",
+            project_id=config['project_id'],
+            if_exists='replace'
+        )
+        return True
+    except Exception as e:
+        print(f"BigQuery 테이블 저장 중 에러 발생: {e}")
+        return False
+
 def get_sample_data(limit: int = 1000) -> Optional[pd.DataFrame]:
     """
     샘플 데이터를 로드하는 함수
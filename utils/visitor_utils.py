@@ -0,0 +1,467 @@
+import os
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+import pyarrow.dataset as ds
+from utils.store_utils import get_store_path, list_days, open_log_dataset, atomic_write, mtime_cache
+
+# 저장소 안의 방문자 색인 디렉터리 ('_' 접두사라 데이터셋 스캔에서 제외됨)
+VISITOR_INDEX_DIRNAME = '_visitor_index'
+VISITOR_DICTIONARY_FILENAME = 'visitors.parquet'
+# 방문자 원본 (ip, user_agent) 파일 (색인을 만들 때만 읽고 웹 프로세스는 읽지 않음)
+VISITOR_IDENTITY_FILENAME = 'identities.parquet'
+VISITOR_IDENTITY_COLUMNS = ['ip', 'user_agent']
+# 방문자 사전에 함께 남기는 방문자 속성 (user_agent에서 정해지므로 방문자마다 하나)
+VISITOR_ATTRIBUTE_COLUMNS = ['user_is_mobile', 'user_browser', 'user_os']
+VISITOR_COLUMNS = VISITOR_IDENTITY_COLUMNS + VISITOR_ATTRIBUTE_COLUMNS
+VISITOR_DICTIONARY_COLUMNS = ['visitor_key'] + VISITOR_ATTRIBUTE_COLUMNS + ['first_day']
+UNKNOWN_DAY = np.iinfo(np.int32).max
+
+def day_to_int(day: str) -> int:
+    """
+    'YYYY-MM-DD' 날짜를 1970-01-01부터의 일 수로 바꾸는 함수
+
+    Args:
+        day (str): 날짜 문자열
+
+    Returns:
+        int: 일 수
+    """
+    return int(np.datetime64(day, 'D').astype(np.int64))
+
+def visitor_keys(df: pd.DataFrame) -> np.ndarray:
+    """
+    (ip, user_agent) 쌍을 64비트 해시 키로 바꾸는 함수
+
+    Args:
+        df (pd.DataFrame): ip, user_agent 컬럼을 포함한 데이터프레임
+
+    Returns:
+        np.ndarray: uint64 키 배열
+    """
+    return pd.util.hash_pandas_object(df[['ip', 'user_agent']], index=False).to_numpy()
+
+def get_visitor_index_dir(store_path: Optional[str] = None) -> str:
+    """
+    방문자 색인 디렉터리 경로를 반환하는 함수
+
+    Args:
+        store_path (Optional[str]): 저장소 경로 (기본값: get_store_path())
+
+    Returns:
+        str: 디렉터리 경로
+    """
+    return os.path.join(store_path or get_store_path(), VISITOR_INDEX_DIRNAME)
+
+class VisitorDictionary:
+    """
+    (ip, user_agent) 방문자를 0부터 시작하는 조밀한 int32 ID로 바꾸는 사전
+
+    ID 순서대로 해시 키, 방문자 속성(모바일 여부, 브라우저, OS), 첫 방문일을 배열로 들고 있어
+    ID 배열만 있으면 문자열 GROUP BY 없이 인덱싱으로 속성을 꺼낼 수 있습니다.
+    원본 ip, user_agent 문자열(identities)은 색인을 만들 때만 불러오며, 조회용 사전은 들고 있지 않습니다.
+    """
+
+    def __init__(self, frame: Optional[pd.DataFrame] = None, identities: Optional[pd.DataFrame] = None):
+        if frame is None:
+            frame = pd.DataFrame({
+                'visitor_key': pd.Series(dtype='uint64'),
+                'user_is_mobile': pd.Series(dtype=bool),
+                'user_browser': pd.Series(dtype=object),
+                'user_os': pd.Series(dtype=object),
+                'first_day': pd.Series(dtype='int32'),
+            })
+        self.frame = frame.reset_index(drop=True)
+        self.identities = identities.reset_index(drop=True) if identities is not None else None
+        self._refresh()
+
+    def _refresh(self) -> None:
+        self.keys = self.frame['visitor_key'].to_numpy(dtype=np.uint64)
+        self.key_order = np.argsort(self.keys, kind='stable').astype(np.int32)
+        self.sorted_keys = self.keys[self.key_order]
+        self.first_day = self.frame['first_day'].to_numpy(dtype=np.int32)
+        self.is_mobile = self.frame['user_is_mobile'].to_numpy(dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def lookup(self, keys: np.ndarray) -> np.ndarray:
+        """
+        해시 키를 방문자 ID로 바꾸는 함수
+
+        Args:
+            keys (np.ndarray): uint64 키 배열
+
+        Returns:
+            np.ndarray: int32 ID 배열 (사전에 없는 키는 -1)
+        """
+        if len(self.keys) == 0:
+            return np.full(len(keys), -1, dtype=np.int32)
+        positions = np.minimum(np.searchsorted(self.sorted_keys, keys), len(self.keys) - 1)
+        found = self.sorted_keys[positions] == keys
+        return np.where(found, self.key_order[positions], -1).astype(np.int32)
+
+    def encode(self, df: pd.DataFrame, day: str) -> np.ndarray:
+        """
+        하루치 로그의 방문자를 ID로 바꾸고 처음 보는 방문자는 사전에 추가하는 함수
+
+        Args:
+            df (pd.DataFrame): VISITOR_COLUMNS를 포함한 하루치 로그
+            day (str): 'YYYY-MM-DD' 날짜
+
+        Returns:
+            np.ndarray: 그날 방문한 방문자 ID (정렬된 고유 int32 배열)
+        """
+        unique_keys, first_rows = np.unique(visitor_keys(df), return_index=True)
+        ids = self.lookup(unique_keys)
+
+        new = ids < 0
+        if new.any():
+            added = df.iloc[first_rows[new]].reset_index(drop=True)
+            attributes = added[VISITOR_ATTRIBUTE_COLUMNS].copy()
+            attributes.insert(0, 'visitor_key', unique_keys[new])
+            attributes['user_is_mobile'] = attributes['user_is_mobile'].fillna(False).astype(bool)
+            attributes['first_day'] = np.int32(day_to_int(day))
+            ids[new] = np.arange(len(self.keys), len(self.keys) + int(new.sum()), dtype=np.int32)
+            self.frame = pd.concat([self.frame, attributes], ignore_index=True)
+            if self.identities is not None:
+                self.identities = pd.concat([self.identities, added[VISITOR_IDENTITY_COLUMNS]], ignore_index=True)
+
+        # 날짜 순서와 관계없이 적재해도 첫 방문일은 가장 이른 날짜로 유지
+        first_day = self.frame['first_day'].to_numpy(dtype=np.int32).copy()
+        np.minimum.at(first_day, ids, np.int32(day_to_int(day)))
+        self.frame['first_day'] = first_day
+        self._refresh()
+        return np.sort(ids)
+
+    def save(self, path: str, identity_path: Optional[str] = None) -> None:
+        """
+        방문자 사전(과 불러온 경우 원본 ip, user_agent 파일)을 저장하는 함수
+
+        Args:
+            path (str): 방문자 사전 파일 경로
+            identity_path (Optional[str]): 원본 파일 경로 (None이면 저장하지 않음)
+        """
+        with atomic_write(path) as temp_path:
+            self.frame[VISITOR_DICTIONARY_COLUMNS].to_parquet(temp_path, index=False, compression='zstd')
+        if identity_path is not None and self.identities is not None:
+            with atomic_write(identity_path) as temp_path:
+                self.identities.to_parquet(temp_path, index=False, compression='zstd')
+
+    @classmethod
+    def load(cls, path: str, identity_path: Optional[str] = None) -> 'VisitorDictionary':
+        """
+        방문자 사전을 불러오는 함수
+
+        identity_path가 없으면 조회에 필요한 컬럼만 읽고 브라우저/OS는 범주형으로 바꿔 메모리를 줄입니다.
+
+        Args:
+            path (str): 방문자 사전 파일 경로
+            identity_path (Optional[str]): 원본 ip, user_agent 파일 경로 (색인을 만들 때만 지정)
+
+        Returns:
+            VisitorDictionary: 방문자 사전 (파일이 없으면 빈 사전)
+        """
+        if identity_path is None:
+            if not os.path.exists(path):
+                return cls()
+            frame = pd.read_parquet(path, columns=VISITOR_DICTIONARY_COLUMNS)
+            frame[['user_browser', 'user_os']] = frame[['user_browser', 'user_os']].astype('category')
+            return cls(frame)
+
+        if not os.path.exists(path):
+            return cls(identities=pd.DataFrame(columns=VISITOR_IDENTITY_COLUMNS, dtype=object))
+        frame = pd.read_parquet(path)
+        if os.path.exists(identity_path):
+            identities = pd.read_parquet(identity_path)
+        elif set(VISITOR_IDENTITY_COLUMNS) <= set(frame.columns):
+            # 원본 문자열을 사전에 함께 저장하던 예전 형식
+            identities = frame[VISITOR_IDENTITY_COLUMNS]
+        else:
+            identities = pd.DataFrame({column: [None] * len(frame) for column in VISITOR_IDENTITY_COLUMNS}, dtype=object)
+        return cls(frame[VISITOR_DICTIONARY_COLUMNS], identities)
+
+def build_visitor_index(days: Optional[List[str]] = None, store_path: Optional[str] = None) -> None:
+    """
+    일 파티션별 방문자 ID 배열과 방문자 사전을 만드는 함수
+
+    Args:
+        days (Optional[List[str]]): 색인을 만들 날짜 목록 (기본값: 전체)
+        store_path (Optional[str]): 저장소 경로 (기본값: get_store_path())
+    """
+    index_dir = get_visitor_index_dir(store_path)
+    os.makedirs(index_dir, exist_ok=True)
+    dictionary_path = os.path.join(index_dir, VISITOR_DICTIONARY_FILENAME)
+    identity_path = os.path.join(index_dir, VISITOR_IDENTITY_FILENAME)
+
+    dataset = open_log_dataset(store_path)
+    dictionary = VisitorDictionary.load(dictionary_path, identity_path)
+    for day in days or list_days(store_path):
+        df = dataset.to_table(columns=VISITOR_COLUMNS, filter=ds.field('day') == day).to_pandas()
+        ids = dictionary.encode(df, day)
+        with atomic_write(os.path.join(index_dir, f"day={day}.npy")) as temp_path:
+            np.save(temp_path, ids)
+    dictionary.save(dictionary_path, identity_path)
+
+@mtime_cache(maxsize=4)
+def _load_visitor_dictionary(path: str) -> VisitorDictionary:
+    return VisitorDictionary.load(path)
+
+def load_visitor_dictionary(store_path: Optional[str] = None) -> Optional[VisitorDictionary]:
+    """
+    방문자 사전을 불러오는 함수 (파일이 바뀌지 않았으면 메모리 캐시 사용)
+
+    Args:
+        store_path (Optional[str]): 저장소 경로
+
+    Returns:
+        Optional[VisitorDictionary]: 방문자 사전 또는 색인이 없으면 None
+    """
+    return _load_visitor_dictionary(os.path.join(get_visitor_index_dir(store_path), VISITOR_DICTIONARY_FILENAME))
+
+@mtime_cache(maxsize=1024)
+def _load_day_visitors(path: str) -> np.ndarray:
+    return np.load(path)
+
+def load_day_visitors(day: str, store_path: Optional[str] = None) -> np.ndarray:
+    """
+    하루치 방문자 ID 배열을 불러오는 함수
+
+    Args:
+        day (str): 'YYYY-MM-DD' 날짜
+        store_path (Optional[str]): 저장소 경로
+
+    Returns:
+        np.ndarray: 정렬된 고유 int32 ID 배열 (색인이 없으면 빈 배열)
+    """
+    ids = _load_day_visitors(os.path.join(get_visitor_index_dir(store_path), f"day={day}.npy"))
+    return ids if ids is not None else np.empty(0, dtype=np.int32)
+
+def has_visitor_index(store_path: Optional[str] = None) -> bool:
+    """
+    방문자 색인이 있는지 확인하는 함수
+
+    Args:
+        store_path (Optional[str]): 저장소 경로
+
+    Returns:
+        bool: 방문자 사전 파일이 있으면 True
+    """
+    return os.path.exists(os.path.join(get_visitor_index_dir(store_path), VISITOR_DICTIONARY_FILENAME))
+
+def load_range_visitors(start_date: str, end_date: str, store_path: Optional[str] = None) -> List[Tuple[str, np.ndarray]]:
+    """
+    기간에 포함되는 날짜별 방문자 ID 배열을 불러오는 함수
+
+    Args:
+        start_date (str): 시작 날짜
+        end_date (str): 종료 날짜
+        store_path (Optional[str]): 저장소 경로
+
+    Returns:
+        List[Tuple[str, np.ndarray]]: (날짜, ID 배열) 목록 (날짜 오름차순)
+    """
+    return [
+        (day, load_day_visitors(day, store_path))
+        for day in list_days(store_path)
+        if start_date <= day <= end_date
+    ]
+
+def count_visitors(start_date: str, end_date: str, store_path: Optional[str] = None) -> Optional[Dict[str, int]]:
+    """
+    기간의 전체/신규/재방문 방문자 수를 계산하는 함수
+
+    기간 안의 마지막 방문일이 전체 기간의 첫 방문일과 같으면 신규 방문자입니다.
+
+    Args:
+        start_date (str): 시작 날짜
+        end_date (str): 종료 날짜
+        store_path (Optional[str]): 저장소 경로
+
+    Returns:
+        Optional[Dict[str, int]]: total, new, returning 키를 가진 딕셔너리 또는 색인이 없으면 None
+    """
+    dictionary = load_visitor_dictionary(store_path)
+    if dictionary is None:
+        return None
+
+    # 날짜 오름차순으로 덮어쓰면 방문자별 기간 안 마지막 방문일이 남음
+    last_day = np.full(len(dictionary), -1, dtype=np.int32)
+    for day, ids in load_range_visitors(start_date, end_date, store_path):
+        last_day[ids] = day_to_int(day)
+
+    visited = last_day >= 0
+    new = int(np.count_nonzero(visited & (last_day == dictionary.first_day)))
+    total = int(np.count_nonzero(visited))
+    return {'total': total, 'new': new, 'returning': total - new}
+
+def count_device_visitors(start_date: str, end_date: str, store_path: Optional[str] = None) -> Optional[Dict[str, int]]:
+    """
+    기간의 전체/모바일/데스크톱 방문자 수를 계산하는 함수
+
+    Args:
+        start_date (str): 시작 날짜
+        end_date (str): 종료 날짜
+        store_path (Optional[str]): 저장소 경로
+
+    Returns:
+        Optional[Dict[str, int]]: total, mobile, desktop 키를 가진 딕셔너리 또는 색인이 없으면 None
+    """
+    dictionary = load_visitor_dictionary(store_path)
+    if dictionary is None:
+        return None
+
+    days = load_range_visitors(start_date, end_date, store_path)
+    ids = np.unique(np.concatenate([ids for _, ids in days])) if days else np.empty(0, dtype=np.int32)
+    mobile = int(np.count_nonzero(dictionary.is_mobile[ids]))
+    return {'total': len(ids), 'mobile': mobile, 'desktop': len(ids) - mobile}
+
+def daily_visitor_stats(start_date: str, end_date: str, store_path: Optional[str] = None) -> Optional[Dict[str, list]]:
+    """
+    기간의 일별 전체/신규/재방문 방문자 수를 계산하는 함수
+
+    기간 안의 첫 방문일에 방문한 경우를 신규로 셉니다.
+
+    Args:
+        start_date (str): 시작 날짜
+        end_date (str): 종료 날짜
+        store_path (Optional[str]): 저장소 경로
+
+    Returns:
+        Optional[Dict[str, list]]: dates, total, new, returning 키를 가진 딕셔너리 또는 데이터가 없으면 None
+    """
+    dictionary = load_visitor_dictionary(store_path)
+    days = load_range_visitors(start_date, end_date, store_path)
+    if dictionary is None or not days:
+        return None
+
+    # 날짜 내림차순으로 덮어쓰면 방문자별 기간 안 첫 방문일이 남음
+    first_day = np.full(len(dictionary), UNKNOWN_DAY, dtype=np.int32)
+    for day, ids in reversed(days):
+        first_day[ids] = day_to_int(day)
+
+    totals = [len(ids) for _, ids in days]
+    news = [int(np.count_nonzero(first_day[ids] == day_to_int(day))) for day, ids in days]
+    return {
+        'dates': [day for day, _ in days],
+        'total': totals,
+        'new': news,
+        'returning': [total - new for total, new in zip(totals, news)]
+    }
+
+def environment_cube(start_date: str, end_date: str, store_path: Optional[str] = None) -> Optional[pd.DataFrame]:
+    """
+    기간의 (모바일 여부, 브라우저, OS) 조합별 방문자 수를 계산하는 함수
+
+    Args:
+        start_date (str): 시작 날짜
+        end_date (str): 종료 날짜
+        store_path (Optional[str]): 저장소 경로
+
+    Returns:
+        Optional[pd.DataFrame]: user_is_mobile, user_browser, user_os, visitors 컬럼 데이터프레임 또는 데이터가 없으면 None
+    """
+    dictionary = load_visitor_dictionary(store_path)
+    days = load_range_visitors(start_date, end_date, store_path)
+    if dictionary is None or not days:
+        return None
+
+    ids = np.unique(np.concatenate([ids for _, ids in days]))
+    if len(ids) == 0:
+        return None
+    visitors = dictionary.frame.iloc[ids]
+    return (
+        visitors.groupby(['user_is_mobile', 'user_browser', 'user_os'], dropna=False, observed=True)
+        .size()
+        .reset_index(name='visitors')
+    )
+
+def pack_visitor_bitmap(ids: np.ndarray, words: int) -> np.ndarray:
+    """
+    방문자 ID 배열을 비트맵(ID 번째 비트가 1)으로 압축하는 함수
+
+    Args:
+        ids (np.ndarray): 방문자 ID 배열
+        words (int): 비트맵 길이 (64비트 워드 수)
+
+    Returns:
+        np.ndarray: uint64 비트맵
+    """
+    bits = np.zeros(words * 64, dtype=bool)
+    bits[ids] = True
+    return np.packbits(bits, bitorder='little').view(np.uint64)
+
+@mtime_cache(maxsize=256)
+def _load_day_bitmap(path: str, words: int) -> np.ndarray:
+    return pack_visitor_bitmap(_load_day_visitors(path), words)
+
+def load_day_bitmap(day: str, words: int, store_path: Optional[str] = None) -> np.ndarray:
+    """
+    하루치 방문자 비트맵을 불러오는 함수 (ID 배열 파일이 바뀌지 않았으면 메모리 캐시 사용)
+
+    Args:
+        day (str): 'YYYY-MM-DD' 날짜
+        words (int): 비트맵 길이 (64비트 워드 수)
+        store_path (Optional[str]): 저장소 경로
+
+    Returns:
+        np.ndarray: uint64 비트맵 (색인이 없으면 빈 비트맵)
+    """
+    bitmap = _load_day_bitmap(os.path.join(get_visitor_index_dir(store_path), f"day={day}.npy"), words)
+    return bitmap if bitmap is not None else np.zeros(words, dtype=np.uint64)
+
+def cohort_retention(start_date: str, end_date: str, store_path: Optional[str] = None) -> Optional[Dict[str, list]]:
+    """
+    첫 방문일 코호트별로 며칠 뒤에 다시 방문했는지 계산하는 함수
+
+    코호트 비트맵과 날짜별 방문자 비트맵을 64비트 단위 AND 연산 후 비트 수(bitwise_count)를 세어
+    코호트 하나의 모든 재방문일을 한 번에 계산합니다.
+
+    Args:
+        start_date (str): 시작 날짜
+        end_date (str): 종료 날짜
+        store_path (Optional[str]): 저장소 경로
+
+    Returns:
+        Optional[Dict[str, list]]: cohorts(첫 방문일), sizes(코호트 크기), offsets(경과 일수),
+            counts(코호트 × 경과 일수 재방문자 수, 지나지 않은 날은 None) 키를 가진 딕셔너리 또는 데이터가 없으면 None
+    """
+    dictionary = load_visitor_dictionary(store_path)
+    days = load_range_visitors(start_date, end_date, store_path)
+    if dictionary is None or not days:
+        return None
+
+    words = (len(dictionary) + 63) // 64
+    day_numbers = np.array([day_to_int(day) for day, _ in days])
+    bitmaps = np.stack([load_day_bitmap(day, words, store_path) for day, _ in days])
+    offsets = np.arange(day_numbers[-1] - day_numbers[0] + 1)
+
+    counts = np.full((len(days), len(offsets)), np.nan)
+    sizes = []
+    for row, (day, ids) in enumerate(days):
+        # 그날 방문자 중 전체 기간의 첫 방문일이 그날인 방문자가 코호트
+        cohort_ids = ids[dictionary.first_day[ids] == day_numbers[row]]
+        if len(cohort_ids) == 0:
+            sizes.append(0)
+            continue
+        # ID는 처음 본 순서로 부여되므로 코호트는 거의 연속된 ID 구간에 모여 있음: 그 워드 구간만 AND
+        low, high = cohort_ids[0] // 64, cohort_ids[-1] // 64 + 1
+        cohort = pack_visitor_bitmap(cohort_ids - low * 64, high - low)
+        retained = np.bitwise_count(bitmaps[row:, low:high] & cohort).sum(axis=1)
+        counts[row, day_numbers[row:] - day_numbers[row]] = retained
+        sizes.append(int(retained[0]))
+
+    # 아직 오지 않은 날(코호트 날짜 + 경과 일수 > 종료일)은 None, 지났지만 파티션이 없는 날은 0
+    elapsed = day_numbers[-1] - day_numbers[:, None]
+    counts = np.where(np.isnan(counts) & (offsets[None, :] <= elapsed), 0, counts)
+    return {
+        'cohorts': [day for day, _ in days],
+        'sizes': sizes,
+        'offsets': offsets.tolist(),
+        'counts': [[None if np.isnan(value) else int(value) for value in row] for row in counts]
+    }
+
+if __name__ == '__main__':
+    # python -m utils.visitor_utils 로 전체 일 파티션의 방문자 색인 다시 만들기
+    build_visitor_index()
+    print("완료")